@@ -0,0 +1,58 @@
+"""
+Compare RunLogger throughput with the old open/append/close-per-event logger.
+
+    python benchmarks/bench_logger.py [--events N]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from future_ralph.core.logger import RunLogger
+
+
+class LegacyRunLogger:
+    """The pre-batching implementation: one open/write/close per event."""
+
+    def __init__(self, run_dir: Path):
+        self.log_file = run_dir / "run.jsonl"
+
+    def log(self, event, data=None):
+        entry = {"timestamp": time.time(), "event": event, "data": data or {}}
+        with open(self.log_file, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        pass
+
+
+def bench(make_logger, events: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = make_logger(Path(tmp))
+        payload = {"future_id": "future_2010", "lines": 1, "last_line": "x" * 80}
+        start = time.perf_counter()
+        for _ in range(events):
+            logger.log("agent_progress", payload)
+        logger.close()
+        return events / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    cases = {
+        "legacy (open per event)": LegacyRunLogger,
+        "RunLogger fsync=never": RunLogger,
+        "RunLogger fsync=batch": lambda d: RunLogger(d, fsync="batch"),
+    }
+    for name, factory in cases.items():
+        rate = bench(factory, args.events)
+        print(f"{name:<28} {rate:>12,.0f} events/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Deterministic stand-ins for agent CLIs, for benchmarking the orchestration.
+"""
+
+import contextlib
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from future_ralph.adapters.base import (
+    AttemptResult,
+    BaseAdapter,
+    OutputCallback,
+    OutputEvent,
+    ToolCapabilities,
+)
+
+# File a successful fake agent leaves behind; the benchmark's test command
+# checks for it, so the failure rate shows up as failing tests
+MARKER = ".fake-agent-ok"
+TEST_CMD = f"test -f {MARKER}"
+
+
+class FakeAdapter(BaseAdapter):
+    """
+    An agent that sleeps for `latency` seconds, prints `output_lines` lines
+    and fails a seeded, reproducible `failure_rate` fraction of its runs.
+    """
+
+    def __init__(
+        self,
+        name: str = "fake",
+        latency: float = 0.0,
+        output_lines: int = 0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.name = name
+        self.latency = latency
+        self.output_lines = output_lines
+        self.failure_rate = failure_rate
+        self._random = random.Random(f"{seed}:{name}")
+        self._lock = threading.Lock()
+
+    def detect(self) -> Dict[str, Any]:
+        return {"found": True, "binary_path": None, "version": "fake", "notes": []}
+
+    def capabilities(self) -> ToolCapabilities:
+        return ToolCapabilities(name=self.name, cost_confidence="exact")
+
+    def run(
+        self,
+        prompt: str,
+        cwd: str,
+        model: Optional[str] = None,
+        timeout: Optional[int] = None,
+        log_path: Optional[str] = None,
+        on_event: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> AttemptResult:
+        start = time.perf_counter()
+        with self._lock:
+            fails = self._random.random() < self.failure_rate
+
+        seen = 0
+        with contextlib.ExitStack() as stack:
+            log = stack.enter_context(open(log_path, "a")) if log_path else None
+            for i in range(self.output_lines):
+                line = f"step {i}: working on {prompt[:40]}"
+                seen += len(line) + 1
+                if log:
+                    log.write(line + "\n")
+                if on_event:
+                    on_event(OutputEvent("stdout", line, i + 1, seen))
+
+        if cancel is not None:
+            cancelled = cancel.wait(self.latency)
+        else:
+            time.sleep(self.latency)
+            cancelled = False
+
+        marker = Path(cwd) / MARKER
+        if not fails and not cancelled:
+            marker.write_text("ok\n")
+        return AttemptResult(
+            stdout="done\n",
+            stderr="",
+            exit_code=130 if cancelled else (1 if fails else 0),
+            duration_seconds=time.perf_counter() - start,
+            cost_info={"total_tokens": 1000, "source": "reported"},
+        )
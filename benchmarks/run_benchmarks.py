@@ -0,0 +1,227 @@
+"""
+Orchestration benchmarks: IterationEngine, RunLogger and the run catalog,
+driven by deterministic fake adapters so they run offline.
+
+    python benchmarks/run_benchmarks.py [--quick] [--output results.json]
+                                        [--compare baseline.json]
+
+Results are written as JSON. With --compare, any metric more than
+--tolerance worse than the baseline is reported and the exit status is 1.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from bench_logger import bench as bench_logger
+from fake_adapters import TEST_CMD, FakeAdapter
+
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.logger import RunLogger
+from future_ralph.core.models import FutureStatus, RunConfig
+from future_ralph.core.run_manager import RunManager
+
+FULL = {"futures": 200, "runs": [10, 1_000, 10_000], "events": 50_000}
+QUICK = {"futures": 20, "runs": [10, 100], "events": 5_000}
+
+
+def bench_engine(
+    futures: int,
+    parallel: int,
+    latency: float,
+    output_lines: int,
+    failure_rate: float,
+    workspace_mode: str,
+) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "repo"
+        source.mkdir()
+        for i in range(20):
+            (source / f"module_{i}.py").write_text(f"VALUE = {i}\n")
+
+        manager = RunManager(base_dir=Path(tmp) / "runs")
+        run = manager.create_run("benchmark")
+        config = RunConfig(
+            max_iters=futures,
+            test_cmd=TEST_CMD,
+            stop_on_success=False,
+            max_parallel=parallel,
+            workspace_mode=workspace_mode,
+            repo_dir=str(source),
+            scheduler="round_robin",
+        )
+        adapters = [
+            FakeAdapter(f"fake{i}", latency, output_lines, failure_rate, seed=i)
+            for i in range(3)
+        ]
+        engine = IterationEngine(run, config)
+
+        start = time.perf_counter()
+        engine.execute_run("benchmark prompt", adapters)
+        run.close()
+        wall = time.perf_counter() - start
+
+    # Time the fake agents would take on their own, perfectly parallelised
+    ideal = futures * latency / parallel
+    passed = sum(
+        1
+        for f in engine.futures
+        if f.status == FutureStatus.COMPLETED and f.result and f.result.exit_code == 0
+    )
+    return {
+        "futures_per_sec": futures / wall,
+        "overhead_ms_per_future": (wall - ideal) / futures * 1000,
+        "pass_rate": passed / futures,
+    }
+
+
+def _write_runs(base_dir: Path, count: int):
+    base_dir.mkdir(parents=True)
+    for i in range(count):
+        run_dir = base_dir / f"20240101-{i:06d}-bench"
+        run_dir.mkdir()
+        events = [
+            ("run_started", {"prompt": f"task {i}", "repo": "/bench"}),
+            ("iteration_started", {"future_id": "future_2010", "tool": "fake0"}),
+            (
+                "iteration_completed",
+                {"future_id": "future_2010", "score": 100.0, "exit_code": 0},
+            ),
+            ("best_future_selected", {"future_id": "future_2010", "score": 100.0}),
+            ("run_completed", {"status": "success" if i % 3 else "failed"}),
+        ]
+        with open(run_dir / "run.jsonl", "w") as f:
+            for n, (event, data) in enumerate(events):
+                entry = {
+                    "timestamp": 1_700_000_000 + i + n,
+                    "event": event,
+                    "data": data,
+                }
+                f.write(json.dumps(entry) + "\n")
+
+
+def _median_ms(fn, repeats: int = 20) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_catalog(count: int) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp) / "runs"
+        _write_runs(base_dir, count)
+
+        start = time.perf_counter()
+        manager = RunManager(base_dir=base_dir)  # new catalog: indexes every run
+        reindex_ms = (time.perf_counter() - start) * 1000
+
+        page = _median_ms(lambda: manager.list_runs(limit=20))
+        filtered = _median_ms(lambda: manager.list_runs(status="failed", limit=20))
+        full = _median_ms(lambda: manager.list_runs(), repeats=5)
+        manager.catalog.close()
+    return {
+        "reindex_ms": reindex_ms,
+        "list_runs_page_ms": page,
+        "list_runs_filtered_ms": filtered,
+        "list_runs_all_ms": full,
+    }
+
+
+def run_suite(args) -> Dict[str, float]:
+    sizes = QUICK if args.quick else FULL
+    metrics: Dict[str, float] = {}
+
+    for parallel in (1, 4):
+        result = bench_engine(
+            sizes["futures"],
+            parallel,
+            args.latency,
+            args.output_lines,
+            args.failure_rate,
+            args.workspace_mode,
+        )
+        for name, value in result.items():
+            metrics[f"engine.parallel{parallel}.{name}"] = value
+
+    metrics["logger.events_per_sec"] = bench_logger(RunLogger, sizes["events"])
+
+    for count in sizes["runs"]:
+        for name, value in bench_catalog(count).items():
+            metrics[f"catalog.runs{count}.{name}"] = value
+    return metrics
+
+
+def compare(
+    metrics: Dict[str, float], baseline: Dict[str, float], tolerance: float
+) -> List[str]:
+    """Metrics more than `tolerance` worse than the baseline."""
+    regressions = []
+    for name, value in metrics.items():
+        old = baseline.get(name)
+        if not old or name.endswith("pass_rate"):
+            continue
+        if name.endswith("_per_sec"):
+            worse = value < old * (1 - tolerance)
+        else:
+            worse = value > old * (1 + tolerance)
+        if worse:
+            regressions.append(f"{name}: {old:,.3f} -> {value:,.3f}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--quick", action="store_true", help="small sizes, for CI")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--output-lines", type=int, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.2)
+    parser.add_argument(
+        "--workspace-mode", default="copy", choices=["copy", "git", "none"]
+    )
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="baseline results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    metrics = run_suite(args)
+    for name, value in metrics.items():
+        print(f"{name:<48} {value:>14,.3f}")
+
+    results = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "latency": args.latency,
+            "output_lines": args.output_lines,
+            "failure_rate": args.failure_rate,
+            "workspace_mode": args.workspace_mode,
+        },
+        "metrics": metrics,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["metrics"]
+        regressions = compare(metrics, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
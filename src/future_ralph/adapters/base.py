@@ -1,6 +1,55 @@
+import asyncio
+import contextlib
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import (
+    IO,
+    Any,
+    Callable,
+    ClassVar,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+)
+
+# How many trailing lines of each stream are kept in memory
+DEFAULT_TAIL_LINES = 200
+# Longest line (in characters) kept in the in-memory tail
+MAX_TAIL_LINE = 4096
+# Seconds between SIGTERM and SIGKILL when tearing down a process group
+KILL_GRACE_SECONDS = 2.0
+# Seconds a `--version` probe may take before the version is reported unknown
+VERSION_PROBE_TIMEOUT = 5.0
+# How often a running command checks whether it has been cancelled
+CANCEL_POLL_INTERVAL = 0.05
+# Exit code reported for commands killed because they were cancelled
+CANCELLED_EXIT_CODE = 130
+# Seconds between two samples of a running command's CPU time and memory
+RESOURCE_SAMPLE_INTERVAL = 0.25
+
+# Run as `python -S -c _LIMITS_SHIM <limit>=<value>,... <cmd...>`
+_LIMITS_SHIM = """
+import os, resource, sys
+for setting in sys.argv[1].split(","):
+    limit, value = map(int, setting.split("="))
+    resource.setrlimit(limit, (value, value))
+try:
+    os.execvp(sys.argv[2], sys.argv[2:])
+except OSError as e:
+    sys.exit(f"{sys.argv[2]}: {e}")
+"""
+
+_VERSION_RE = re.compile(r"\bv?(\d+\.\d+(?:\.\d+)?(?:[-+.][0-9A-Za-z.]+)?)")
 
 
 @dataclass
@@ -9,8 +58,18 @@ class AttemptResult:
     stderr: str
     exit_code: int
     duration_seconds: float
+    # Adapters may return the patch; the engine moves it into the run's
+    # patch store and keeps only `diff_ref` and `diff_stats`
     diff: Optional[str] = None
     cost_info: Dict[str, Any] = field(default_factory=dict)
+    log_path: Optional[str] = None
+    diff_ref: Optional[str] = None
+    diff_stats: Dict[str, int] = field(default_factory=dict)
+    # Test verdict from wherever the attempt ran (remote workers), which the
+    # engine adopts instead of testing again if it ran the same stages
+    verdict: Optional[Dict[str, Any]] = None
+    # Peak memory and CPU time of the agent's process tree (see `stream_command`)
+    resources: Dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
@@ -22,7 +81,390 @@ class ToolCapabilities:
     supported_env_keys: List[str] = field(default_factory=list)
 
 
+@dataclass
+class OutputEvent:
+    """A single line of output from a running command."""
+
+    stream: str  # stdout, stderr
+    line: str
+    lines_seen: int
+    bytes_seen: int
+
+
+@dataclass
+class CommandResult:
+    stdout: str
+    stderr: str
+    exit_code: int
+    duration_seconds: float
+    timed_out: bool = False
+    log_path: Optional[str] = None
+    cancelled: bool = False
+    resources: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class ResourceLimits:
+    """
+    Per-process limits for agent and test commands (and everything they
+    start). Applied with rlimits where the platform supports them.
+    """
+
+    cpu_seconds: Optional[int] = None
+    memory_mb: Optional[int] = None  # address space, so leave headroom
+    open_files: Optional[int] = None
+
+    def wrap(self, cmd: List[str]) -> List[str]:
+        """
+        `cmd` behind a small Python shim that sets the limits and then execs
+        it, so nothing the command starts escapes them. (Setting them in a
+        `preexec_fn` instead is unsafe from a threaded process.) Returns
+        `cmd` unchanged if there is nothing to set.
+        """
+        try:
+            import resource
+        except ImportError:
+            return cmd
+        wanted = [
+            (resource.RLIMIT_CPU, self.cpu_seconds),
+            (resource.RLIMIT_AS, self.memory_mb and self.memory_mb * 1024 * 1024),
+            (resource.RLIMIT_NOFILE, self.open_files),
+        ]
+        settings = []
+        for limit, value in wanted:
+            if not value:
+                continue
+            _, hard = resource.getrlimit(limit)
+            # An unprivileged process cannot raise its hard limit
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            settings.append(f"{limit}={value}")
+        if not settings:
+            return cmd
+        return [sys.executable, "-S", "-c", _LIMITS_SHIM, ",".join(settings), *cmd]
+
+
+class _GroupSampler:
+    """
+    Tracks the peak resident memory and CPU time of a command's processes
+    by sampling /proc (Linux); elsewhere it records nothing.
+
+    Each sample follows the command's process tree down from its leader
+    through /proc/<pid>/task/<tid>/children, so its cost depends on the
+    size of that tree rather than on every process on the host. Kernels
+    without that file fall back to scanning /proc for the process group.
+    """
+
+    _TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    _PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    _CHILDREN = os.path.exists(f"/proc/self/task/{os.getpid()}/children")
+
+    def __init__(self, pgid: int):
+        self.pgid = pgid
+        self.peak_rss = 0
+        self.cpu_ticks = 0
+        self.available = os.path.isdir("/proc/self")
+
+    def _pids(self) -> List[str]:
+        if not self._CHILDREN:
+            return [name for name in os.listdir("/proc") if name.isdigit()]
+        pids = [str(self.pgid)]
+        for pid in pids:  # grows as children are found
+            try:
+                threads = os.listdir(f"/proc/{pid}/task")
+            except OSError:
+                continue
+            for tid in threads:
+                try:
+                    with open(f"/proc/{pid}/task/{tid}/children") as f:
+                        pids.extend(f.read().split())
+                except OSError:
+                    continue
+        return pids
+
+    def sample(self):
+        if not self.available:
+            return
+        rss = ticks = 0
+        for pid in self._pids():
+            try:
+                with open(f"/proc/{pid}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # Fields after the parenthesised command name, which may hold spaces
+            fields = stat[stat.rfind(b")") + 2 :].split()
+            if len(fields) < 22:
+                continue
+            if not self._CHILDREN and int(fields[2]) != self.pgid:
+                continue
+            # utime, stime, and the same for children already reaped
+            ticks += sum(int(v) for v in fields[11:15])
+            rss += int(fields[21]) * self._PAGE
+        self.peak_rss = max(self.peak_rss, rss)
+        self.cpu_ticks = max(self.cpu_ticks, ticks)
+
+    def resources(self) -> Dict[str, float]:
+        if not self.available:
+            return {}
+        return {
+            "peak_rss_mb": self.peak_rss / (1024 * 1024),
+            "cpu_seconds": self.cpu_ticks / self._TICKS,
+        }
+
+
+async def _sample_until_done(sampler: _GroupSampler):
+    while True:
+        sampler.sample()
+        await asyncio.sleep(RESOURCE_SAMPLE_INTERVAL)
+
+
+OutputCallback = Callable[[OutputEvent], None]
+
+
+class _OutputCollector:
+    def __init__(
+        self,
+        log: Optional[IO[bytes]],
+        tail_lines: int,
+        on_event: Optional[OutputCallback],
+    ):
+        self.log = log
+        self.tails: Dict[str, Deque[str]] = {
+            "stdout": deque(maxlen=tail_lines),
+            "stderr": deque(maxlen=tail_lines),
+        }
+        self.on_event = on_event
+        self.lines_seen = 0
+        self.bytes_seen = 0
+
+    async def pump(self, reader: asyncio.StreamReader, stream: str):
+        partial = b""
+        while True:
+            chunk = await reader.read(65536)
+            if not chunk:
+                break
+            self.bytes_seen += len(chunk)
+            *lines, partial = (partial + chunk).split(b"\n")
+            for line in lines:
+                self._emit(stream, line)
+            if len(partial) > MAX_TAIL_LINE * 4:
+                # Pathologically long line: emit it in pieces to stay bounded
+                self._emit(stream, partial)
+                partial = b""
+            if self.log:
+                self.log.flush()
+        if partial:
+            self._emit(stream, partial)
+
+    def _emit(self, stream: str, raw: bytes):
+        if self.log:
+            self.log.write(
+                b"[stderr] " + raw + b"\n" if stream == "stderr" else raw + b"\n"
+            )
+        line = raw.decode(errors="replace").rstrip("\r")
+        self.lines_seen += 1
+        self.tails[stream].append(line[:MAX_TAIL_LINE])
+        if self.on_event:
+            self.on_event(OutputEvent(stream, line, self.lines_seen, self.bytes_seen))
+
+    def tail(self, stream: str) -> str:
+        lines = self.tails[stream]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+async def _kill_process_group(proc: asyncio.subprocess.Process):
+    """Terminate the process and everything it spawned."""
+    killpg = getattr(os, "killpg", None)
+
+    def send(sig: int):
+        try:
+            if killpg:
+                killpg(proc.pid, sig)
+            else:
+                proc.kill()
+        except ProcessLookupError:
+            pass
+
+    send(signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), KILL_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        pass
+    # Grandchildren may outlive the leader; make sure none are left
+    send(getattr(signal, "SIGKILL", signal.SIGTERM))
+    await proc.wait()
+
+
+async def _wait_for_event(event: threading.Event):
+    while not event.is_set():
+        await asyncio.sleep(CANCEL_POLL_INTERVAL)
+
+
+async def stream_command(
+    cmd: List[str],
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    log_path: Optional[str] = None,
+    on_event: Optional[OutputCallback] = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    env: Optional[Dict[str, str]] = None,
+    cancel: Optional[threading.Event] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> CommandResult:
+    """
+    Run a command in its own process group, streaming its output.
+
+    Every byte of output is appended to `log_path` as it arrives, while only
+    the last `tail_lines` lines of each stream are kept in memory. On timeout
+    the whole process group is killed and the exit code is 124; when
+    `cancel` is set it is killed too and the exit code is 130. Processes
+    still left in the group when the command exits are killed as well.
+
+    `limits` apply to the command and what it starts; the group's peak
+    memory and CPU time are reported in `resources`.
+    """
+    start_time = time.time()
+    with contextlib.ExitStack() as stack:
+        log = stack.enter_context(open(log_path, "ab")) if log_path else None
+        collector = _OutputCollector(log, tail_lines, on_event)
+        if limits is not None:
+            cmd = limits.wrap(cmd)
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        sampler = _GroupSampler(proc.pid)
+        sampling = asyncio.ensure_future(_sample_until_done(sampler))
+        assert proc.stdout is not None and proc.stderr is not None
+        tasks = {
+            asyncio.ensure_future(proc.wait()),
+            asyncio.ensure_future(collector.pump(proc.stdout, "stdout")),
+            asyncio.ensure_future(collector.pump(proc.stderr, "stderr")),
+        }
+        finished = asyncio.ensure_future(asyncio.wait(tasks))
+        watcher = asyncio.ensure_future(_wait_for_event(cancel)) if cancel else None
+        timed_out = cancelled = False
+        try:
+            await asyncio.wait(
+                {finished} | ({watcher} if watcher else set()),
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not finished.done():
+                cancelled = watcher is not None and watcher.done()
+                timed_out = not cancelled
+                await _kill_process_group(proc)
+                await asyncio.wait({finished}, timeout=KILL_GRACE_SECONDS)
+                for task in tasks:
+                    task.cancel()
+        except asyncio.CancelledError:
+            await _kill_process_group(proc)
+            raise
+        finally:
+            if watcher:
+                watcher.cancel()
+            sampling.cancel()
+            _reap_group(proc.pid)
+
+    stderr = collector.tail("stderr")
+    exit_code = proc.returncode or 0
+    if timed_out:
+        stderr += "Timeout expired\n"
+        exit_code = 124
+    elif cancelled:
+        stderr += "Cancelled\n"
+        exit_code = CANCELLED_EXIT_CODE
+    return CommandResult(
+        stdout=collector.tail("stdout"),
+        stderr=stderr,
+        exit_code=exit_code,
+        duration_seconds=time.time() - start_time,
+        timed_out=timed_out,
+        log_path=log_path,
+        cancelled=cancelled,
+        resources=sampler.resources(),
+    )
+
+
+def _reap_group(pgid: int):
+    """Kill whatever the command left running in its process group."""
+    killpg = getattr(os, "killpg", None)
+    if killpg is None:
+        return
+    try:
+        killpg(pgid, getattr(signal, "SIGKILL", signal.SIGTERM))
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_command(
+    cmd: List[str],
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    log_path: Optional[str] = None,
+    on_event: Optional[OutputCallback] = None,
+    tail_lines: int = DEFAULT_TAIL_LINES,
+    env: Optional[Dict[str, str]] = None,
+    cancel: Optional[threading.Event] = None,
+    limits: Optional[ResourceLimits] = None,
+) -> CommandResult:
+    """Blocking wrapper around `stream_command` with its own event loop."""
+    return asyncio.run(
+        stream_command(
+            cmd, cwd, timeout, log_path, on_event, tail_lines, env, cancel, limits
+        )
+    )
+
+
+def run_shell(
+    cmd: str,
+    cwd: Optional[str] = None,
+    timeout: Optional[float] = None,
+    cancel: Optional[threading.Event] = None,
+    limits: Optional[ResourceLimits] = None,
+    env: Optional[Dict[str, str]] = None,
+) -> CommandResult:
+    """`run_command` for a shell command line, such as a test command."""
+    argv = ["sh", "-c", cmd] if os.name == "posix" else ["cmd", "/c", cmd]
+    return run_command(
+        argv, cwd=cwd, timeout=timeout, env=env, cancel=cancel, limits=limits
+    )
+
+
+def probe_version(
+    binary_path: str, args: Sequence[str] = ("--version",)
+) -> Optional[str]:
+    """Ask a CLI for its version; returns None if it cannot be determined."""
+    try:
+        proc = subprocess.run(
+            [binary_path, *args],
+            capture_output=True,
+            text=True,
+            timeout=VERSION_PROBE_TIMEOUT,
+            stdin=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = f"{proc.stdout}\n{proc.stderr}"
+    match = _VERSION_RE.search(output)
+    if match:
+        return match.group(1)
+    first_line = output.strip().splitlines()[0] if output.strip() else ""
+    return first_line[:80] or None
+
+
 class BaseAdapter(ABC):
+    # Executable the adapter drives; used to detect the tool and key caches
+    binary: ClassVar[str] = ""
+    # Limits for the agent's processes, set by the engine from the run config
+    limits: Optional[ResourceLimits] = None
+
     @abstractmethod
     def detect(self) -> Dict[str, Any]:
         """
@@ -45,8 +487,69 @@ class BaseAdapter(ABC):
         cwd: str,
         model: Optional[str] = None,
         timeout: Optional[int] = None,
+        log_path: Optional[str] = None,
+        on_event: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
     ) -> AttemptResult:
         """
         Run the agent on the task.
+        Output is streamed to `log_path` (if given) and reported line by
+        line through `on_event`. Setting `cancel` kills the agent.
         """
         pass
+
+    def _execute(
+        self,
+        cmd: List[str],
+        cwd: str,
+        timeout: Optional[int] = None,
+        log_path: Optional[str] = None,
+        on_event: Optional[OutputCallback] = None,
+        cost_info: Optional[Dict[str, Any]] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> AttemptResult:
+        """
+        Run an agent CLI through the shared streaming runner.
+
+        Usage reported in the output replaces the `cost_info` estimate.
+        """
+        from future_ralph.adapters.usage import UsageParser
+
+        parser = UsageParser()
+
+        def observe(event: OutputEvent):
+            parser.feed(event.line)
+            if on_event:
+                on_event(event)
+
+        start_time = time.time()
+        try:
+            result = run_command(
+                cmd,
+                cwd=cwd,
+                timeout=timeout,
+                log_path=log_path,
+                on_event=observe,
+                cancel=cancel,
+                limits=self.limits,
+            )
+        except Exception as e:
+            return AttemptResult(
+                stdout="",
+                stderr=str(e),
+                exit_code=1,
+                duration_seconds=time.time() - start_time,
+                diff=None,
+                log_path=log_path,
+            )
+
+        return AttemptResult(
+            stdout=result.stdout,
+            stderr=result.stderr,
+            exit_code=result.exit_code,
+            duration_seconds=result.duration_seconds,
+            diff=None,
+            cost_info=parser.cost_info(cost_info or {}),
+            log_path=log_path,
+            resources=result.resources,
+        )
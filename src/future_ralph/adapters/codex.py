@@ -1,19 +1,26 @@
 import shutil
-import subprocess
-import time
+import threading
 from typing import Any, Dict, Optional
-from future_ralph.adapters.base import BaseAdapter, AttemptResult, ToolCapabilities
+from future_ralph.adapters.base import (
+    AttemptResult,
+    BaseAdapter,
+    OutputCallback,
+    ToolCapabilities,
+    probe_version,
+)
 
 
 class CodexAdapter(BaseAdapter):
+    binary = "openai"
+
     def detect(self) -> Dict[str, Any]:
         # Checks for 'openai' CLI as a proxy for Codex/GPT access
-        path = shutil.which("openai")
+        path = shutil.which(self.binary)
         if path:
             return {
                 "found": True,
                 "binary_path": path,
-                "version": "unknown",
+                "version": probe_version(path) or "unknown",
                 "notes": [],
             }
         return {
@@ -37,8 +44,10 @@ class CodexAdapter(BaseAdapter):
         cwd: str,
         model: Optional[str] = "gpt-3.5-turbo",
         timeout: Optional[int] = None,
+        log_path: Optional[str] = None,
+        on_event: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
     ) -> AttemptResult:
-        start_time = time.time()
         # Using openai CLI: openai chat completions create -m <model> -g user "<prompt>"
         cmd = [
             "openai",
@@ -52,35 +61,13 @@ class CodexAdapter(BaseAdapter):
             prompt,
         ]
 
-        try:
-            result = subprocess.run(
-                cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout
-            )
-            duration = time.time() - start_time
-
-            return AttemptResult(
-                stdout=result.stdout,
-                stderr=result.stderr,
-                exit_code=result.returncode,
-                duration_seconds=duration,
-                diff=None,
-                cost_info={
-                    "estimated_tokens": len(prompt) / 4
-                },  # CLI output parsing would be needed for exact
-            )
-        except subprocess.TimeoutExpired:
-            return AttemptResult(
-                stdout="",
-                stderr="Timeout expired",
-                exit_code=124,
-                duration_seconds=time.time() - start_time,
-                diff=None,
-            )
-        except Exception as e:
-            return AttemptResult(
-                stdout="",
-                stderr=str(e),
-                exit_code=1,
-                duration_seconds=time.time() - start_time,
-                diff=None,
-            )
+        return self._execute(
+            cmd,
+            cwd,
+            timeout=timeout,
+            log_path=log_path,
+            on_event=on_event,
+            cancel=cancel,
+            # Replaced by the reported `usage` when the CLI prints it
+            cost_info={"estimated_tokens": len(prompt) / 4},
+        )
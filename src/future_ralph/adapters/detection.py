@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+from future_ralph.adapters.base import BaseAdapter
+
+CACHE_VERSION = 1
+
+
+def _cache_key(adapter: BaseAdapter) -> Optional[Dict[str, Any]]:
+    """
+    What a cached detection result depends on: where the binary resolves to
+    on the current PATH and when it last changed. None if uncacheable.
+    """
+    binary = getattr(adapter, "binary", None)
+    if not isinstance(binary, str) or not binary:
+        return None
+    search_path = os.environ.get("PATH", "")
+    path = shutil.which(binary, path=search_path)
+    mtime = None
+    if path:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+    return {"binary": binary, "path": path, "mtime": mtime, "PATH": search_path}
+
+
+def _load_cache(cache_path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(cache_path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("tools", {})
+
+
+def _save_cache(cache_path: Path, tools: Dict[str, Any]):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "tools": tools}))
+        os.replace(tmp, cache_path)
+    except OSError:
+        # A read-only cache dir only costs us a re-detection next time
+        pass
+
+
+def detect_adapters(
+    adapters: Mapping[str, BaseAdapter],
+    cache_path: Optional[Path] = None,
+    rescan: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run `detect()` for every adapter concurrently, reusing cached results
+    whose binary path, mtime and PATH are unchanged. `rescan` ignores the
+    cache (but still refreshes it).
+    """
+    if cache_path is None:
+        from future_ralph.core.cache import default_cache_dir
+
+        cache_path = default_cache_dir() / "detection.json"
+
+    cached = {} if rescan else _load_cache(cache_path)
+    keys = {name: _cache_key(adapter) for name, adapter in adapters.items()}
+    results: Dict[str, Dict[str, Any]] = {}
+    stale = []
+    for name in adapters:
+        entry = cached.get(name)
+        if keys[name] is not None and entry and entry.get("key") == keys[name]:
+            results[name] = entry["info"]
+        else:
+            stale.append(name)
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            detected = pool.map(lambda name: adapters[name].detect(), stale)
+            for name, info in zip(stale, detected):
+                results[name] = info
+
+        fresh = {
+            name: {"key": keys[name], "info": results[name]}
+            for name in stale
+            if keys[name] is not None
+        }
+        if fresh:
+            _save_cache(cache_path, {**({} if rescan else cached), **fresh})
+
+    return {name: results[name] for name in adapters}
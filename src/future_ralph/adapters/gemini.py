@@ -1,18 +1,25 @@
 import shutil
-import subprocess
-import time
+import threading
 from typing import Any, Dict, Optional
-from future_ralph.adapters.base import BaseAdapter, AttemptResult, ToolCapabilities
+from future_ralph.adapters.base import (
+    AttemptResult,
+    BaseAdapter,
+    OutputCallback,
+    ToolCapabilities,
+    probe_version,
+)
 
 
 class GeminiAdapter(BaseAdapter):
+    binary = "gemini"
+
     def detect(self) -> Dict[str, Any]:
-        path = shutil.which("gemini")
+        path = shutil.which(self.binary)
         if path:
             return {
                 "found": True,
                 "binary_path": path,
-                "version": "unknown",
+                "version": probe_version(path) or "unknown",
                 "notes": [],
             }
         return {
@@ -36,42 +43,20 @@ class GeminiAdapter(BaseAdapter):
         cwd: str,
         model: Optional[str] = None,
         timeout: Optional[int] = None,
+        log_path: Optional[str] = None,
+        on_event: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
     ) -> AttemptResult:
-        start_time = time.time()
         cmd = ["gemini", "prompt", prompt]  # Hypothetical CLI usage
         if model:
             cmd.extend(["--model", model])
 
-        try:
-            result = subprocess.run(
-                cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout
-            )
-            duration = time.time() - start_time
-
-            # Hypothetically extract diff or assume the tool modifies files in place
-            # For now, we return result.
-
-            return AttemptResult(
-                stdout=result.stdout,
-                stderr=result.stderr,
-                exit_code=result.returncode,
-                duration_seconds=duration,
-                diff=None,  # Future work: capture diff
-                cost_info={"estimated_tokens": len(prompt) / 4},  # Naive estimation
-            )
-        except subprocess.TimeoutExpired:
-            return AttemptResult(
-                stdout="",
-                stderr="Timeout expired",
-                exit_code=124,  # Standard timeout exit code
-                duration_seconds=time.time() - start_time,
-                diff=None,
-            )
-        except Exception as e:
-            return AttemptResult(
-                stdout="",
-                stderr=str(e),
-                exit_code=1,
-                duration_seconds=time.time() - start_time,
-                diff=None,
-            )
+        return self._execute(
+            cmd,
+            cwd,
+            timeout=timeout,
+            log_path=log_path,
+            on_event=on_event,
+            cancel=cancel,
+            cost_info={"estimated_tokens": len(prompt) / 4},  # Naive estimation
+        )
@@ -0,0 +1,24 @@
+import importlib
+from typing import Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from future_ralph.adapters.base import BaseAdapter
+
+# Tool name -> "module:Class". Modules are only imported when an adapter is
+# actually needed, so listing tools stays cheap.
+ADAPTERS: Dict[str, str] = {
+    "gemini": "future_ralph.adapters.gemini:GeminiAdapter",
+    "opencode": "future_ralph.adapters.opencode:OpenCodeAdapter",
+    "claude": "future_ralph.adapters.claude:ClaudeAdapter",
+    "codex": "future_ralph.adapters.codex:CodexAdapter",
+}
+
+
+def adapter_names() -> List[str]:
+    return list(ADAPTERS)
+
+
+def load_adapter(name: str) -> "BaseAdapter":
+    module_name, _, class_name = ADAPTERS[name].partition(":")
+    adapter_cls = getattr(importlib.import_module(module_name), class_name)
+    return adapter_cls()
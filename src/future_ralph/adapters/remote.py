@@ -0,0 +1,212 @@
+import contextlib
+import dataclasses
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from future_ralph.adapters.base import (
+    CANCELLED_EXIT_CODE,
+    AttemptResult,
+    BaseAdapter,
+    OutputCallback,
+    ToolCapabilities,
+)
+from future_ralph.adapters.registry import load_adapter
+from future_ralph.core.models import PipelineStage
+from future_ralph.core.workers import FileJobQueue
+
+# Seconds past the agent timeout a worker gets to test and report back
+RESULT_GRACE_SECONDS = 600.0
+
+
+class RemoteAdapter(BaseAdapter):
+    """
+    Runs a tool on whichever worker host takes the job from a shared
+    `FileJobQueue` (see `future_ralph worker`), instead of locally.
+
+    The job carries the workspace's commit plus its uncommitted changes,
+    so the worker starts from the exact same tree. The agent's output is
+    streamed back while it runs; when it is done, the worker's patch is
+    applied to the local workspace and the worker's test verdict is
+    attached to the result.
+    """
+
+    def __init__(
+        self,
+        tool: str,
+        queue: FileJobQueue,
+        repo: Optional[str] = None,
+        stages: Optional[List[PipelineStage]] = None,
+        poll_interval: float = 0.2,
+    ):
+        self.tool = tool
+        self.queue = queue
+        # Where workers clone from; defaults to the workspace's own repository
+        self.repo = repo
+        self.stages = stages or []
+        self.poll_interval = poll_interval
+
+    def detect(self) -> Dict[str, Any]:
+        if self.tool in self.queue.live_tools():
+            return {
+                "found": True,
+                "binary_path": None,
+                "version": "remote",
+                "notes": [f"via workers at {self.queue.root}"],
+            }
+        return {
+            "found": False,
+            "binary_path": None,
+            "version": None,
+            "notes": [f"no live worker offers {self.tool} at {self.queue.root}"],
+        }
+
+    def capabilities(self) -> ToolCapabilities:
+        capabilities = load_adapter(self.tool).capabilities()
+        return dataclasses.replace(capabilities, name=self.tool)
+
+    def run(
+        self,
+        prompt: str,
+        cwd: str,
+        model: Optional[str] = None,
+        timeout: Optional[int] = None,
+        log_path: Optional[str] = None,
+        on_event: Optional[OutputCallback] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> AttemptResult:
+        start = time.time()
+        try:
+            checkout = _describe_checkout(Path(cwd))
+        except (OSError, subprocess.CalledProcessError) as e:
+            return _failed(f"Remote runs need a git workspace: {e}", start, log_path)
+        top, ref, base_tree, base_patch, subdir, repo = checkout
+
+        job_id = self.queue.publish(
+            self.tool,
+            {
+                "repo": self.repo or repo,
+                "ref": ref,
+                "base_tree": base_tree,
+                "base_patch": base_patch,
+                "subdir": subdir,
+                "prompt": prompt,
+                "model": model,
+                "timeout": timeout,
+                "stages": [dataclasses.asdict(stage) for stage in self.stages],
+                "limits": dataclasses.asdict(self.limits) if self.limits else None,
+            },
+        )
+        deadline = start + timeout + RESULT_GRACE_SECONDS if timeout else None
+        with contextlib.ExitStack() as stack:
+            log = stack.enter_context(open(log_path, "a")) if log_path else None
+            offset = 0
+
+            def relay():
+                nonlocal offset
+                events, offset = self.queue.read_progress(job_id, offset)
+                for event in events:
+                    if log:
+                        prefix = "[stderr] " if event.stream == "stderr" else ""
+                        log.write(prefix + event.line + "\n")
+                    if on_event:
+                        on_event(event)
+                if log and events:
+                    log.flush()
+
+            while True:
+                relay()
+                result = self.queue.result(job_id)
+                if result is not None:
+                    # Progress written just before the result is not lost
+                    relay()
+                    break
+                if cancel is not None and cancel.is_set():
+                    if self.queue.withdraw(self.tool, job_id):
+                        return _failed(
+                            "Cancelled before a worker took it",
+                            start,
+                            log_path,
+                            CANCELLED_EXIT_CODE,
+                        )
+                    # Let the worker stop the agent and report what it has
+                    self.queue.cancel(job_id)
+                if deadline is not None and time.time() > deadline:
+                    self.queue.withdraw(self.tool, job_id)
+                    self.queue.cancel(job_id)
+                    return _failed(
+                        "No result from workers in time", start, log_path, 124
+                    )
+                time.sleep(self.poll_interval)
+
+        self.queue.forget(job_id)
+        if "error" in result:
+            return _failed(f"Worker failed: {result['error']}", start, log_path)
+        if result.get("diff"):
+            proc = subprocess.run(
+                ["git", "apply", "--binary", "--whitespace=nowarn", "-"],
+                cwd=top,
+                input=result["diff"].encode(errors="surrogateescape"),
+                capture_output=True,
+            )
+            if proc.returncode != 0:
+                stderr = proc.stderr.decode(errors="replace").strip()
+                return _failed(
+                    f"Could not apply worker patch: {stderr}", start, log_path
+                )
+
+        return AttemptResult(
+            stdout=result.get("stdout", ""),
+            stderr=result.get("stderr", ""),
+            exit_code=result.get("exit_code", 1),
+            duration_seconds=time.time() - start,
+            cost_info=result.get("cost_info") or {},
+            log_path=log_path,
+            verdict=result.get("verdict"),
+        )
+
+
+def _describe_checkout(cwd: Path) -> Tuple[Path, str, str, str, str, str]:
+    """
+    The toplevel, HEAD commit, tree id, patch against HEAD (including
+    untracked files), subdirectory and repository of a checkout, read
+    through a scratch index so the workspace's own index is left alone.
+    """
+
+    def git(*args: str, env: Optional[Dict[str, str]] = None) -> str:
+        return subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            capture_output=True,
+            check=True,
+            env=env,
+        ).stdout.decode(errors="surrogateescape")
+
+    top = Path(git("rev-parse", "--show-toplevel").strip())
+    ref = git("rev-parse", "HEAD").strip()
+    common = Path(
+        git("rev-parse", "--path-format=absolute", "--git-common-dir").strip()
+    )
+    subdir = os.path.relpath(cwd.resolve(), top.resolve())
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "GIT_INDEX_FILE": str(Path(tmp) / "index")}
+        git("read-tree", "HEAD", env=env)
+        git("add", "-A", ":/", env=env)
+        tree = git("write-tree", env=env).strip()
+        patch = git("diff", "--cached", "--binary", "HEAD", env=env)
+    return top, ref, tree, patch, "" if subdir == "." else subdir, str(common.parent)
+
+
+def _failed(
+    message: str, start: float, log_path: Optional[str], exit_code: int = 1
+) -> AttemptResult:
+    return AttemptResult(
+        stdout="",
+        stderr=message,
+        exit_code=exit_code,
+        duration_seconds=time.time() - start,
+        log_path=log_path,
+    )
@@ -0,0 +1,107 @@
+import json
+import re
+from typing import Any, Dict, Optional
+
+# Token fields reported by the CLIs we drive, mapped onto our own names
+_INPUT_KEYS = ("input_tokens", "prompt_tokens", "promptTokenCount")
+_OUTPUT_KEYS = ("output_tokens", "completion_tokens", "candidatesTokenCount")
+_CACHE_KEYS = (
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "cachedContentTokenCount",
+)
+_TOTAL_KEYS = ("total_tokens", "totalTokenCount")
+_COST_KEYS = ("total_cost_usd", "cost_usd")
+# Per-message events of streamed JSON output (claude stream-json); their
+# usage is for one message, the run's totals come in the `result` event
+_MESSAGE_EVENTS = {"system", "assistant", "user"}
+
+# Plain-text summaries such as "Total tokens: 1,234" or "Total cost: $0.05"
+_TEXT_TOKENS_RE = re.compile(r"\btotal tokens?\W+([\d,]+)", re.IGNORECASE)
+_TEXT_COST_RE = re.compile(r"\btotal cost\W+\$\s*([\d.]+)", re.IGNORECASE)
+
+
+class UsageParser:
+    """
+    Picks token usage and cost out of an agent's output, line by line.
+
+    Understands JSON result objects (Anthropic/OpenAI style `usage`, Gemini
+    style `usageMetadata`, a top-level `total_cost_usd`, the `result` event
+    of streamed JSON) and plain-text "Total tokens"/"Total cost" summaries.
+    Later reports replace earlier ones, since CLIs print cumulative totals.
+    """
+
+    def __init__(self) -> None:
+        self.usage: Dict[str, float] = {}
+
+    def feed(self, line: str):
+        stripped = line.strip()
+        if stripped.startswith("{"):
+            try:
+                data = json.loads(stripped)
+            except ValueError:
+                return
+            if isinstance(data, dict):
+                self._from_json(data)
+            return
+        if "total" not in stripped.lower():
+            return
+        tokens = _TEXT_TOKENS_RE.search(stripped)
+        if tokens:
+            self.usage["total_tokens"] = float(tokens.group(1).replace(",", ""))
+        cost = _TEXT_COST_RE.search(stripped)
+        if cost:
+            try:
+                self.usage["cost_usd"] = float(cost.group(1))
+            except ValueError:
+                pass
+
+    def _from_json(self, data: Dict[str, Any]):
+        if data.get("type") in _MESSAGE_EVENTS:
+            return
+        for key in _COST_KEYS:
+            if isinstance(data.get(key), (int, float)):
+                self.usage["cost_usd"] = float(data[key])
+        usage = data.get("usage") or data.get("usageMetadata")
+        if not isinstance(usage, dict):
+            return
+        found = {
+            "input_tokens": _first(usage, _INPUT_KEYS),
+            "output_tokens": _first(usage, _OUTPUT_KEYS),
+            "cache_tokens": _sum(usage, _CACHE_KEYS),
+            "total_tokens": _first(usage, _TOTAL_KEYS),
+        }
+        if found["total_tokens"] is None and (
+            found["input_tokens"] is not None or found["output_tokens"] is not None
+        ):
+            found["total_tokens"] = sum(
+                found[k] or 0.0
+                for k in ("input_tokens", "output_tokens", "cache_tokens")
+            )
+        self.usage.update({k: v for k, v in found.items() if v is not None})
+
+    def cost_info(self, estimate: Dict[str, Any]) -> Dict[str, Any]:
+        """Reported usage if any was seen, else the caller's estimate."""
+        if self.usage:
+            return {**self.usage, "source": "reported"}
+        return {**estimate, "source": "estimated"}
+
+
+def _first(data: Dict[str, Any], keys) -> Optional[float]:
+    for key in keys:
+        if isinstance(data.get(key), (int, float)):
+            return float(data[key])
+    return None
+
+
+def _sum(data: Dict[str, Any], keys) -> Optional[float]:
+    values = [float(data[k]) for k in keys if isinstance(data.get(k), (int, float))]
+    return sum(values) if values else None
+
+
+def total_tokens(cost_info: Dict[str, Any]) -> float:
+    """Tokens a future consumed, reported or estimated."""
+    for key in ("total_tokens", "estimated_tokens"):
+        if cost_info.get(key) is not None:
+            return float(cost_info[key])
+    return 0.0
@@ -0,0 +1,22 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+
+def default_cache_dir() -> Path:
+    """
+    Directory for caches shared between runs.
+
+    Honours FUTURE_RALPH_CACHE_DIR, then XDG_CACHE_HOME, and falls back to
+    ~/.cache/future-ralph.
+    """
+    override = os.environ.get("FUTURE_RALPH_CACHE_DIR")
+    if override:
+        return Path(override)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "future-ralph"
+
+
+def resolve_cache_dir(cache_dir: Optional[str] = None) -> Path:
+    return Path(cache_dir) if cache_dir else default_cache_dir()
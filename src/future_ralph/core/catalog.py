@@ -0,0 +1,381 @@
+import itertools
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from future_ralph.core.retention import iter_run_lines
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    prompt TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    best_future TEXT,
+    best_score REAL,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    futures INTEGER NOT NULL DEFAULT 0,
+    tokens REAL NOT NULL DEFAULT 0,
+    cost_usd REAL NOT NULL DEFAULT 0,
+    repo TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, id);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started_at);
+CREATE TABLE IF NOT EXISTS futures (
+    run_id TEXT NOT NULL,
+    future_id TEXT NOT NULL,
+    tool TEXT,
+    status TEXT NOT NULL,
+    score REAL,
+    exit_code INTEGER,
+    started_at REAL,
+    finished_at REAL,
+    duration REAL,
+    tokens REAL,
+    cost_usd REAL,
+    diff_ref TEXT,
+    insertions INTEGER,
+    deletions INTEGER,
+    PRIMARY KEY (run_id, future_id)
+);
+CREATE INDEX IF NOT EXISTS futures_tool ON futures (tool, status);
+"""
+
+# Events that change catalog state; everything else is ignored cheaply
+TRACKED_EVENTS = {
+    "run_started",
+    "iteration_started",
+    "iteration_completed",
+    "iteration_failed",
+    "iteration_cancelled",
+    "best_future_selected",
+    "run_completed",
+}
+
+
+@dataclass
+class RunRecord:
+    id: str
+    prompt: Optional[str]
+    status: str
+    best_future: Optional[str]
+    best_score: Optional[float]
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    duration: Optional[float]
+    futures: int
+    tokens: float
+    cost_usd: float
+    repo: Optional[str] = None
+
+
+@dataclass
+class FutureRecord:
+    run_id: str
+    future_id: str
+    tool: Optional[str]
+    status: str
+    score: Optional[float]
+    exit_code: Optional[int]
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    duration: Optional[float]
+    tokens: Optional[float]
+    cost_usd: Optional[float]
+    diff_ref: Optional[str] = None
+    insertions: Optional[int] = None
+    deletions: Optional[int] = None
+
+
+@dataclass
+class ToolStats:
+    """Outcome totals for one tool across finished futures."""
+
+    attempts: int = 0
+    successes: int = 0
+    mean_duration: Optional[float] = None
+    mean_cost_usd: Optional[float] = None
+
+
+def _tokens(cost: Dict[str, Any]) -> Optional[float]:
+    for key in ("total_tokens", "estimated_tokens"):
+        if cost.get(key) is not None:
+            return float(cost[key])
+    return None
+
+
+class RunCatalog:
+    """
+    SQLite index of runs and futures, kept next to the run directories.
+
+    It is derived entirely from `run.jsonl` events: `apply_event` folds one
+    event into the index, and `reindex` rebuilds it by replaying every log.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.db_path, timeout=30, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def apply_event(
+        self,
+        run_id: str,
+        event: str,
+        data: Dict[str, Any],
+        timestamp: float,
+    ):
+        if event not in TRACKED_EVENTS:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._apply(conn, run_id, event, data, timestamp)
+
+    def _apply(
+        self,
+        conn: sqlite3.Connection,
+        run_id: str,
+        event: str,
+        data: Dict[str, Any],
+        ts: float,
+    ):
+        conn.execute("INSERT OR IGNORE INTO runs (id) VALUES (?)", (run_id,))
+        if event == "run_started":
+            conn.execute(
+                "UPDATE runs SET prompt = ?, status = 'running', started_at = ?, "
+                "repo = ? WHERE id = ?",
+                (data.get("prompt"), ts, data.get("repo"), run_id),
+            )
+        elif event == "iteration_started":
+            future_id = data.get("future_id") or f"future_{data.get('year')}"
+            conn.execute(
+                "INSERT OR REPLACE INTO futures "
+                "(run_id, future_id, tool, status, started_at) "
+                "VALUES (?, ?, ?, 'running', ?)",
+                (run_id, future_id, data.get("tool"), ts),
+            )
+            conn.execute(
+                "UPDATE runs SET futures = "
+                "(SELECT COUNT(*) FROM futures WHERE run_id = ?) WHERE id = ?",
+                (run_id, run_id),
+            )
+        elif event == "iteration_completed":
+            cost = data.get("cost") or {}
+            stats = data.get("diff_stats") or {}
+            conn.execute(
+                "UPDATE futures SET status = 'completed', score = ?, exit_code = ?, "
+                "finished_at = ?, duration = COALESCE(?, ? - started_at), "
+                "tokens = ?, cost_usd = ?, diff_ref = ?, insertions = ?, "
+                "deletions = ? WHERE run_id = ? AND future_id = ?",
+                (
+                    data.get("score"),
+                    data.get("exit_code"),
+                    ts,
+                    data.get("duration_seconds"),
+                    ts,
+                    _tokens(cost),
+                    cost.get("cost_usd"),
+                    data.get("diff_ref"),
+                    stats.get("insertions"),
+                    stats.get("deletions"),
+                    run_id,
+                    data.get("future_id"),
+                ),
+            )
+            _update_run_totals(conn, run_id)
+        elif event == "iteration_failed":
+            conn.execute(
+                "UPDATE futures SET status = 'failed', finished_at = ? "
+                "WHERE run_id = ? AND future_id = ?",
+                (ts, run_id, data.get("future_id")),
+            )
+        elif event == "iteration_cancelled":
+            cost = data.get("cost") or {}
+            conn.execute(
+                "UPDATE futures SET status = 'skipped', finished_at = ?, "
+                "duration = ?, tokens = ?, cost_usd = ? "
+                "WHERE run_id = ? AND future_id = ?",
+                (
+                    ts,
+                    data.get("duration_seconds"),
+                    _tokens(cost),
+                    cost.get("cost_usd"),
+                    run_id,
+                    data.get("future_id"),
+                ),
+            )
+            _update_run_totals(conn, run_id)
+        elif event == "best_future_selected":
+            conn.execute(
+                "UPDATE runs SET best_future = ?, best_score = ? WHERE id = ?",
+                (data.get("future_id"), data.get("score"), run_id),
+            )
+        elif event == "run_completed":
+            conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ?, "
+                "duration = COALESCE(?, ? - started_at) WHERE id = ?",
+                (
+                    data.get("status", "completed"),
+                    ts,
+                    data.get("duration_seconds"),
+                    ts,
+                    run_id,
+                ),
+            )
+
+    def list_runs(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[RunRecord]:
+        """Runs, newest first, optionally filtered by status and paginated."""
+        sql = "SELECT * FROM runs"
+        params: List[Any] = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        params.extend([limit if limit is not None else -1, offset])
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [RunRecord(*row) for row in rows]
+
+    def get_run(self, run_id: str) -> Optional[RunRecord]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT * FROM runs WHERE id = ?", (run_id,))
+                .fetchone()
+            )
+        return RunRecord(*row) if row else None
+
+    def futures(self, run_id: str) -> List[FutureRecord]:
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT * FROM futures WHERE run_id = ? ORDER BY future_id",
+                    (run_id,),
+                )
+                .fetchall()
+            )
+        return [FutureRecord(*row) for row in rows]
+
+    def find_future(
+        self, future_id: str, run_id: Optional[str] = None
+    ) -> Optional[FutureRecord]:
+        """A future by id, from `run_id` or else the most recent run that has it."""
+        sql = "SELECT * FROM futures WHERE future_id = ?"
+        params: List[Any] = [future_id]
+        if run_id is not None:
+            sql += " AND run_id = ?"
+            params.append(run_id)
+        sql += " ORDER BY run_id DESC LIMIT 1"
+        with self._lock:
+            row = self._connect().execute(sql, params).fetchone()
+        return FutureRecord(*row) if row else None
+
+    def tool_stats(self, repo: Optional[str] = None) -> Dict[str, ToolStats]:
+        """
+        Per-tool outcomes of finished futures, optionally limited to runs
+        against `repo`. A future succeeded if its tests passed.
+        """
+        sql = (
+            "SELECT f.tool, COUNT(*), SUM(f.exit_code = 0), AVG(f.duration), "
+            "AVG(f.cost_usd) FROM futures f JOIN runs r ON r.id = f.run_id "
+            "WHERE f.status IN ('completed', 'failed') AND f.tool IS NOT NULL"
+        )
+        params: List[Any] = []
+        if repo is not None:
+            sql += " AND r.repo = ?"
+            params.append(repo)
+        sql += " GROUP BY f.tool"
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return {
+            tool: ToolStats(attempts, successes or 0, duration, cost)
+            for tool, attempts, successes, duration, cost in rows
+        }
+
+    def delete_run(self, run_id: str):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM futures WHERE run_id = ?", (run_id,))
+                conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+    def reindex(self, base_dir: Path) -> int:
+        """
+        Rebuild the catalog from every `run.jsonl` under `base_dir`,
+        including those of compacted runs.
+        """
+        count = 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("DELETE FROM futures")
+                conn.execute("DELETE FROM runs")
+                for run_dir in sorted(base_dir.iterdir()):
+                    if not run_dir.is_dir():
+                        continue
+                    entries = _read_events(iter_run_lines(run_dir, "run.jsonl"))
+                    first = next(entries, None)
+                    if first is None:
+                        continue
+                    count += 1
+                    conn.execute(
+                        "INSERT OR IGNORE INTO runs (id) VALUES (?)", (run_dir.name,)
+                    )
+                    for entry in itertools.chain([first], entries):
+                        if entry.get("event") in TRACKED_EVENTS:
+                            self._apply(
+                                conn,
+                                run_dir.name,
+                                entry["event"],
+                                entry.get("data") or {},
+                                entry.get("timestamp") or 0.0,
+                            )
+        return count
+
+
+def _update_run_totals(conn: sqlite3.Connection, run_id: str):
+    conn.execute(
+        "UPDATE runs SET "
+        "tokens = (SELECT COALESCE(SUM(tokens), 0) FROM futures WHERE run_id = ?), "
+        "cost_usd = (SELECT COALESCE(SUM(cost_usd), 0) FROM futures "
+        "WHERE run_id = ?) WHERE id = ?",
+        (run_id, run_id, run_id),
+    )
+
+
+def _read_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # A torn final line from a crashed writer
+            continue
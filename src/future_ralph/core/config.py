@@ -2,6 +2,7 @@ import yaml
 from pathlib import Path
 from typing import Optional
 from pydantic import BaseModel, ConfigDict
+from future_ralph.core.models import PipelineStage
 
 
 class RalphConfig(BaseModel):
@@ -10,6 +11,40 @@ class RalphConfig(BaseModel):
     test_cmd: str = "pytest"
     stop_on_success: bool = True
     active_tools: list[str] = []
+    max_parallel: int = 1
+    adapter_concurrency: dict[str, int] = {}
+    workspace_mode: str = "auto"
+    test_selection: bool = False
+    test_stages: list[PipelineStage] = []
+    cache_dir: Optional[str] = None
+    result_cache: bool = False
+    result_cache_max_mb: int = 512
+    verdict_cache: bool = False
+    test_results: bool = False
+    scheduler: str = "bandit"
+    token_prices: dict[str, float] = {}
+    budget_tokens: Optional[float] = None
+    budget_usd: Optional[float] = None
+    budget_seconds: Optional[float] = None
+    speculative: bool = False
+    limit_cpu_seconds: Optional[int] = None
+    limit_memory_mb: Optional[int] = None
+    limit_open_files: Optional[int] = None
+    refine: bool = False
+    refine_max_chars: int = 2000
+    context_pack: bool = False
+    context_pack_max_chars: int = 6000
+    daemon_max_concurrent: int = 2
+    # Shared directory of a worker queue; when set, agents run on workers
+    worker_queue: Optional[str] = None
+    worker_repo: Optional[str] = None
+    # Run retention, applied by `gc` and after every run when auto_gc is set
+    auto_gc: bool = False
+    retention_max_age_days: Optional[float] = None
+    retention_max_total_mb: Optional[float] = None
+    retention_keep_best: int = 0
+    log_fsync: str = "never"  # never, batch, always
+    log_flush_interval: float = 0.0
 
     model_config = ConfigDict(extra="ignore")
 
@@ -0,0 +1,271 @@
+import ast
+import json
+import os
+import re
+import subprocess
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from future_ralph.core.selection import SKIP_DIRS, tree_revision
+
+CONTEXT_VERSION = 1
+
+# Files larger than this are listed but not scanned for symbols
+MAX_SCAN_BYTES = 256 * 1024
+# Most files indexed per repository
+MAX_FILES = 20_000
+# Commits shown in the pack
+HISTORY_COMMITS = 10
+# Files shown as likely relevant, and symbols shown per file
+RELEVANT_FILES = 12
+SYMBOLS_PER_FILE = 12
+
+# Definitions in languages other than Python, found line by line
+_SYMBOL_RE = re.compile(
+    r"^\s*(?:export\s+)?(?:default\s+)?(?:pub(?:\(\w+\))?\s+)?(?:async\s+)?"
+    r"(?:function|class|def|func|fn|struct|interface|trait|enum|type)\s+"
+    r"([A-Za-z_]\w*)",
+    re.MULTILINE,
+)
+_SOURCE_SUFFIXES = {
+    ".js",
+    ".jsx",
+    ".ts",
+    ".tsx",
+    ".go",
+    ".rs",
+    ".rb",
+    ".java",
+    ".kt",
+    ".swift",
+    ".scala",
+}
+_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+# Words too common in prompts and paths to say anything about relevance
+_STOPWORDS = {
+    "the",
+    "and",
+    "for",
+    "with",
+    "that",
+    "this",
+    "from",
+    "into",
+    "when",
+    "should",
+    "make",
+    "add",
+    "fix",
+    "use",
+    "not",
+    "src",
+    "lib",
+    "test",
+    "tests",
+    "py",
+    "init",
+}
+
+
+def _words(text: str) -> Set[str]:
+    """Lower-cased words of identifiers and prose (camelCase and snake_case split)."""
+    words = {w.lower() for w in _WORD_RE.findall(text)}
+    return {w for w in words if len(w) >= 3 and w not in _STOPWORDS}
+
+
+class ContextIndex:
+    """
+    What an agent would otherwise spend its first minutes finding out about
+    a repository: its files, the symbols they define and recent history.
+
+    Built once per source revision and cached; `render` turns it into a
+    compact, size-bounded pack for one prompt.
+    """
+
+    def __init__(
+        self,
+        files: List[str],
+        symbols: Dict[str, List[str]],
+        history: List[str],
+    ):
+        self.files = files
+        self.symbols = symbols
+        self.history = history
+
+    @classmethod
+    def build(cls, root: Path) -> "ContextIndex":
+        files = _list_files(root)[:MAX_FILES]
+        symbols = {}
+        for rel in files:
+            found = _symbols(root / rel)
+            if found:
+                symbols[rel] = found
+        return cls(files, symbols, _history(root))
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "version": CONTEXT_VERSION,
+                "files": self.files,
+                "symbols": self.symbols,
+                "history": self.history,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> "ContextIndex":
+        data = json.loads(text)
+        if data.get("version") != CONTEXT_VERSION:
+            raise ValueError("Outdated context index")
+        return cls(data["files"], data["symbols"], data["history"])
+
+    def relevant(self, prompt: str, limit: int = RELEVANT_FILES) -> List[str]:
+        """Files ranked by how many of the prompt's words they mention."""
+        wanted = _words(prompt)
+        if not wanted:
+            return []
+        scored = []
+        for rel in self.files:
+            path_hits = len(wanted & _words(rel))
+            symbol_hits = len(wanted & _words(" ".join(self.symbols.get(rel, []))))
+            score = 3 * path_hits + symbol_hits
+            if score:
+                scored.append((-score, rel.count("/"), rel))
+        return [rel for _, _, rel in sorted(scored)[:limit]]
+
+    def render(self, prompt: str, max_chars: int) -> str:
+        """The context pack for `prompt`, at most `max_chars` long."""
+        sections = []
+        relevant = self.relevant(prompt)
+        if relevant:
+            lines = ["Files likely relevant to the task:"]
+            for rel in relevant:
+                names = self.symbols.get(rel, [])[:SYMBOLS_PER_FILE]
+                lines.append(f"  {rel}: {', '.join(names)}" if names else f"  {rel}")
+            sections.append(lines)
+        if self.history:
+            sections.append(["Recent commits:", *(f"  {c}" for c in self.history)])
+        sections.append([f"Layout ({len(self.files)} files):", *_layout(self.files)])
+
+        text = "Repository context (precomputed; verify before relying on it):"
+        for lines in sections:
+            for i, line in enumerate(lines):
+                addition = ("\n\n" if i == 0 else "\n") + line
+                if len(text) + len(addition) > max_chars:
+                    return text
+                text += addition
+        return text
+
+
+def _list_files(root: Path) -> List[str]:
+    try:
+        proc = subprocess.run(
+            # Tracked files only: the cache key (`tree_revision`) ignores
+            # untracked ones, so an index listing them could go stale
+            ["git", "ls-files", "-z", "--cached"],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        proc = None
+    if proc is not None and proc.returncode == 0:
+        return sorted(
+            rel
+            for rel in proc.stdout.split("\0")
+            if rel and not SKIP_DIRS.intersection(rel.split("/")[:-1])
+        )
+
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")
+        ]
+        for filename in filenames:
+            rel = os.path.relpath(os.path.join(dirpath, filename), root)
+            files.append(rel.replace(os.sep, "/"))
+    return sorted(files)
+
+
+def _symbols(path: Path) -> List[str]:
+    suffix = path.suffix
+    if suffix != ".py" and suffix not in _SOURCE_SUFFIXES:
+        return []
+    try:
+        if path.stat().st_size > MAX_SCAN_BYTES:
+            return []
+        source = path.read_text(errors="replace")
+    except OSError:
+        return []
+    if suffix != ".py":
+        return list(dict.fromkeys(_SYMBOL_RE.findall(source)))
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+    names = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.append(node.name)
+        elif isinstance(node, ast.ClassDef):
+            names.append(node.name)
+            names.extend(
+                f"{node.name}.{item.name}"
+                for item in node.body
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
+                and not item.name.startswith("__")
+            )
+    return names
+
+
+def _history(root: Path) -> List[str]:
+    try:
+        proc = subprocess.run(
+            ["git", "log", f"-{HISTORY_COMMITS}", "--format=%h %s", "--", "."],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return []
+    return proc.stdout.splitlines() if proc.returncode == 0 else []
+
+
+def _layout(files: List[str], depth: int = 2) -> List[str]:
+    """Directories down to `depth`, with how many files each holds."""
+    counts: Counter = Counter()
+    top_files = []
+    for rel in files:
+        parts = rel.split("/")
+        if len(parts) == 1:
+            top_files.append(rel)
+            continue
+        for level in range(1, min(depth, len(parts) - 1) + 1):
+            counts["/".join(parts[:level]) + "/"] += 1
+    lines = [f"  {d} ({n} files)" for d, n in sorted(counts.items())]
+    lines.extend(f"  {rel}" for rel in top_files)
+    return lines
+
+
+def load_context_index(root: Path, cache_dir: Path) -> ContextIndex:
+    """Build the context index for `root`, cached per git tree revision."""
+    revision = tree_revision(root)
+    cache_file = cache_dir / "context" / f"{revision}.json"
+    if revision and cache_file.exists():
+        try:
+            return ContextIndex.from_json(cache_file.read_text())
+        except (ValueError, KeyError):
+            pass
+
+    index = ContextIndex.build(root)
+    if revision:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(index.to_json())
+        os.replace(tmp, cache_file)
+    return index
+
+
+def with_context(prompt: str, pack: Optional[str]) -> str:
+    """The prompt sent to agents: the task, then the context pack."""
+    return f"{prompt}\n\n{pack}" if pack else prompt
@@ -0,0 +1,344 @@
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+SOCKET_FILE = "daemon.sock"
+QUEUE_FILE = "queue.sqlite"
+
+QUEUE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    max_iters INTEGER,
+    rescan INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+# Seconds a client waits for the daemon to answer
+REQUEST_TIMEOUT = 5.0
+
+
+class DaemonError(Exception):
+    """The daemon is not reachable, or refused a request."""
+
+
+@dataclass
+class Job:
+    id: int
+    run_id: str
+    prompt: str
+    max_iters: Optional[int]
+    rescan: bool
+    status: str
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class JobQueue:
+    """
+    Detached runs waiting for (or held by) the daemon, in SQLite next to
+    the run directories so queued runs survive a daemon restart.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.db_path, timeout=30, check_same_thread=False, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(QUEUE_SCHEMA)
+            conn.row_factory = sqlite3.Row
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def put(
+        self,
+        run_id: str,
+        prompt: str,
+        max_iters: Optional[int] = None,
+        rescan: bool = False,
+    ) -> Job:
+        with self._lock:
+            cursor = self._connect().execute(
+                "INSERT INTO jobs (run_id, prompt, max_iters, rescan, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, prompt, max_iters, int(rescan), time.time()),
+            )
+            job_id = cursor.lastrowid
+        job = self.get(job_id or 0)
+        assert job is not None
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            row = (
+                self._connect()
+                .execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+                .fetchone()
+            )
+        return _job(row) if row else None
+
+    def claim(self) -> Optional[Job]:
+        """Mark the oldest queued job as running and return it."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                    (now, row["id"]),
+                )
+        job = _job(row)
+        job.status, job.started_at = "running", now
+        return job
+
+    def finish(self, job_id: int, error: Optional[str] = None):
+        with self._lock:
+            self._connect().execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                ("failed" if error else "done", time.time(), error, job_id),
+            )
+
+    def jobs(self, status: str) -> List[Job]:
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute("SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,))
+                .fetchall()
+            )
+        return [_job(row) for row in rows]
+
+    def recover(self) -> List[Job]:
+        """
+        Jobs a previous daemon was running when it died. They are marked
+        failed: their runs already logged progress and cannot be resumed.
+        """
+        stale = self.jobs("running")
+        for job in stale:
+            job.status, job.error = "failed", "daemon stopped before the run finished"
+            self.finish(job.id, job.error)
+        return stale
+
+
+def _job(row: sqlite3.Row) -> Job:
+    data = dict(row)
+    data["rescan"] = bool(data["rescan"])
+    return Job(**data)
+
+
+class Daemon:
+    """
+    Runs detached jobs from a `JobQueue`, at most `max_concurrent` at a
+    time, in one long-lived process so imports, tool detection and loaded
+    adapters are shared between runs.
+
+    Clients talk to it over a Unix socket in the runs directory, one JSON
+    request and one JSON response per connection (see `request`):
+
+    - `{"op": "ping"}`
+    - `{"op": "submit", "run_id", "prompt", "max_iters", "rescan"}`
+    - `{"op": "status"}`: the running and queued jobs
+    - `{"op": "stop"}`: stop taking jobs, finish running ones, then exit
+
+    `execute` is called in a worker thread for each job; an exception
+    marks the job failed. Jobs a previous daemon left running are handed
+    to `on_interrupted` at startup.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        execute: Callable[[Job], None],
+        max_concurrent: int = 2,
+        on_interrupted: Optional[Callable[[Job], None]] = None,
+    ):
+        self.socket_path = base_dir / SOCKET_FILE
+        self.queue = JobQueue(base_dir / QUEUE_FILE)
+        self.execute = execute
+        self.on_interrupted = on_interrupted
+        self.max_concurrent = max(max_concurrent, 1)
+        self._cond = threading.Condition()
+        self._running: Dict[int, threading.Thread] = {}
+        self._stopping = False
+        self._server: Optional[_Server] = None
+
+    def serve_forever(self):
+        """Serve until a `stop` request; returns once running jobs are done."""
+        self._bind()
+        assert self._server is not None
+        # Only now is it certain no other daemon owns the running jobs
+        for job in self.queue.recover():
+            if self.on_interrupted is not None:
+                self.on_interrupted(job)
+        listener = threading.Thread(
+            target=self._server.serve_forever, name="daemon-socket", daemon=True
+        )
+        listener.start()
+        try:
+            self._dispatch()
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+            self.queue.close()
+
+    def stop(self):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    def handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "submit":
+            with self._cond:
+                if self._stopping:
+                    return {"ok": False, "error": "daemon is stopping"}
+            job = self.queue.put(
+                message["run_id"],
+                message["prompt"],
+                message.get("max_iters"),
+                bool(message.get("rescan")),
+            )
+            with self._cond:
+                self._cond.notify_all()
+            return {"ok": True, "job": asdict(job)}
+        if op == "status":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "max_concurrent": self.max_concurrent,
+                "running": [asdict(job) for job in self.queue.jobs("running")],
+                "queued": [asdict(job) for job in self.queue.jobs("queued")],
+            }
+        if op == "stop":
+            self.stop()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown request: {op}"}
+
+    def _bind(self):
+        if self.socket_path.exists():
+            try:
+                request(self.socket_path, {"op": "ping"})
+            except DaemonError:
+                # Left behind by a daemon that did not shut down cleanly
+                self.socket_path.unlink()
+            else:
+                raise DaemonError(
+                    f"A daemon is already listening on {self.socket_path}"
+                )
+
+        self._server = _Server(str(self.socket_path), _Handler)
+        self._server.owner = self
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                while not self._stopping and len(self._running) >= self.max_concurrent:
+                    self._cond.wait()
+                if self._stopping:
+                    break
+            job = self.queue.claim()
+            if job is None:
+                with self._cond:
+                    if not self._stopping:
+                        # Woken by `submit`; the timeout is only a safety net
+                        self._cond.wait(timeout=1.0)
+                continue
+            worker = threading.Thread(
+                target=self._work, args=(job,), name=f"daemon-job-{job.id}"
+            )
+            with self._cond:
+                self._running[job.id] = worker
+            worker.start()
+
+        for worker in list(self._running.values()):
+            worker.join()
+
+    def _work(self, job: Job):
+        error = None
+        try:
+            self.execute(job)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            self.queue.finish(job.id, error)
+            with self._cond:
+                self._running.pop(job.id, None)
+                self._cond.notify_all()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    owner: Daemon
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: _Server
+
+    def handle(self):
+        try:
+            message = json.loads(self.rfile.readline())
+            response = self.server.owner.handle(message)
+        except Exception as e:
+            response = {"ok": False, "error": str(e)}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def request(
+    socket_path: Path, message: Dict[str, Any], timeout: float = REQUEST_TIMEOUT
+) -> Dict[str, Any]:
+    """Send one request to the daemon; raises DaemonError if that fails."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+    except OSError as e:
+        raise DaemonError(f"Daemon not reachable at {socket_path}: {e}") from e
+    try:
+        response = json.loads(line)
+    except ValueError:
+        raise DaemonError("Malformed response from daemon") from None
+    if not response.get("ok"):
+        raise DaemonError(response.get("error") or "Request failed")
+    return response
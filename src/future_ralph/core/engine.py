@@ -1,17 +1,147 @@
-import subprocess
-from typing import List
-from future_ralph.core.models import Future, FutureStatus, RunConfig
+import contextlib
+import dataclasses
+import hashlib
+import json
+import os
+import shlex
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, ContextManager, Dict, List, Optional
+from future_ralph.core.cache import resolve_cache_dir
+from future_ralph.core.context import load_context_index, with_context
+from future_ralph.core.feedback import FailureLog, with_feedback
+from future_ralph.core.models import (
+    CaseResult,
+    Future,
+    FutureStatus,
+    PipelineStage,
+    RunConfig,
+)
+from future_ralph.core import outcomes
+from future_ralph.core.outcomes import REPORT_ENV, report_command
+from future_ralph.core.patches import PatchStore, diff_stats
+from future_ralph.core.result_cache import (
+    ResultCache,
+    diff_hash,
+    result_key,
+    verdict_key,
+)
 from future_ralph.core.run_manager import Run
+from future_ralph.core.scheduler import BaseScheduler, create_scheduler
 from future_ralph.core.scoring import DefaultScoringPolicy
-from future_ralph.adapters.base import BaseAdapter
+from future_ralph.core.selection import ImportGraph, load_import_graph
+from future_ralph.core.tracing import ITERATION_SPAN, RUN_SPAN
+from future_ralph.core.workspace import Workspace, WorkspaceError, WorkspaceManager
+from future_ralph.adapters.usage import total_tokens
+from future_ralph.adapters.base import (
+    CANCELLED_EXIT_CODE,
+    AttemptResult,
+    BaseAdapter,
+    CommandResult,
+    OutputCallback,
+    OutputEvent,
+    ResourceLimits,
+    run_shell,
+)
+
+# Minimum seconds between two `agent_progress` events for the same future
+PROGRESS_INTERVAL = 1.0
+
+
+def _add_resources(total: Dict[str, float], more: Dict[str, float]):
+    """Fold one command's resource use into a future's: peak memory, CPU time."""
+    if "peak_rss_mb" in more:
+        total["peak_rss_mb"] = max(total.get("peak_rss_mb", 0.0), more["peak_rss_mb"])
+    if "cpu_seconds" in more:
+        total["cpu_seconds"] = total.get("cpu_seconds", 0.0) + more["cpu_seconds"]
+
+
+def pipeline_stages(config: RunConfig) -> List[PipelineStage]:
+    """
+    The test pipeline a run uses: its stages, or just `test_cmd`. With
+    `test_results`, pytest commands also write a report of each test.
+    """
+    stages = config.test_stages or [
+        PipelineStage(name="tests", cmd=config.test_cmd, selectable=True)
+    ]
+    if config.test_results:
+        stages = [
+            dataclasses.replace(stage, cmd=report_command(stage.cmd))
+            for stage in stages
+        ]
+    return stages
+
+
+class _VerdictClaim:
+    """The test verdict for one diff hash, filled in by the future testing it."""
+
+    def __init__(self, future_id: str):
+        self.future_id = future_id
+        self.done = threading.Event()
+        self.verdict: Optional[Dict[str, Any]] = None
 
 
 class IterationEngine:
-    def __init__(self, run: Run, config: RunConfig):
+    def __init__(
+        self, run: Run, config: RunConfig, scheduler: Optional[BaseScheduler] = None
+    ):
         self.run = run
         self.config = config
         self.policy = DefaultScoringPolicy()
+        self.scheduler = scheduler or create_scheduler(config.scheduler)
         self.futures: List[Future] = []
+        self._lock = threading.Lock()
+        # Per-adapter caps on how many agent calls may be in flight at once
+        self._adapter_slots: Dict[str, threading.BoundedSemaphore] = {
+            name: threading.BoundedSemaphore(limit)
+            for name, limit in config.adapter_concurrency.items()
+            if limit > 0
+        }
+        self.workspaces = WorkspaceManager(
+            Path(config.repo_dir), run.dir / "workspaces", config.workspace_mode
+        )
+        self.patches = PatchStore(run.dir / "patches")
+        self._import_graph: Optional[ImportGraph] = None
+        self.result_cache: Optional[ResultCache] = None
+        if config.result_cache:
+            self.result_cache = ResultCache(
+                resolve_cache_dir(config.cache_dir) / "results",
+                config.result_cache_max_mb * 1024 * 1024,
+            )
+        self.verdict_cache: Optional[ResultCache] = None
+        if config.verdict_cache:
+            self.verdict_cache = ResultCache(
+                resolve_cache_dir(config.cache_dir) / "verdicts",
+                config.result_cache_max_mb * 1024 * 1024,
+            )
+        # Per-test results of the unchanged repository, cached per base tree
+        self.baseline_cache: Optional[ResultCache] = None
+        if config.test_results:
+            self.baseline_cache = ResultCache(
+                resolve_cache_dir(config.cache_dir) / "baselines",
+                config.result_cache_max_mb * 1024 * 1024,
+            )
+        self._baseline: Optional[Dict[str, CaseResult]] = None
+        self._baseline_lock = threading.Lock()
+        self._tool_samples: Dict[str, int] = {}
+        # What the run's agents have consumed so far, for budgets
+        self.spent_tokens = 0.0
+        self.spent_usd = 0.0
+        self._started: Optional[float] = None
+        self._budget_hit: Optional[str] = None
+        # Set once a speculative run has a passing future
+        self._cancel = threading.Event()
+        self._limits = ResourceLimits(
+            cpu_seconds=config.limit_cpu_seconds,
+            memory_mb=config.limit_memory_mb,
+            open_files=config.limit_open_files,
+        )
+        # Test verdicts of this run by diff hash, claimed by the first future
+        self._verdicts: Dict[str, _VerdictClaim] = {}
+        # Why earlier futures failed, for later prompts in refinement mode
+        self.failures = FailureLog()
 
     def run_iteration(
         self, iteration: int, adapter: BaseAdapter, prompt: str
@@ -19,37 +149,132 @@ class IterationEngine:
         year = 2000 + (iteration * 10)
         future_id = f"future_{year}"
         future = Future(id=future_id, year=year, tool_name=adapter.capabilities().name)
-        self.futures.append(future)
+        with self._lock:
+            self.futures.append(future)
 
         self.run.logger.log(
             "iteration_started",
-            {"iteration": iteration, "year": year, "tool": future.tool_name},
+            {
+                "future_id": future.id,
+                "iteration": iteration,
+                "year": year,
+                "tool": future.tool_name,
+            },
         )
 
+        if self.config.refine:
+            prompt = self._refine(future, prompt)
+
+        with self.run.tracer.span(
+            ITERATION_SPAN, future.id, tool=future.tool_name
+        ) as span:
+            try:
+                return self._explore(future, adapter, prompt)
+            finally:
+                span["status"] = future.status.value
+
+    def _explore(self, future: Future, adapter: BaseAdapter, prompt: str) -> Future:
+        """Run, test and score one future; each phase is traced."""
+        tracer = self.run.tracer
         future.status = FutureStatus.RUNNING
+        started = time.time()
 
-        # 1. Run Agent
-        result = adapter.run(
-            prompt, cwd=str(self.run.dir), timeout=self.config.timeout_per_iter
-        )
-        future.result = result
+        # 0. Give the future its own checkout so it cannot clobber its siblings
+        try:
+            with tracer.span("workspace", future.id):
+                workspace = self.workspaces.create(future.id)
+        except WorkspaceError as e:
+            future.status = FutureStatus.FAILED
+            self.run.logger.log(
+                "iteration_failed", {"future_id": future.id, "error": str(e)}
+            )
+            return future
+        future.workspace = str(workspace.path)
 
-        # 2. Run Tests (in the directory where the agent made changes)
-        # Note: In v1, we assume the agent modified files in the current repo or a copy.
-        # For simplicity in this skeleton, we run the test command in the current CWD.
-        # test_start = time.time()
-        test_proc = subprocess.run(
-            self.config.test_cmd, shell=True, capture_output=True, text=True
-        )
-        # test_duration = time.time() - test_start
+        # 1. Run Agent (output streams to futures/<id>.log), unless an
+        # identical earlier future can be replayed from the result cache
+        with tracer.span("cache_lookup", future.id) as span:
+            cache_key = self._result_key(workspace, future.tool_name, prompt)
+            cached = self._restore_cached(future, workspace, cache_key)
+            span["hit"] = cached is not None
+        if cached is None:
+            log_dir = self.run.dir / "futures"
+            log_dir.mkdir(parents=True, exist_ok=True)
+            # Only speculative runs cancel, so other adapters need not support it
+            extra: Dict[str, Any] = {}
+            if self.config.speculative:
+                extra["cancel"] = self._cancel
+            waiting = time.time()
+            with self._adapter_slot(future.tool_name):
+                if future.tool_name in self._adapter_slots:
+                    tracer.record("slot_wait", waiting, time.time(), future.id)
+                if self._cancel.is_set():
+                    return self._skip(future, workspace, started)
+                with tracer.span("agent", future.id) as span:
+                    result = adapter.run(
+                        prompt,
+                        cwd=future.workspace,
+                        timeout=self._agent_timeout(),
+                        log_path=str(log_dir / f"{future.id}.log"),
+                        on_event=self._progress_reporter(future, time.time()),
+                        **extra,
+                    )
+                    span["exit_code"] = result.exit_code
+            future.result = result
+            with tracer.span("diff", future.id):
+                self._capture_diff(
+                    future,
+                    result.diff if result.diff is not None else workspace.diff(),
+                )
+                self._account(future)
+        assert future.result is not None
+        agent_exit_code = future.result.exit_code
+        if self._cancel.is_set():
+            return self._skip(future, workspace, started)
 
+        # 2. Run the test pipeline (in the workspace where the agent made changes)
         # Overwrite attempt exit code with test exit code if tests ran
         # This is a v1 simplification: success is defined by tests passing.
-        future.result.exit_code = test_proc.returncode
+        replayed = bool(cached and cached.get("pipeline") == self._pipeline_key())
+        # A remote worker already ran the full pipeline on the same checkout
+        remote = future.result.verdict
+        stages = [dataclasses.asdict(stage) for stage in self._pipeline()]
+        with tracer.span("tests", future.id, cached=replayed) as span:
+            if cached and replayed:
+                future.result.exit_code = self._apply_verdict(future, cached["tests"])
+            elif remote is not None and remote.get("stages") == stages:
+                span["remote"] = True
+                future.result.exit_code = self._apply_verdict(future, remote)
+            else:
+                future.result.exit_code = self._test_future(future, workspace)
+            if (
+                future.result.exit_code == 0
+                and future.metadata.get("pending_stages")
+                and (self.config.speculative or self.config.stop_on_success)
+            ):
+                # This future may end the run, so it must pass in full first
+                future.result.exit_code = self._run_pending_stages(future)
+            span["exit_code"] = future.result.exit_code
+        if future.result.exit_code == CANCELLED_EXIT_CODE:
+            return self._skip(future, workspace, started)
+        if not replayed and cache_key and agent_exit_code == 0:
+            self._store_result(cache_key, future, agent_exit_code, cached)
 
         # 3. Score
-        future.score = self.policy.score(future)
+        with tracer.span("score", future.id):
+            future.score = self._score(future)
         future.status = FutureStatus.COMPLETED
+        if self.config.refine and future.result.exit_code != 0:
+            self.failures.record(future)
+
+        if (
+            self.config.speculative
+            and future.result.exit_code == 0
+            and not self._cancel.is_set()
+        ):
+            # First passing future: the others can no longer win
+            self._cancel.set()
+            self.run.logger.log("speculation_won", {"future_id": future.id})
 
         self.run.logger.log(
             "iteration_completed",
@@ -57,30 +282,697 @@ class IterationEngine:
                 "future_id": future.id,
                 "score": future.score,
                 "exit_code": future.result.exit_code,
+                "duration_seconds": future.result.duration_seconds,
+                "cost": future.result.cost_info,
+                "diff_ref": future.result.diff_ref,
+                "diff_stats": future.result.diff_stats,
+                "resources": future.result.resources,
+                "tests": outcomes.summarize(future.tests) if future.tests else None,
+                "regressions": outcomes.regressions(future.tests, self.policy.baseline),
+                "duplicate_of": future.metadata.get("duplicate_of"),
             },
         )
 
         return future
 
     def execute_run(self, prompt: str, adapters: List[BaseAdapter]):
-        for i in range(1, self.config.max_iters + 1):
-            # Simple policy: cycle through adapters or just use the first for now
-            adapter = adapters[(i - 1) % len(adapters)]
+        start_time = self._started = time.time()
+        self.run.logger.log(
+            "run_configured",
+            {
+                "max_iters": self.config.max_iters,
+                "max_parallel": self.config.max_parallel,
+                "timeout_per_iter": self.config.timeout_per_iter,
+            },
+        )
+        for adapter in adapters:
+            adapter.limits = self._limits
+        tracer = self.run.tracer
+        with tracer.span(RUN_SPAN, parallel=self.config.max_parallel):
+            try:
+                if self.config.context_pack:
+                    with tracer.span("context_pack"):
+                        prompt = self._add_context(prompt)
+                if self.config.max_parallel > 1:
+                    self._execute_parallel(prompt, adapters)
+                else:
+                    self._execute_serial(prompt, adapters)
+                with tracer.span("select_best"):
+                    best = self._select_verified_best()
+            finally:
+                with tracer.span("cleanup"):
+                    self.workspaces.cleanup()
+
+        if best:
+            self.run.logger.log(
+                "best_future_selected", {"future_id": best.id, "score": best.score}
+            )
 
+        succeeded = bool(best and best.result and best.result.exit_code == 0)
+        self.run.logger.log(
+            "run_completed",
+            {
+                "status": "success" if succeeded else "failed",
+                "best_future_id": best.id if best else None,
+                "futures": len(self.futures),
+                "duration_seconds": time.time() - start_time,
+                "tokens": self.spent_tokens,
+                "cost_usd": self.spent_usd,
+                "budget_exhausted": self._budget_hit,
+            },
+        )
+
+        return best
+
+    def _add_context(self, prompt: str) -> str:
+        """
+        Append the repository's context pack to the prompt, built once per
+        source revision and shared by every future and tool.
+        """
+        source = self.workspaces.source
+        index = load_context_index(source, resolve_cache_dir(self.config.cache_dir))
+        pack = index.render(prompt, self.config.context_pack_max_chars)
+        self.run.logger.log(
+            "context_pack_built",
+            {
+                "files": len(index.files),
+                "relevant": index.relevant(prompt),
+                "chars": len(pack),
+            },
+        )
+        return with_context(prompt, pack)
+
+    def _refine(self, future: Future, prompt: str) -> str:
+        """
+        Add what went wrong in the run's failed futures so far to the
+        prompt, so the next attempt does not repeat it.
+        """
+        summary = self.failures.render(self.config.refine_max_chars)
+        if summary:
+            self.run.logger.log(
+                "prompt_refined",
+                {
+                    "future_id": future.id,
+                    "failures": len(self.failures),
+                    "chars": len(summary),
+                },
+            )
+        return with_feedback(prompt, summary)
+
+    def _execute_serial(self, prompt: str, adapters: List[BaseAdapter]):
+        for i in range(1, self.config.max_iters + 1):
+            if self._budget_exhausted():
+                break
+            adapter = self._schedule(adapters, i)
             future = self.run_iteration(i, adapter, prompt)
+            self.scheduler.record(future)
 
-            if (
-                future.result
-                and future.result.exit_code == 0
-                and self.config.stop_on_success
-            ):
+            if self._should_stop(future):
                 self.run.logger.log("run_success_stop", {"future_id": future.id})
                 break
 
-        best = self.policy.select_best(self.futures)
-        if best:
+    def _execute_parallel(self, prompt: str, adapters: List[BaseAdapter]):
+        """
+        Explore up to `max_parallel` futures at once.
+
+        In speculative mode the first future to pass cancels the others:
+        their agents are killed, their workspaces removed, and they are
+        recorded as skipped.
+
+        New iterations are only submitted while no future has succeeded and
+        budgets remain, so `stop_on_success` and budgets still bound the
+        work; futures already in flight are allowed to finish and take part
+        in `select_best`.
+        """
+        iterations = iter(range(1, self.config.max_iters + 1))
+        stopped = False
+
+        with ThreadPoolExecutor(
+            max_workers=self.config.max_parallel, thread_name_prefix="future"
+        ) as pool:
+            pending = set()
+
+            def submit_next() -> bool:
+                if self._budget_exhausted() or self._cancel.is_set():
+                    return False
+                i = next(iterations, None)
+                if i is None:
+                    return False
+                adapter = self._schedule(adapters, i)
+                pending.add(pool.submit(self.run_iteration, i, adapter, prompt))
+                return True
+
+            while len(pending) < self.config.max_parallel and submit_next():
+                pass
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    future = task.result()
+                    self.scheduler.record(future)
+                    if not stopped and self._should_stop(future):
+                        stopped = True
+                        self.run.logger.log(
+                            "run_success_stop", {"future_id": future.id}
+                        )
+
+                while (
+                    not stopped
+                    and len(pending) < self.config.max_parallel
+                    and submit_next()
+                ):
+                    pass
+
+        # Completion order is nondeterministic; keep futures in timeline order
+        self.futures.sort(key=lambda f: f.year)
+
+    def _account(self, future: Future):
+        """Price a future's usage if the tool did not, and add it to the run."""
+        assert future.result is not None
+        cost = future.result.cost_info
+        tokens = total_tokens(cost)
+        price = self.config.token_prices.get(future.tool_name)
+        if cost.get("cost_usd") is None and price is not None:
+            cost["cost_usd"] = tokens * price / 1_000_000
+        with self._lock:
+            self.spent_tokens += tokens
+            self.spent_usd += cost.get("cost_usd") or 0.0
+
+    def _budget_exhausted(self) -> bool:
+        """Whether a run budget is used up; logged the first time it is."""
+        elapsed = time.time() - (self._started or time.time())
+        with self._lock:
+            if self._budget_hit is None:
+                config = self.config
+                if config.budget_tokens is not None and (
+                    self.spent_tokens >= config.budget_tokens
+                ):
+                    self._budget_hit = "tokens"
+                elif config.budget_usd is not None and (
+                    self.spent_usd >= config.budget_usd
+                ):
+                    self._budget_hit = "usd"
+                elif config.budget_seconds is not None and (
+                    elapsed >= config.budget_seconds
+                ):
+                    self._budget_hit = "seconds"
+                else:
+                    return False
+                self.run.logger.log(
+                    "budget_exhausted",
+                    {
+                        "budget": self._budget_hit,
+                        "tokens": self.spent_tokens,
+                        "cost_usd": self.spent_usd,
+                        "elapsed_seconds": elapsed,
+                    },
+                )
+            return True
+
+    def _agent_timeout(self) -> int:
+        """The per-iteration timeout, cut short by the wall-clock budget."""
+        timeout = self.config.timeout_per_iter
+        if self.config.budget_seconds is not None and self._started is not None:
+            remaining = self.config.budget_seconds - (time.time() - self._started)
+            timeout = min(timeout, max(int(remaining), 1))
+        return timeout
+
+    def _schedule(self, adapters: List[BaseAdapter], iteration: int) -> BaseAdapter:
+        adapter = self.scheduler.choose(adapters, iteration)
+        self.run.logger.log(
+            "adapter_scheduled",
+            {
+                "iteration": iteration,
+                "tool": adapter.capabilities().name,
+                "scheduler": self.scheduler.name,
+            },
+        )
+        return adapter
+
+    def _select_verified_best(self) -> Optional[Future]:
+        """
+        Pick the best future, first running any test stages that were
+        deferred or narrowed for it. A candidate that fails one of them is
+        rescored and the next best is tried.
+        """
+        while True:
+            best = self.policy.select_best(self.futures)
+            if (
+                best is None
+                or best.result is None
+                or best.result.exit_code != 0
+                or not best.metadata.get("pending_stages")
+            ):
+                return best
+
+            exit_code = self._run_pending_stages(best)
+            if exit_code == 0:
+                return best
+            best.result.exit_code = exit_code
+            best.score = self._score(best)
+
+    def _run_pending_stages(self, future: Future) -> int:
+        """
+        Run the stages left in a future's `pending_stages` in full, stopping
+        at the first failure; returns its exit code, or 0.
+        """
+        stages = {stage.name: stage for stage in self._pipeline()}
+        for name in future.metadata.pop("pending_stages", []):
+            stage = stages[name]
+            exit_code = self._run_stage(future, stage, stage.cmd, future.workspace)
+            if exit_code != 0:
+                return exit_code
+        return 0
+
+    def _test_future(self, future: Future, workspace: Workspace) -> int:
+        """
+        Run the test pipeline for a future, unless a future with the same
+        diff was already tested in this run (or the shared verdict cache
+        knows the outcome), in which case that verdict is reused.
+        """
+        digest = future.metadata.get("diff_hash")
+        if digest is None:
+            return self._run_pipeline(future, workspace)
+
+        with self._lock:
+            claim = self._verdicts.get(digest)
+            if claim is None:
+                claim = self._verdicts[digest] = _VerdictClaim(future.id)
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            # Identical patch: wait for its first tester instead of re-testing
+            claim.done.wait()
+            if claim.verdict is not None:
+                future.metadata["duplicate_of"] = claim.future_id
+                self.run.logger.log(
+                    "future_duplicate",
+                    {
+                        "future_id": future.id,
+                        "duplicate_of": claim.future_id,
+                        "diff_hash": digest,
+                    },
+                )
+                return self._apply_verdict(future, claim.verdict)
+            return self._run_pipeline(future, workspace)
+
+        try:
+            exit_code = self._shared_verdict(future, workspace, digest)
+            if exit_code is None:
+                exit_code = self._run_pipeline(future, workspace)
+                if exit_code == CANCELLED_EXIT_CODE:
+                    # Interrupted, so no verdict: duplicates test for themselves
+                    return exit_code
+                self._store_verdict(future, workspace, digest, exit_code)
+            claim.verdict = self._verdict_of(future, exit_code)
+            return exit_code
+        finally:
+            claim.done.set()
+
+    def _shared_verdict(
+        self, future: Future, workspace: Workspace, digest: str
+    ) -> Optional[int]:
+        key = self._verdict_key(workspace, digest)
+        if key is None or self.verdict_cache is None:
+            return None
+        entry = self.verdict_cache.get(key)
+        if entry is None:
+            return None
+        future.metadata["verdict_cached"] = True
+        self.run.logger.log(
+            "verdict_cache_hit", {"future_id": future.id, "diff_hash": digest}
+        )
+        return self._apply_verdict(future, entry["tests"])
+
+    def _store_verdict(
+        self, future: Future, workspace: Workspace, digest: str, exit_code: int
+    ):
+        key = self._verdict_key(workspace, digest)
+        if key is not None and self.verdict_cache is not None:
+            self.verdict_cache.put(key, {"tests": self._verdict_of(future, exit_code)})
+
+    def _verdict_key(self, workspace: Workspace, digest: str) -> Optional[str]:
+        if workspace.base_tree is None:
+            return None
+        return verdict_key(workspace.base_tree, digest, self._pipeline_key())
+
+    def _verdict_of(self, future: Future, exit_code: int) -> Dict[str, Any]:
+        """
+        The test outcome of a future, as shared with its duplicates. Takes
+        the pipeline's exit code, since `future.result` still holds the
+        agent's until the caller records the test result.
+        """
+        return {
+            "exit_code": exit_code,
+            "test_stages": future.metadata.get("test_stages", []),
+            "pending_stages": future.metadata.get("pending_stages", []),
+            "tests": outcomes.encode(future.tests),
+        }
+
+    def _apply_verdict(self, future: Future, verdict: Dict[str, Any]) -> int:
+        """Adopt a test verdict produced elsewhere; returns its exit code."""
+        future.metadata["test_stages"] = list(verdict["test_stages"])
+        future.tests = outcomes.decode(verdict.get("tests"))
+        if verdict["pending_stages"]:
+            future.metadata["pending_stages"] = list(verdict["pending_stages"])
+        return verdict["exit_code"]
+
+    def _pipeline(self) -> List[PipelineStage]:
+        return pipeline_stages(self.config)
+
+    def _run_pipeline(self, future: Future, workspace: Workspace) -> int:
+        """
+        Run the eager test stages in order, stopping at the first failure.
+
+        Deferred stages, and the full form of narrowed stages, are left in
+        `pending_stages` and only run if this future is about to be selected.
+        """
+        pending: List[str] = []
+        for stage in self._pipeline():
+            if self._cancel.is_set():
+                return CANCELLED_EXIT_CODE
+            if stage.deferred:
+                pending.append(stage.name)
+                continue
+            cmd = stage.cmd
+            if stage.selectable:
+                narrowed = self._narrowed_command(future, workspace, stage.cmd)
+                if narrowed is not None:
+                    cmd = narrowed
+                    pending.append(stage.name)
+            exit_code = self._run_stage(future, stage, cmd, future.workspace)
+            if exit_code != 0:
+                # No longer promising: later stages would only confirm that
+                return exit_code
+        if pending:
+            future.metadata["pending_stages"] = pending
+        return 0
+
+    def _run_stage(
+        self, future: Future, stage: PipelineStage, cmd: str, cwd: Optional[str]
+    ) -> int:
+        start = time.time()
+        report = self._report_path(future.id, stage.name)
+        result = self._run_tests(cmd, cwd, stage.timeout, report)
+        end = time.time()
+        exit_code = result.exit_code
+        if future.result is not None:
+            _add_resources(future.result.resources, result.resources)
+        if exit_code != 0:
+            # Kept in memory only, for refinement prompts
+            future.metadata["failure_output"] = result.stdout + result.stderr
+        record: Dict[str, Any] = {
+            "stage": stage.name,
+            "exit_code": exit_code,
+            "duration_seconds": end - start,
+            "narrowed": cmd != stage.cmd,
+        }
+        tests = outcomes.read_report(report)
+        if tests:
+            future.tests.update(tests)
+            record["tests"] = outcomes.summarize(tests)
+        self.run.tracer.record(
+            f"test:{stage.name}", start, end, future.id, exit_code=exit_code
+        )
+        future.metadata.setdefault("test_stages", []).append(record)
+        self.run.logger.log("test_stage_completed", {"future_id": future.id, **record})
+        return exit_code
+
+    def _narrowed_command(
+        self, future: Future, workspace: Workspace, cmd: str
+    ) -> Optional[str]:
+        """`cmd` narrowed to the tests affected by the future's changes, if enabled."""
+        if not self.config.test_selection:
+            return None
+
+        changed = workspace.changed_files()
+        selected = None
+        if changed is not None:
+            selected = self._get_import_graph().affected_tests(changed)
+        if selected:
+            # Test files the future deleted or renamed away are changes too
+            root = Path(workspace.path)
+            selected = [path for path in selected if (root / path).is_file()]
+        if not selected:
+            # Unknown or unmappable change (or no affected tests): run everything
+            return None
+
+        future.metadata["selected_tests"] = selected
+        self.run.logger.log(
+            "tests_selected", {"future_id": future.id, "tests": selected}
+        )
+        return f"{cmd} {shlex.join(selected)}"
+
+    def _get_import_graph(self) -> ImportGraph:
+        with self._lock:
+            if self._import_graph is None:
+                self._import_graph = load_import_graph(
+                    self.workspaces.source, resolve_cache_dir(self.config.cache_dir)
+                )
+            return self._import_graph
+
+    def _run_tests(
+        self,
+        test_cmd: str,
+        cwd: Optional[str],
+        timeout: Optional[int] = None,
+        report: Optional[Path] = None,
+    ) -> CommandResult:
+        """
+        Run a test command in its own process group under the run's limits;
+        the whole group is killed on timeout or cancellation. It may write a
+        test report to `report` (passed in `$FUTURE_RALPH_TEST_REPORT`).
+        """
+        env = None
+        if report is not None:
+            report.unlink(missing_ok=True)
+            env = {**os.environ, REPORT_ENV: str(report)}
+        return run_shell(
+            test_cmd,
+            cwd=cwd,
+            timeout=timeout,
+            cancel=self._cancel,
+            limits=self._limits,
+            env=env,
+        )
+
+    def _report_path(self, owner: str, stage: str) -> Path:
+        directory = self.run.dir / "reports"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory / f"{owner}.{stage}"
+
+    def _score(self, future: Future) -> float:
+        """Score a future; failing ones with test results against the baseline."""
+        assert future.result is not None
+        if self.config.test_results and future.tests and future.result.exit_code != 0:
+            self.policy.baseline = self._baseline_tests()
+        return self.policy.score(future)
+
+    def _baseline_tests(self) -> Dict[str, CaseResult]:
+        """
+        Per-test results of the unchanged repository, so that failing
+        futures are only penalised for the tests they broke. Run once, the
+        first time a future fails, and cached per base tree and pipeline.
+        """
+        with self._baseline_lock:
+            if self._baseline is None:
+                with self.run.tracer.span("baseline"):
+                    self._baseline = self._load_baseline()
+            return self._baseline
+
+    def _load_baseline(self) -> Dict[str, CaseResult]:
+        try:
+            workspace = self.workspaces.create("baseline")
+        except WorkspaceError:
+            return {}
+        if workspace.kind == "none":
+            # Futures change the repository itself: there is nothing to compare to
+            return {}
+        try:
+            key = None
+            if workspace.base_tree is not None:
+                key = verdict_key(
+                    workspace.base_tree, diff_hash(""), self._pipeline_key()
+                )
+            entry = None
+            if key is not None and self.baseline_cache is not None:
+                entry = self.baseline_cache.get(key)
+            if entry is not None:
+                tests = outcomes.decode(entry["tests"])
+            else:
+                tests = {}
+                for stage in self._pipeline():
+                    if stage.deferred:
+                        continue
+                    report = self._report_path("baseline", stage.name)
+                    result = self._run_tests(
+                        stage.cmd, str(workspace.path), stage.timeout, report
+                    )
+                    if result.exit_code == CANCELLED_EXIT_CODE:
+                        return {}
+                    tests.update(outcomes.read_report(report))
+                if key is not None and self.baseline_cache is not None:
+                    self.baseline_cache.put(key, {"tests": outcomes.encode(tests)})
+        finally:
+            self.workspaces.release(workspace)
+        self.run.logger.log(
+            "test_baseline", {"cached": entry is not None, **outcomes.summarize(tests)}
+        )
+        return tests
+
+    def _result_key(
+        self, workspace: Workspace, tool: str, prompt: str
+    ) -> Optional[str]:
+        """Result cache key for the next attempt of `tool`, if cacheable."""
+        if self.result_cache is None or workspace.base_tree is None:
+            return None
+        with self._lock:
+            sample = self._tool_samples.get(tool, 0) + 1
+            self._tool_samples[tool] = sample
+        return result_key(workspace.base_tree, prompt, tool, sample=sample)
+
+    def _pipeline_key(self) -> str:
+        """Identifies the test pipeline a cached verdict was produced by."""
+        stages = [dataclasses.asdict(stage) for stage in self._pipeline()]
+        payload = json.dumps(
+            {"stages": stages, "selection": self.config.test_selection},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _restore_cached(
+        self, future: Future, workspace: Workspace, cache_key: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Replay a cached future into its workspace; None on a miss."""
+        if cache_key is None or self.result_cache is None:
+            return None
+        start = time.time()
+        entry = self.result_cache.get(cache_key)
+        if entry is None:
+            return None
+        try:
+            workspace.apply_diff(entry["result"].get("diff") or "")
+        except (WorkspaceError, KeyError):
+            return None
+
+        cached = entry["result"]
+        future.result = AttemptResult(
+            stdout=cached.get("stdout", ""),
+            stderr=cached.get("stderr", ""),
+            exit_code=cached.get("exit_code", 0),
+            # What this future actually took; the agent was not called
+            duration_seconds=time.time() - start,
+        )
+        self._capture_diff(future, cached.get("diff"))
+        future.metadata["cache_hit"] = cache_key
+        self.run.logger.log(
+            "future_cache_hit",
+            {
+                "future_id": future.id,
+                "key": cache_key,
+                "saved_seconds": cached.get("duration_seconds"),
+                "saved_cost": cached.get("cost_info") or {},
+            },
+        )
+        return entry
+
+    def _store_result(
+        self,
+        cache_key: str,
+        future: Future,
+        agent_exit_code: int,
+        cached: Optional[Dict[str, Any]] = None,
+    ):
+        """Cache a future; a replayed one only gets its verdict refreshed."""
+        assert self.result_cache is not None and future.result is not None
+        result = future.result
+        entry = {
+            "result": cached["result"]
+            if cached
+            else {
+                "stdout": result.stdout,
+                "stderr": result.stderr,
+                "exit_code": agent_exit_code,
+                "duration_seconds": result.duration_seconds,
+                "diff": self.patches.get(result.diff_ref) if result.diff_ref else "",
+                "cost_info": result.cost_info,
+            },
+            "pipeline": self._pipeline_key(),
+            "tests": self._verdict_of(future, result.exit_code),
+        }
+        self.result_cache.put(cache_key, entry)
+
+    def _skip(self, future: Future, workspace: Workspace, started: float) -> Future:
+        """Record a cancelled future with the time it used, and drop its checkout."""
+        future.status = FutureStatus.SKIPPED
+        duration = (
+            future.result.duration_seconds if future.result else time.time() - started
+        )
+        self.workspaces.release(workspace)
+        future.workspace = None
+        self.run.logger.log(
+            "iteration_cancelled",
+            {
+                "future_id": future.id,
+                "duration_seconds": duration,
+                "cost": future.result.cost_info if future.result else {},
+            },
+        )
+        return future
+
+    def _capture_diff(self, future: Future, diff: Optional[str]):
+        """
+        Move a future's patch into the run's patch store, keeping only its
+        reference, stats and hash on the future.
+        """
+        assert future.result is not None
+        future.result.diff = None
+        if diff is None:
+            return
+        future.result.diff_ref = self.patches.put(diff) if diff else None
+        future.result.diff_stats = diff_stats(diff)
+        future.metadata["diff_hash"] = diff_hash(diff)
+
+    def _should_stop(self, future: Future) -> bool:
+        return bool(
+            future.result
+            and future.result.exit_code == 0
+            and self.config.stop_on_success
+        )
+
+    def _progress_reporter(
+        self, future: Future, agent_started: float
+    ) -> OutputCallback:
+        """
+        Turn per-line output events into throttled `agent_progress` log
+        events. The time to the first line is traced as `agent_startup`.
+        """
+        last_report = 0.0
+
+        def report(event: OutputEvent):
+            nonlocal last_report
+            now = time.time()
+            if event.lines_seen == 1:
+                self.run.tracer.record("agent_startup", agent_started, now, future.id)
+            if now - last_report < PROGRESS_INTERVAL:
+                return
+            last_report = now
             self.run.logger.log(
-                "best_future_selected", {"future_id": best.id, "score": best.score}
+                "agent_progress",
+                {
+                    "future_id": future.id,
+                    "lines": event.lines_seen,
+                    "bytes": event.bytes_seen,
+                    "last_line": event.line[:200],
+                },
             )
 
-        return best
+        return report
+
+    def _adapter_slot(self, tool_name: str) -> ContextManager[Optional[bool]]:
+        slot = self._adapter_slots.get(tool_name)
+        if slot is None:
+            return contextlib.nullcontext()
+        return slot
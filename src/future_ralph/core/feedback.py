@@ -0,0 +1,129 @@
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from future_ralph.core.models import Future
+from future_ralph.core.outcomes import FAILING
+
+# Failing tests named per failure, and how much of its output is kept
+MAX_TESTS = 8
+EXCERPT_LINES = 12
+EXCERPT_CHARS = 800
+
+# Addresses and timings, which differ between otherwise identical failures
+_VOLATILE_RE = re.compile(r"0x[0-9a-fA-F]+|\b\d+(?:\.\d+)?s\b")
+
+HEADER = "Earlier attempts at this task failed. Avoid repeating their mistakes:"
+
+
+@dataclass
+class _Failure:
+    futures: List[str]  # ids and tools
+    stage: Optional[str]
+    exit_code: int
+    tests: List[str]
+    excerpt: str
+    diff_stats: Dict[str, int]
+
+    def render(self) -> str:
+        stats = self.diff_stats
+        if stats.get("files"):
+            change = (
+                f"changed {stats['files']} files "
+                f"(+{stats.get('insertions', 0)} -{stats.get('deletions', 0)})"
+            )
+        else:
+            change = "made no changes"
+        where = f'stage "{self.stage}"' if self.stage else "tests"
+        names = ", ".join(self.futures)
+        lines = [f"- {names}: {change}; {where} failed (exit {self.exit_code})"]
+        if self.tests:
+            shown = ", ".join(self.tests[:MAX_TESTS])
+            more = len(self.tests) - MAX_TESTS
+            lines.append(
+                f"  Failing tests: {shown}" + (f" (+{more} more)" if more > 0 else "")
+            )
+        if self.excerpt:
+            lines.append("  Output:")
+            lines.extend(f"    {line}" for line in self.excerpt.splitlines())
+        return "\n".join(lines)
+
+
+def _excerpt(output: str) -> str:
+    """The end of a failure's output, where runners put errors and summaries."""
+    lines = [line.rstrip() for line in output.splitlines() if line.strip()]
+    text = "\n".join(lines[-EXCERPT_LINES:])
+    if len(text) > EXCERPT_CHARS:
+        text = "..." + text[-(EXCERPT_CHARS - 3) :]
+    return text
+
+
+class FailureLog:
+    """
+    What went wrong in a run's failed futures, for the prompts of the
+    futures after them (refinement mode). Futures with the same patch, or
+    the same failing tests and output, are listed once.
+    """
+
+    def __init__(self) -> None:
+        self._failures: List[_Failure] = []
+        self._by_key: Dict[Tuple, _Failure] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+    def record(self, future: Future):
+        assert future.result is not None
+        stages = future.metadata.get("test_stages") or [{}]
+        failure = _Failure(
+            futures=[f"{future.id} ({future.tool_name})"],
+            stage=stages[-1].get("stage"),
+            exit_code=future.result.exit_code,
+            tests=sorted(
+                name for name, case in future.tests.items() if case.outcome in FAILING
+            ),
+            excerpt=_excerpt(future.metadata.get("failure_output", "")),
+            diff_stats=future.result.diff_stats,
+        )
+        keys: List[Tuple] = []
+        if failure.tests or failure.excerpt:
+            excerpt = _VOLATILE_RE.sub("", failure.excerpt)
+            keys.append(("failure", tuple(failure.tests), excerpt))
+        if future.metadata.get("diff_hash"):
+            keys.append(("patch", future.metadata["diff_hash"]))
+        with self._lock:
+            for key in keys:
+                seen = self._by_key.get(key)
+                if seen is not None:
+                    seen.futures.extend(failure.futures)
+                    break
+            else:
+                self._failures.append(failure)
+                seen = failure
+            for key in keys:
+                self._by_key.setdefault(key, seen)
+
+    def render(self, max_chars: int) -> str:
+        """
+        A summary of the failures, most recent first, at most `max_chars`
+        long; empty if there were none.
+        """
+        with self._lock:
+            blocks = [failure.render() for failure in reversed(self._failures)]
+        if not blocks:
+            return ""
+        text = HEADER
+        for block in blocks:
+            if len(text) + 1 + len(block) > max_chars:
+                if text == HEADER:
+                    # Not even one whole failure fits: keep its start
+                    text = (text + "\n" + block)[:max_chars]
+                break
+            text += "\n" + block
+        return text
+
+
+def with_feedback(prompt: str, summary: str) -> str:
+    """The prompt of a future in refinement mode: the task, then earlier failures."""
+    return f"{prompt}\n\n{summary}" if summary else prompt
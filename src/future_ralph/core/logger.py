@@ -1,23 +1,167 @@
+import atexit
 import json
+import os
+import threading
 import time
+import weakref
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+FSYNC_POLICIES = ("never", "batch", "always")
+
+# Called with (event, data, timestamp) for every logged event
+EventListener = Callable[[str, Dict[str, Any], float], None]
+
+_open_loggers: "weakref.WeakSet[RunLogger]" = weakref.WeakSet()
 
 
 class RunLogger:
-    def __init__(self, run_dir: Path):
+    """
+    Appends JSONL events to `run.jsonl` through a background writer thread.
+
+    `log()` only serialises and enqueues the event; the writer drains
+    everything queued so far and appends it with a single `write()` on a
+    handle kept open in O_APPEND mode, holding an advisory lock so lines from
+    other processes never interleave.
+
+    `flush_interval` lets the writer wait for more events before writing a
+    batch. `fsync` is one of "never" (leave it to the OS), "batch" (fsync
+    after every batch) or "always" (`log()` returns only once its event is
+    on disk).
+
+    Listeners are called synchronously for every event, e.g. to keep the run
+    catalog up to date; their errors never reach the caller.
+    """
+
+    def __init__(
+        self,
+        run_dir: Path,
+        flush_interval: float = 0.0,
+        fsync: str = "never",
+        listeners: Optional[List[EventListener]] = None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
         self.run_dir = run_dir
         self.log_file = run_dir / "run.jsonl"
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.listeners: List[EventListener] = list(listeners or [])
+        self._cond = threading.Condition()
+        self._pending: List[str] = []
+        self._enqueued = 0
+        self._written = 0
+        self._fd: Optional[int] = None
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        self.write_errors = 0
         self._setup_logging()
 
     def _setup_logging(self):
-        # We use a custom logger that writes JSONL
-        pass
+        # We use a custom logger that writes JSONL; the file exists from the
+        # start, the handle and writer thread only once something is logged
+        self.log_file.touch(exist_ok=True)
+
+    def _start_writer(self):
+        self._fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._writer = threading.Thread(
+            target=self._write_loop, name=f"run-logger-{self.run_dir.name}", daemon=True
+        )
+        self._writer.start()
+        _open_loggers.add(self)
 
     def log(self, event: str, data: Optional[Dict[str, Any]] = None):
-        entry = {"timestamp": time.time(), "event": event, "data": data or {}}
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        timestamp = time.time()
+        data = data or {}
+        entry = {"timestamp": timestamp, "event": event, "data": data}
+        line = json.dumps(entry) + "\n"
+        for listener in self.listeners:
+            try:
+                listener(event, data, timestamp)
+            except Exception:
+                pass
+        with self._cond:
+            if self._closed:
+                with open(self.log_file, "a") as f:
+                    f.write(line)
+                return
+            if self._writer is None:
+                self._start_writer()
+            self._pending.append(line)
+            self._enqueued += 1
+            self._cond.notify_all()
+        if self.fsync == "always":
+            self.flush()
 
     def log_attempt(self, attempt_id: str, result: Dict[str, Any]):
         self.log("attempt_completed", {"attempt_id": attempt_id, "result": result})
+
+    def flush(self):
+        """Block until every event logged so far has been written."""
+        with self._cond:
+            target = self._enqueued
+            while self._written < target and self._writer is not None:
+                self._cond.wait()
+
+    def close(self):
+        """Write out pending events and release the file handle."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            writer = self._writer
+        if writer is None:
+            return
+        writer.join()
+        if self._fd is not None:
+            os.close(self._fd)
+        _open_loggers.discard(self)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+            if self.flush_interval > 0 and not self._closed:
+                time.sleep(self.flush_interval)
+            with self._cond:
+                batch, self._pending = self._pending, []
+
+            try:
+                self._write("".join(batch).encode())
+            except OSError:
+                # Keep going so flush() never hangs on a broken disk
+                self.write_errors += len(batch)
+
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+
+    def _write(self, payload: bytes):
+        assert self._fd is not None
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            view = memoryview(payload)
+            while view:
+                written = os.write(self._fd, view)
+                view = view[written:]
+            if self.fsync != "never":
+                os.fsync(self._fd)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+@atexit.register
+def _close_open_loggers():
+    for logger in list(_open_loggers):
+        logger.close()
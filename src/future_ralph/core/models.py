@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 from future_ralph.adapters.base import AttemptResult
 
@@ -12,6 +12,14 @@ class FutureStatus(Enum):
     SKIPPED = "skipped"
 
 
+@dataclass
+class CaseResult:
+    """The outcome of one test, as reported by the test runner."""
+
+    outcome: str  # passed, failed, error, skipped, xfailed, xpassed
+    duration_seconds: float = 0.0
+
+
 @dataclass
 class Future:
     id: str
@@ -21,7 +29,28 @@ class Future:
     result: Optional[AttemptResult] = None
     score: float = 0.0
     is_treehouse: bool = False
+    workspace: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Per-test results from the test stages' reports, by test name
+    tests: Dict[str, CaseResult] = field(default_factory=dict)
+
+
+@dataclass
+class PipelineStage:
+    """
+    One stage of the test pipeline, e.g. a compile check or the full suite.
+
+    Stages run in order and the pipeline stops at the first failure.
+    `deferred` stages only run for the future that is about to be selected;
+    `selectable` stages are narrowed to affected tests when test selection
+    is enabled and run in full only for that future.
+    """
+
+    name: str
+    cmd: str
+    timeout: Optional[int] = None
+    deferred: bool = False
+    selectable: bool = False
 
 
 @dataclass
@@ -31,3 +60,33 @@ class RunConfig:
     test_cmd: str = "pytest"
     stop_on_success: bool = True
     auto_apply: bool = False
+    max_parallel: int = 1
+    adapter_concurrency: Dict[str, int] = field(default_factory=dict)
+    workspace_mode: str = "auto"  # auto, git, copy, none
+    repo_dir: str = "."
+    test_selection: bool = False
+    test_stages: List[PipelineStage] = field(default_factory=list)
+    cache_dir: Optional[str] = None
+    result_cache: bool = False
+    result_cache_max_mb: int = 512
+    verdict_cache: bool = False
+    # Read per-test results for partial credit (pytest reports automatically)
+    test_results: bool = False
+    scheduler: str = "bandit"  # bandit, round_robin
+    # USD per million tokens, by tool, for tools that do not report cost
+    token_prices: Dict[str, float] = field(default_factory=dict)
+    budget_tokens: Optional[float] = None
+    budget_usd: Optional[float] = None
+    budget_seconds: Optional[float] = None
+    # Cancel in-flight futures as soon as one passes (needs max_parallel > 1)
+    speculative: bool = False
+    # Per-process limits for agent and test commands (None: unlimited)
+    limit_cpu_seconds: Optional[int] = None
+    limit_memory_mb: Optional[int] = None
+    limit_open_files: Optional[int] = None
+    # Tell each future why the run's earlier futures failed
+    refine: bool = False
+    refine_max_chars: int = 2000
+    # Append a precomputed repository overview to every future's prompt
+    context_pack: bool = False
+    context_pack_max_chars: int = 6000
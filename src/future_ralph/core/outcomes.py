@@ -0,0 +1,146 @@
+import json
+import re
+import shlex
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from future_ralph.core.models import CaseResult
+
+# Test commands may write a JUnit XML or pytest JSON report to the path in
+# this variable; with `test_results`, pytest commands are made to write one
+REPORT_ENV = "FUTURE_RALPH_TEST_REPORT"
+
+# Outcomes counted as passing and as failing; anything else (skipped) is neither
+PASSING = {"passed", "xfailed", "xpassed"}
+FAILING = {"failed", "error"}
+
+_PYTEST_RE = re.compile(r"^(?:.*/)?(?:pytest|py\.test)$")
+_SHELL_OPERATORS = {"&&", "||", ";", "|", "&"}
+
+
+def report_command(cmd: str) -> str:
+    """
+    `cmd` made to write a JUnit XML report to `$FUTURE_RALPH_TEST_REPORT`,
+    if it is a plain pytest invocation that does not write one already.
+    """
+    try:
+        tokens = shlex.split(cmd)
+    except ValueError:
+        return cmd
+    if not tokens or _SHELL_OPERATORS.intersection(tokens):
+        return cmd
+    if any(
+        t.startswith(("--junitxml", "--junit-xml", "--json-report")) for t in tokens
+    ):
+        return cmd
+    runs_pytest = any(_PYTEST_RE.match(t) for t in tokens[:3]) or (
+        "-m" in tokens[:3] and "pytest" in tokens[:4]
+    )
+    if not runs_pytest:
+        return cmd
+    return f'{cmd} --junitxml="${REPORT_ENV}"'
+
+
+def parse_report(data: bytes) -> Dict[str, CaseResult]:
+    """
+    Per-test results from a JUnit XML or pytest-json-report report.
+    Raises ValueError if the report cannot be read.
+    """
+    text = data.decode(errors="replace").lstrip()
+    if text.startswith("{"):
+        return _parse_pytest_json(text)
+    return _parse_junit(text)
+
+
+def _parse_junit(text: str) -> Dict[str, CaseResult]:
+    try:
+        root = ET.fromstring(text)
+    except ET.ParseError as e:
+        raise ValueError(f"Unreadable JUnit report: {e}") from e
+    tests = {}
+    for case in root.iter("testcase"):
+        name = case.get("name", "")
+        classname = case.get("classname")
+        if classname:
+            name = f"{classname}.{name}"
+        outcome = "passed"
+        for child in case:
+            if child.tag in ("failure", "error"):
+                outcome = "failed" if child.tag == "failure" else "error"
+                break
+            if child.tag == "skipped":
+                outcome = "skipped"
+        try:
+            duration = float(case.get("time") or 0.0)
+        except ValueError:
+            duration = 0.0
+        tests[name] = CaseResult(outcome, duration)
+    return tests
+
+
+def _parse_pytest_json(text: str) -> Dict[str, CaseResult]:
+    try:
+        data = json.loads(text)
+        tests = {}
+        for test in data["tests"]:
+            duration = sum(
+                (test.get(phase) or {}).get("duration", 0.0)
+                for phase in ("setup", "call", "teardown")
+            )
+            tests[test["nodeid"]] = CaseResult(test["outcome"], duration)
+        return tests
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Unreadable pytest JSON report: {e}") from e
+
+
+def read_report(path: Path) -> Dict[str, CaseResult]:
+    """The tests in the report at `path`; nothing if it is missing or unreadable."""
+    try:
+        return parse_report(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def summarize(tests: Dict[str, CaseResult]) -> Dict[str, int]:
+    """How many tests passed, failed and were skipped."""
+    summary = {"passed": 0, "failed": 0, "skipped": 0}
+    for case in tests.values():
+        if case.outcome in PASSING:
+            summary["passed"] += 1
+        elif case.outcome in FAILING:
+            summary["failed"] += 1
+        else:
+            summary["skipped"] += 1
+    return summary
+
+
+def pass_ratio(tests: Dict[str, CaseResult]) -> Optional[float]:
+    """Share of the tests that ran which passed; None if none ran."""
+    summary = summarize(tests)
+    ran = summary["passed"] + summary["failed"]
+    return summary["passed"] / ran if ran else None
+
+
+def regressions(
+    tests: Dict[str, CaseResult], baseline: Dict[str, CaseResult]
+) -> List[str]:
+    """Tests that passed before the change and fail with it."""
+    return sorted(
+        name
+        for name, case in tests.items()
+        if case.outcome in FAILING
+        and name in baseline
+        and baseline[name].outcome in PASSING
+    )
+
+
+def encode(tests: Dict[str, CaseResult]) -> Dict[str, List[Any]]:
+    """Compact JSON form of per-test results, for verdicts and caches."""
+    return {name: [case.outcome, case.duration_seconds] for name, case in tests.items()}
+
+
+def decode(data: Optional[Dict[str, List[Any]]]) -> Dict[str, CaseResult]:
+    return {
+        name: CaseResult(outcome, duration)
+        for name, (outcome, duration) in (data or {}).items()
+    }
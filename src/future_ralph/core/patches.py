@@ -0,0 +1,62 @@
+import gzip
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict
+
+
+def diff_stats(diff: str) -> Dict[str, int]:
+    """Files touched, lines inserted and deleted, and size of a git patch."""
+    files = insertions = deletions = 0
+    in_hunk = False
+    for line in diff.split("\n"):
+        if line.startswith("diff --git "):
+            files += 1
+            in_hunk = False
+        elif line.startswith("@@"):
+            in_hunk = True
+        elif in_hunk and line.startswith("+"):
+            insertions += 1
+        elif in_hunk and line.startswith("-"):
+            deletions += 1
+    return {
+        "files": files,
+        "insertions": insertions,
+        "deletions": deletions,
+        "bytes": len(diff),
+    }
+
+
+class PatchStore:
+    """
+    Gzip-compressed patches stored under their SHA-256, so identical
+    patches from different futures are kept once.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, ref: str) -> Path:
+        return self.root / ref[:2] / f"{ref}.patch.gz"
+
+    def put(self, diff: str) -> str:
+        data = diff.encode(errors="surrogateescape")
+        ref = hashlib.sha256(data).hexdigest()
+        path = self.path(ref)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            # mtime=0 keeps the compressed bytes a function of the content
+            tmp.write_bytes(gzip.compress(data, mtime=0))
+            os.replace(tmp, path)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """The patch stored under `ref`; raises FileNotFoundError if unknown."""
+        return self.decode(self.path(ref).read_bytes())
+
+    @staticmethod
+    def decode(data: bytes) -> str:
+        """A patch from the stored (compressed) bytes of its file."""
+        return gzip.decompress(data).decode(errors="surrogateescape")
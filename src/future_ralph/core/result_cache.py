@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bump when the entry layout changes; old entries are then simply missed
+CACHE_VERSION = 1
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompts that only differ in whitespace are the same task."""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def result_key(
+    base_tree: str,
+    prompt: str,
+    tool: str,
+    model: Optional[str] = None,
+    sample: int = 1,
+) -> str:
+    """
+    Cache key for a future. `sample` is the tool's attempt number within the
+    run, so repeated attempts in one run still explore different futures
+    while a re-submitted run maps each attempt onto its earlier twin.
+    """
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "tree": base_tree,
+            "prompt": normalize_prompt(prompt),
+            "tool": tool,
+            "model": model,
+            "sample": sample,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def diff_hash(diff: str) -> str:
+    """
+    Hash of a patch that ignores incidental differences: blob ids on
+    `index` lines, CRLF line endings and trailing blank lines.
+    """
+    lines = [
+        line.rstrip("\r") for line in diff.split("\n") if not line.startswith("index ")
+    ]
+    normalized = "\n".join(lines).rstrip("\n")
+    return hashlib.sha256(normalized.encode(errors="surrogateescape")).hexdigest()
+
+
+def verdict_key(base_tree: str, diff_digest: str, pipeline: str) -> str:
+    """Cache key for the test outcome of a patch on a given tree and pipeline."""
+    payload = f"{CACHE_VERSION}:{base_tree}:{diff_digest}:{pipeline}"
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed store of finished futures, shared between runs.
+
+    Each entry holds an agent's `AttemptResult` (including its diff) and,
+    optionally, the test outcome for a given pipeline. Entries are single
+    JSON files written atomically, so several processes can share the
+    directory. Reads refresh an entry's mtime, and `put` evicts the least
+    recently used entries once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != CACHE_VERSION:
+            return None
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(
+                json.dumps({**entry, "version": CACHE_VERSION, "stored": time.time()})
+            )
+            os.replace(tmp, path)
+        except OSError:
+            # Caching is best effort; the future itself already succeeded
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until under `max_bytes`."""
+        entries: List[Tuple[float, int, Path]] = []
+        total = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
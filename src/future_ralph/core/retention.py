@@ -0,0 +1,208 @@
+import os
+import shutil
+import time
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from future_ralph.core.run_manager import RunManager
+
+# A compacted run directory holds only this archive of its former contents
+ARCHIVE_FILE = "run.zip"
+
+# Never archived: derived (status snapshot) or disposable (checkouts)
+SKIPPED = {"workspaces", "status.json"}
+
+# Runs the catalog still shows as running are left alone unless their log
+# has not changed for this long (their process died without finishing)
+STALE_RUN_SECONDS = 24 * 3600
+
+FINISHED = ("success", "failed", "completed")
+
+
+def is_compacted(run_dir: Path) -> bool:
+    return (run_dir / ARCHIVE_FILE).is_file()
+
+
+def read_run_file(run_dir: Path, name: str) -> Optional[bytes]:
+    """
+    A file of a run by its path relative to the run directory, whether the
+    run is compacted or not; None if the run has no such file.
+    """
+    path = run_dir / name
+    if path.is_file():
+        return path.read_bytes()
+    try:
+        with zipfile.ZipFile(run_dir / ARCHIVE_FILE) as archive:
+            return archive.read(name)
+    except (FileNotFoundError, KeyError):
+        return None
+
+
+def iter_run_lines(run_dir: Path, name: str) -> Iterator[str]:
+    """The lines of a (possibly archived) run file; nothing if it is missing."""
+    path = run_dir / name
+    if path.is_file():
+        with open(path) as f:
+            yield from f
+        return
+    data = read_run_file(run_dir, name)
+    if data is not None:
+        yield from data.decode(errors="replace").splitlines(keepends=True)
+
+
+def dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def compact_run(run_dir: Path) -> int:
+    """
+    Replace a finished run's files with one compressed archive that
+    `read_run_file` reads members from directly. Returns the bytes saved.
+    """
+    if is_compacted(run_dir):
+        return 0
+    before = dir_size(run_dir)
+    tmp = run_dir / f".{ARCHIVE_FILE}.{os.getpid()}.tmp"
+    with zipfile.ZipFile(tmp, "w") as archive:
+        for root, dirs, files in os.walk(run_dir):
+            rel_root = Path(root).relative_to(run_dir)
+            dirs[:] = sorted(
+                d for d in dirs if (rel_root / d).as_posix() not in SKIPPED
+            )
+            for name in sorted(files):
+                rel = (rel_root / name).as_posix()
+                if rel in SKIPPED or name.startswith(f".{ARCHIVE_FILE}"):
+                    continue
+                # Patches are gzipped already
+                compression = (
+                    zipfile.ZIP_STORED if name.endswith(".gz") else zipfile.ZIP_DEFLATED
+                )
+                archive.write(Path(root) / name, rel, compress_type=compression)
+    os.replace(tmp, run_dir / ARCHIVE_FILE)
+
+    for entry in run_dir.iterdir():
+        if entry.name == ARCHIVE_FILE:
+            continue
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink()
+    return before - dir_size(run_dir)
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    What `collect` keeps. Finished runs are compacted; runs older than
+    `max_age_days` are deleted, then the oldest others until the runs
+    directory fits in `max_total_mb`. The `keep_best` highest-scoring
+    successful runs are left exactly as they are.
+    """
+
+    max_age_days: Optional[float] = None
+    max_total_mb: Optional[float] = None
+    keep_best: int = 0
+    compact: bool = True
+
+
+@dataclass
+class GcReport:
+    compacted: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    bytes_freed: int = 0
+    bytes_kept: int = 0
+
+
+def collect(
+    manager: "RunManager",
+    policy: RetentionPolicy,
+    dry_run: bool = False,
+    protect: Optional[Set[str]] = None,
+) -> GcReport:
+    """
+    Apply `policy` to the runs under `manager`. Active runs and those in
+    `protect` are never touched. With `dry_run`, only report what would
+    happen (sizes are then those before compaction).
+    """
+    report = GcReport()
+    now = time.time()
+    records = manager.query_runs()
+    keep = set(protect or ())
+    for record in records:
+        if record.status not in FINISHED:
+            log = manager.base_dir / record.id / "run.jsonl"
+            try:
+                stale = now - log.stat().st_mtime > STALE_RUN_SECONDS
+            except FileNotFoundError:
+                stale = is_compacted(manager.base_dir / record.id)
+            if not stale:
+                keep.add(record.id)
+    if policy.keep_best:
+        best = sorted(
+            (r for r in records if r.status == "success"),
+            key=lambda r: r.best_score if r.best_score is not None else float("-inf"),
+            reverse=True,
+        )
+        keep.update(r.id for r in best[: policy.keep_best])
+
+    sizes = {}
+    for record in records:
+        run_dir = manager.base_dir / record.id
+        if run_dir.is_dir():
+            sizes[record.id] = dir_size(run_dir)
+    oldest_first = sorted(
+        (r for r in records if r.id in sizes and r.id not in keep),
+        key=lambda r: (r.started_at or 0.0, r.id),
+    )
+
+    def delete(run_id: str):
+        report.deleted.append(run_id)
+        report.bytes_freed += sizes.pop(run_id)
+        if not dry_run:
+            shutil.rmtree(manager.base_dir / run_id, ignore_errors=True)
+            manager.catalog.delete_run(run_id)
+
+    if policy.max_age_days is not None:
+        cutoff = now - policy.max_age_days * 86400
+        for record in oldest_first:
+            started = record.started_at or _mtime(manager.base_dir / record.id)
+            if started < cutoff:
+                delete(record.id)
+
+    if policy.compact:
+        for record in oldest_first:
+            run_dir = manager.base_dir / record.id
+            if record.id not in sizes or is_compacted(run_dir):
+                continue
+            report.compacted.append(record.id)
+            if not dry_run:
+                saved = compact_run(run_dir)
+                sizes[record.id] -= saved
+                report.bytes_freed += saved
+
+    if policy.max_total_mb is not None:
+        limit = policy.max_total_mb * 1024 * 1024
+        for record in oldest_first:
+            if sum(sizes.values()) <= limit:
+                break
+            if record.id in sizes:
+                delete(record.id)
+    report.bytes_kept = sum(sizes.values())
+    return report
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
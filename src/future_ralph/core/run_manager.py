@@ -1,39 +1,107 @@
 import uuid
 import datetime
 from pathlib import Path
-from typing import Optional
+from functools import partial
+from typing import Any, Dict, List, Optional
+from future_ralph.core.catalog import (
+    FutureRecord,
+    RunCatalog,
+    RunRecord,
+    ToolStats,
+)
 from future_ralph.core.logger import RunLogger
+from future_ralph.core.retention import ARCHIVE_FILE
+from future_ralph.core.tracing import Tracer
 
 
 class Run:
-    def __init__(self, run_id: str, run_dir: Path):
+    def __init__(
+        self,
+        run_id: str,
+        run_dir: Path,
+        logger_options: Optional[Dict[str, Any]] = None,
+        catalog: Optional[RunCatalog] = None,
+    ):
         self.id = run_id
         self.dir = run_dir
-        self.logger = RunLogger(run_dir)
+        self.logger = RunLogger(run_dir, **(logger_options or {}))
+        self.tracer = Tracer(run_dir)
+        self.catalog = catalog
+        if catalog is not None:
+            self.logger.listeners.append(partial(catalog.apply_event, run_id))
+
+    def close(self):
+        self.logger.close()
+        self.tracer.close()
 
 
 class RunManager:
-    def __init__(self, base_dir: Path = Path("runs")):
+    def __init__(
+        self,
+        base_dir: Path = Path("runs"),
+        logger_options: Optional[Dict[str, Any]] = None,
+    ):
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.logger_options = logger_options or {}
+        catalog_path = self.base_dir / "catalog.sqlite"
+        is_new_catalog = not catalog_path.exists()
+        self.catalog = RunCatalog(catalog_path)
+        if is_new_catalog and (
+            any(self.base_dir.glob("*/run.jsonl"))
+            or any(self.base_dir.glob(f"*/{ARCHIVE_FILE}"))
+        ):
+            # Runs from before the catalog existed
+            self.reindex()
 
-    def create_run(self, prompt: str) -> Run:
+    def create_run(self, prompt: str, repo: Optional[str] = None) -> Run:
         run_id = f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
         run_dir = self.base_dir / run_id
         run_dir.mkdir()
 
         # Initialize run metadata
-        run = Run(run_id, run_dir)
-        run.logger.log("run_started", {"prompt": prompt, "run_id": run_id})
+        run = Run(run_id, run_dir, self.logger_options, self.catalog)
+        run.logger.log(
+            "run_started", {"prompt": prompt, "run_id": run_id, "repo": repo}
+        )
         return run
 
     def get_run(self, run_id: str) -> Optional[Run]:
         run_dir = self.base_dir / run_id
         if not run_dir.exists():
             return None
-        return Run(run_id, run_dir)
+        return Run(run_id, run_dir, self.logger_options, self.catalog)
 
-    def list_runs(self):
-        return sorted(
-            [d.name for d in self.base_dir.iterdir() if d.is_dir()], reverse=True
-        )
+    def list_runs(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[str]:
+        return [r.id for r in self.catalog.list_runs(status, limit, offset)]
+
+    def query_runs(
+        self,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[RunRecord]:
+        return self.catalog.list_runs(status, limit, offset)
+
+    def run_record(self, run_id: str) -> Optional[RunRecord]:
+        return self.catalog.get_run(run_id)
+
+    def future_records(self, run_id: str) -> List[FutureRecord]:
+        return self.catalog.futures(run_id)
+
+    def find_future(
+        self, future_id: str, run_id: Optional[str] = None
+    ) -> Optional[FutureRecord]:
+        return self.catalog.find_future(future_id, run_id)
+
+    def tool_stats(self, repo: Optional[str] = None) -> Dict[str, ToolStats]:
+        return self.catalog.tool_stats(repo)
+
+    def reindex(self) -> int:
+        """Rebuild the run catalog from the runs' JSONL logs."""
+        return self.catalog.reindex(self.base_dir)
@@ -0,0 +1,153 @@
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type
+from future_ralph.core.catalog import ToolStats
+from future_ralph.core.models import Future, FutureStatus
+from future_ralph.adapters.base import BaseAdapter
+
+
+class BaseScheduler(ABC):
+    """Decides which adapter explores each future."""
+
+    name: str = ""
+
+    @classmethod
+    def from_history(
+        cls, history: Optional[Dict[str, ToolStats]] = None
+    ) -> "BaseScheduler":
+        """Build the scheduler, given per-tool outcomes of past runs."""
+        return cls()
+
+    @abstractmethod
+    def choose(self, adapters: List[BaseAdapter], iteration: int) -> BaseAdapter:
+        """Pick the adapter for `iteration` (1-based)."""
+        pass
+
+    def record(self, future: Future):
+        """Learn from a finished future of this run."""
+        pass
+
+
+class RoundRobinScheduler(BaseScheduler):
+    name = "round_robin"
+
+    def choose(self, adapters: List[BaseAdapter], iteration: int) -> BaseAdapter:
+        return adapters[(iteration - 1) % len(adapters)]
+
+
+class BanditScheduler(BaseScheduler):
+    """
+    Thompson sampling over adapters.
+
+    Each tool's success rate gets a Beta posterior from its history (past
+    runs, see `RunCatalog.tool_stats`) plus this run's finished futures. A
+    sample from it is discounted by the tool's mean duration and cost
+    relative to the slowest/most expensive tool, and the best tool wins.
+    Tools with no observations at all are tried once first, in order.
+    """
+
+    name = "bandit"
+
+    def __init__(
+        self,
+        history: Optional[Dict[str, ToolStats]] = None,
+        duration_weight: float = 0.1,
+        cost_weight: float = 0.1,
+        seed: Optional[int] = None,
+    ):
+        self.stats: Dict[str, ToolStats] = {
+            tool: ToolStats(s.attempts, s.successes, s.mean_duration, s.mean_cost_usd)
+            for tool, s in (history or {}).items()
+        }
+        self.duration_weight = duration_weight
+        self.cost_weight = cost_weight
+        self._in_flight: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_history(
+        cls, history: Optional[Dict[str, ToolStats]] = None
+    ) -> "BaseScheduler":
+        return cls(history)
+
+    def choose(self, adapters: List[BaseAdapter], iteration: int) -> BaseAdapter:
+        by_name = {adapter.capabilities().name: adapter for adapter in adapters}
+        with self._lock:
+            untried = [
+                name
+                for name in by_name
+                if self._stats(name).attempts + self._in_flight.get(name, 0) == 0
+            ]
+            if untried:
+                choice = untried[0]
+            else:
+                choice = max(by_name, key=self._sample)
+            self._in_flight[choice] = self._in_flight.get(choice, 0) + 1
+        return by_name[choice]
+
+    def record(self, future: Future):
+        with self._lock:
+            tool = future.tool_name
+            if self._in_flight.get(tool):
+                self._in_flight[tool] -= 1
+            if future.result is None or future.status == FutureStatus.SKIPPED:
+                # Cancelled futures say nothing about the tool
+                return
+            stats = self.stats.setdefault(tool, ToolStats())
+            stats.mean_duration = _running_mean(
+                stats.mean_duration, stats.attempts, future.result.duration_seconds
+            )
+            cost = future.result.cost_info.get("cost_usd")
+            if cost is not None:
+                stats.mean_cost_usd = _running_mean(
+                    stats.mean_cost_usd, stats.attempts, cost
+                )
+            stats.attempts += 1
+            if future.result.exit_code == 0:
+                stats.successes += 1
+
+    def _stats(self, tool: str) -> ToolStats:
+        return self.stats.get(tool) or ToolStats()
+
+    def _sample(self, tool: str) -> float:
+        stats = self._stats(tool)
+        failures = max(stats.attempts - stats.successes, 0)
+        value = self._random.betavariate(stats.successes + 1, failures + 1)
+        value -= self.duration_weight * self._relative(tool, "mean_duration")
+        value -= self.cost_weight * self._relative(tool, "mean_cost_usd")
+        return value
+
+    def _relative(self, tool: str, attr: str) -> float:
+        """`attr` of `tool` as a fraction of the largest value among tools."""
+        mine = getattr(self._stats(tool), attr)
+        largest = max(
+            (getattr(s, attr) or 0.0 for s in self.stats.values()), default=0.0
+        )
+        if not mine or not largest:
+            return 0.0
+        return mine / largest
+
+
+def _running_mean(mean: Optional[float], count: int, value: float) -> float:
+    if mean is None or count == 0:
+        return float(value)
+    return mean + (value - mean) / (count + 1)
+
+
+SCHEDULERS: Dict[str, Type[BaseScheduler]] = {
+    RoundRobinScheduler.name: RoundRobinScheduler,
+    BanditScheduler.name: BanditScheduler,
+}
+
+
+def create_scheduler(
+    name: str, history: Optional[Dict[str, ToolStats]] = None
+) -> BaseScheduler:
+    """Instantiate a registered scheduler by name."""
+    try:
+        cls = SCHEDULERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown scheduler: {name}") from None
+    return cls.from_history(history)
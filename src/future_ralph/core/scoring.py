@@ -1,6 +1,21 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from future_ralph.core.models import Future, FutureStatus
+from typing import Any, Dict, List, Optional
+from future_ralph.adapters.usage import total_tokens
+from future_ralph.core.models import CaseResult, Future, FutureStatus
+from future_ralph.core.outcomes import pass_ratio, regressions
+
+# Points deducted per USD an attempt cost
+COST_PENALTY_PER_USD = 10.0
+# Cap on the cost penalty, so cost never ranks a failing future above a passing one
+MAX_COST_PENALTY = 50.0
+# USD per million tokens used to price futures whose tool reported no cost
+# (and has no `token_prices` entry), so they are not ranked as free
+ESTIMATED_USD_PER_MILLION_TOKENS = 10.0
+# Points a failing future earns for the share of its tests that pass
+PARTIAL_CREDIT = 50.0
+# Points deducted per test that passed before the change and fails with it
+REGRESSION_PENALTY = 5.0
+MAX_REGRESSION_PENALTY = 50.0
 
 
 class BaseScoringPolicy(ABC):
@@ -16,6 +31,10 @@ class BaseScoringPolicy(ABC):
 
 
 class DefaultScoringPolicy(BaseScoringPolicy):
+    def __init__(self) -> None:
+        # Per-test results of the unchanged repository (set by the engine)
+        self.baseline: Dict[str, CaseResult] = {}
+
     def score(self, future: Future) -> float:
         if not future.result:
             return -1.0
@@ -25,23 +44,53 @@ class DefaultScoringPolicy(BaseScoringPolicy):
         if future.result.exit_code == 0:
             score += 100.0
         else:
-            # Penalize failures
+            # Penalize failures, less so the closer the tests came to passing
             score -= 10.0
+            ratio = pass_ratio(future.tests)
+            if ratio is not None:
+                score += PARTIAL_CREDIT * ratio
+                broken = len(regressions(future.tests, self.baseline))
+                score -= min(broken * REGRESSION_PENALTY, MAX_REGRESSION_PENALTY)
 
         # Penalize huge diffs (heuristic: smaller diffs are better if they work)
-        if future.result.diff:
-            score -= len(future.result.diff) / 1000.0
+        diff_bytes = future.result.diff_stats.get("bytes")
+        if diff_bytes is None and future.result.diff:
+            diff_bytes = len(future.result.diff)
+        if diff_bytes:
+            score -= diff_bytes / 1000.0
+
+        # Prefer the cheaper of otherwise equal futures
+        cost = _cost(future.result.cost_info)
+        if cost > 0:
+            score -= min(cost * COST_PENALTY_PER_USD, MAX_COST_PENALTY)
 
         return score
 
     def select_best(self, futures: List[Future]) -> Optional[Future]:
-        # Filter for completed, non-treehouse futures
+        # Filter for completed, non-treehouse futures; a duplicate carries
+        # the same patch as the future it copied its verdict from
         valid_futures = [
             f
             for f in futures
-            if f.status == FutureStatus.COMPLETED and not f.is_treehouse
+            if f.status == FutureStatus.COMPLETED
+            and not f.is_treehouse
+            and not f.metadata.get("duplicate_of")
         ]
         if not valid_futures:
             return None
 
-        return max(valid_futures, key=lambda f: f.score)
+        # Passing comes first: the penalties can outweigh the gap between a
+        # pass and a near miss, so score only ranks within each group
+        return max(valid_futures, key=lambda f: (_passed(f), f.score))
+
+
+def _cost(cost_info: Dict[str, Any]) -> float:
+    """A future's reported cost, or one estimated from its tokens."""
+    cost = cost_info.get("cost_usd")
+    if isinstance(cost, (int, float)):
+        return float(cost)
+    return total_tokens(cost_info) * ESTIMATED_USD_PER_MILLION_TOKENS / 1_000_000
+
+
+def _passed(future: Future) -> bool:
+    return future.result is not None and future.result.exit_code == 0
@@ -0,0 +1,194 @@
+import ast
+import json
+import os
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+# Directories never scanned for Python modules
+SKIP_DIRS = {
+    ".git",
+    ".hg",
+    ".tox",
+    ".nox",
+    ".venv",
+    "venv",
+    "__pycache__",
+    "node_modules",
+    "build",
+    "dist",
+    "runs",
+}
+# Changed files with these suffixes cannot affect test outcomes
+INERT_SUFFIXES = {".md", ".rst"}
+
+
+def is_test_file(path: str) -> bool:
+    name = os.path.basename(path)
+    return name.endswith(".py") and (
+        name.startswith("test_") or name.endswith("_test.py")
+    )
+
+
+def _dotted(path: str) -> List[str]:
+    parts = path[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return parts
+
+
+class ImportGraph:
+    """
+    Which Python files import which, for a source tree.
+
+    `imports` maps a file (relative, '/'-separated) to the files it imports.
+    Module names are registered under every dotted suffix of their path, so
+    both `src/pkg/mod.py` and namespace packages resolve without knowing the
+    project's import roots.
+    """
+
+    def __init__(self, imports: Dict[str, List[str]]):
+        self.imports = imports
+        self._importers: Dict[str, Set[str]] = {}
+        for source, targets in imports.items():
+            for target in targets:
+                self._importers.setdefault(target, set()).add(source)
+
+    @classmethod
+    def build(cls, root: Path) -> "ImportGraph":
+        files = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [
+                d for d in dirnames if d not in SKIP_DIRS and not d.startswith(".")
+            ]
+            for filename in filenames:
+                if filename.endswith(".py"):
+                    rel = os.path.relpath(os.path.join(dirpath, filename), root)
+                    files.append(rel.replace(os.sep, "/"))
+
+        modules: Dict[str, Set[str]] = {}
+        for rel in files:
+            parts = _dotted(rel)
+            for i in range(len(parts)):
+                modules.setdefault(".".join(parts[i:]), set()).add(rel)
+
+        imports = {}
+        for rel in files:
+            targets: Set[str] = set()
+            for name in _imported_names(root / rel, _dotted(rel), rel):
+                targets.update(_resolve(name, modules))
+            targets.discard(rel)
+            imports[rel] = sorted(targets)
+        return cls(imports)
+
+    def affected_tests(self, changed: Iterable[str]) -> Optional[List[str]]:
+        """
+        Test files that (transitively) import any of the changed files.
+        Returns None when the change cannot be mapped safely, in which case
+        the caller should run the full suite.
+        """
+        seeds = []
+        for path in changed:
+            if os.path.splitext(path)[1] in INERT_SUFFIXES:
+                continue
+            if not path.endswith(".py") or os.path.basename(path) == "conftest.py":
+                return None
+            seeds.append(path)
+
+        affected = set()
+        seen = set(seeds)
+        queue = deque(seeds)
+        while queue:
+            path = queue.popleft()
+            if is_test_file(path):
+                affected.add(path)
+            for importer in self._importers.get(path, ()):
+                if importer not in seen:
+                    seen.add(importer)
+                    queue.append(importer)
+        return sorted(affected)
+
+    def to_json(self) -> str:
+        return json.dumps({"imports": self.imports})
+
+    @classmethod
+    def from_json(cls, data: str) -> "ImportGraph":
+        return cls(json.loads(data)["imports"])
+
+
+def _imported_names(path: Path, dotted: List[str], rel: str) -> Set[str]:
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (SyntaxError, ValueError, OSError):
+        return set()
+
+    package = dotted if rel.endswith("__init__.py") else dotted[:-1]
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package[: len(package) - (node.level - 1)]
+                prefix = ".".join(base + ([node.module] if node.module else []))
+            else:
+                prefix = node.module or ""
+            if prefix:
+                names.add(prefix)
+            # `from pkg import mod` may name a submodule
+            names.update(
+                f"{prefix}.{alias.name}" if prefix else alias.name
+                for alias in node.names
+            )
+    return names
+
+
+def _resolve(name: str, modules: Dict[str, Set[str]]) -> Set[str]:
+    """Files for the longest known prefix of a dotted import name."""
+    parts = name.split(".")
+    for i in range(len(parts), 0, -1):
+        found = modules.get(".".join(parts[:i]))
+        if found:
+            return found
+    return set()
+
+
+def tree_revision(root: Path) -> Optional[str]:
+    """The git tree id of a clean source directory, or None if uncacheable."""
+    try:
+        tree = subprocess.run(
+            ["git", "rev-parse", "HEAD:./"], cwd=root, capture_output=True, text=True
+        )
+        if tree.returncode != 0:
+            return None
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no", "."],
+            cwd=root,
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return None
+    if dirty.returncode != 0 or dirty.stdout.strip():
+        return None
+    return tree.stdout.strip()
+
+
+def load_import_graph(root: Path, cache_dir: Path) -> ImportGraph:
+    """Build the import graph for `root`, cached per git tree revision."""
+    revision = tree_revision(root)
+    cache_file = cache_dir / "import-graph" / f"{revision}.json"
+    if revision and cache_file.exists():
+        try:
+            return ImportGraph.from_json(cache_file.read_text())
+        except (ValueError, KeyError):
+            pass
+
+    graph = ImportGraph.build(root)
+    if revision:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(graph.to_json())
+        os.replace(tmp, cache_file)
+    return graph
@@ -0,0 +1,247 @@
+import json
+import os
+import select
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Per-run snapshot of the folded log state and how far it has been read
+SNAPSHOT_FILE = "status.json"
+SNAPSHOT_VERSION = 1
+
+# Most bytes of a log read per poll, so one huge log cannot stall a redraw
+READ_CHUNK = 4 * 1024 * 1024
+
+
+@dataclass
+class FutureState:
+    tool: Optional[str] = None
+    state: str = "running"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    score: Optional[float] = None
+    exit_code: Optional[int] = None
+    lines: int = 0
+    last_line: str = ""
+    stages: List[str] = field(default_factory=list)
+    cached: bool = False
+
+
+@dataclass
+class RunState:
+    prompt: Optional[str] = None
+    status: str = "running"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    timeout_per_iter: Optional[float] = None
+    max_iters: Optional[int] = None
+    best_future: Optional[str] = None
+    budget_exhausted: Optional[str] = None
+    futures: Dict[str, FutureState] = field(default_factory=dict)
+
+    def apply(self, event: str, data: Dict[str, Any], ts: float):
+        """Fold one `run.jsonl` event into the state."""
+        future_id = data.get("future_id")
+        future = self.futures.get(future_id) if future_id else None
+        if event == "run_started":
+            self.prompt = data.get("prompt")
+            self.started_at = ts
+        elif event == "run_configured":
+            self.timeout_per_iter = data.get("timeout_per_iter")
+            self.max_iters = data.get("max_iters")
+        elif event == "iteration_started" and future_id:
+            self.futures[future_id] = FutureState(tool=data.get("tool"), started_at=ts)
+        elif future is None:
+            if event == "best_future_selected":
+                self.best_future = data.get("future_id")
+            elif event == "budget_exhausted":
+                self.budget_exhausted = data.get("budget")
+            elif event == "run_completed":
+                self.status = data.get("status") or "failed"
+                self.finished_at = ts
+        elif event == "agent_progress":
+            future.lines = data.get("lines", future.lines)
+            future.last_line = data.get("last_line", "")
+        elif event == "test_stage_completed":
+            future.state = "testing"
+            future.stages.append(f"{data.get('stage')}={data.get('exit_code')}")
+        elif event == "future_cache_hit":
+            future.cached = True
+        elif event == "best_future_selected":
+            self.best_future = future_id
+        elif event in (
+            "iteration_completed",
+            "iteration_failed",
+            "iteration_cancelled",
+        ):
+            future.state = {
+                "iteration_completed": "completed",
+                "iteration_failed": "failed",
+                "iteration_cancelled": "skipped",
+            }[event]
+            future.finished_at = ts
+            future.score = data.get("score")
+            future.exit_code = data.get("exit_code")
+
+
+class RunTail:
+    """
+    Follows one run's `run.jsonl`, reading only the bytes appended since
+    the last call and folding their events into a `RunState`.
+
+    The state and byte offset can be saved next to the log, so a later
+    `status` resumes where this one stopped instead of re-parsing the file.
+    """
+
+    def __init__(self, run_dir: Path):
+        self.run_dir = run_dir
+        self.log_file = run_dir / "run.jsonl"
+        self.offset = 0
+        self.state = RunState()
+        self._saved_offset = 0
+
+    @classmethod
+    def load(cls, run_dir: Path) -> "RunTail":
+        """A tail resumed from the run's snapshot, if it has a usable one."""
+        tail = cls(run_dir)
+        try:
+            data = json.loads((run_dir / SNAPSHOT_FILE).read_text())
+            if data.get("version") == SNAPSHOT_VERSION:
+                state = data["state"]
+                futures = {
+                    fid: FutureState(**f) for fid, f in state.pop("futures").items()
+                }
+                tail.state = RunState(**state, futures=futures)
+                tail.offset = tail._saved_offset = data["offset"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return tail
+
+    def save(self):
+        """Write the snapshot, if anything was read since it was loaded."""
+        if self.offset == self._saved_offset:
+            return
+        path = self.run_dir / SNAPSHOT_FILE
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp.write_text(
+                json.dumps(
+                    {
+                        "version": SNAPSHOT_VERSION,
+                        "offset": self.offset,
+                        "state": asdict(self.state),
+                    }
+                )
+            )
+            os.replace(tmp, path)
+            self._saved_offset = self.offset
+        except OSError:
+            # Read-only runs directory: status still works, just slower
+            pass
+
+    def poll(self) -> bool:
+        """Read newly appended events; returns whether there were any."""
+        try:
+            size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            return False
+        if size < self.offset:
+            # Truncated or replaced: start over
+            self.offset = 0
+            self.state = RunState()
+        if size == self.offset:
+            return False
+
+        with open(self.log_file, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(min(size - self.offset, READ_CHUNK))
+        # Only whole lines; a partly written one is read again next time
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            if len(chunk) < READ_CHUNK:
+                return False
+            # A single line longer than READ_CHUNK is no event of ours
+            end = len(chunk)
+        for line in chunk[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                self.state.apply(
+                    entry["event"], entry.get("data") or {}, entry["timestamp"]
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+        self.offset += end
+        return True
+
+    @property
+    def behind(self) -> bool:
+        """Whether the log holds more than has been read."""
+        try:
+            return self.log_file.stat().st_size > self.offset
+        except FileNotFoundError:
+            return False
+
+
+class LogWatcher:
+    """
+    Waits for run logs to change, with inotify on Linux and by polling
+    elsewhere.
+    """
+
+    # inotify(7) flags
+    _IN_MODIFY = 0x002
+    _IN_CREATE = 0x100
+
+    def __init__(self) -> None:
+        self._fd: Optional[int] = None
+        self._watched: Dict[Path, int] = {}
+        self._libc: Any = None
+        try:
+            import ctypes
+            import ctypes.util
+
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd >= 0:
+            self._libc, self._fd = libc, fd
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._fd is not None
+
+    def watch(self, directories: Iterable[Path]):
+        """Watch these directories (for created and modified files)."""
+        if self._fd is None:
+            return
+        for directory in directories:
+            if directory in self._watched:
+                continue
+            wd = self._libc.inotify_add_watch(
+                self._fd, os.fsencode(directory), self._IN_MODIFY | self._IN_CREATE
+            )
+            if wd >= 0:
+                self._watched[directory] = wd
+
+    def wait(self, timeout: float) -> bool:
+        """Block until something changed or `timeout` passed; True if changed."""
+        if self._fd is None:
+            time.sleep(timeout)
+            return True
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain the queued events; which file changed does not matter
+        try:
+            while os.read(self._fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
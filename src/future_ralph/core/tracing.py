@@ -0,0 +1,161 @@
+import contextlib
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+from future_ralph.core.retention import iter_run_lines
+
+TRACE_FILE = "trace.jsonl"
+
+# Spans that cover a whole run or future rather than one of its phases
+RUN_SPAN = "run"
+ITERATION_SPAN = "iteration"
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    end: float
+    future_id: Optional[str] = None
+    thread: str = ""
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Tracer:
+    """
+    Records timed spans for the phases of a run to `trace.jsonl` in the run
+    directory, one JSON object per finished span.
+
+    Spans are appended as they end, so the trace of a run still in progress
+    can be read too.
+    """
+
+    def __init__(self, run_dir: Path):
+        self.path = run_dir / TRACE_FILE
+        self._lock = threading.Lock()
+        # Owns the trace file once the first span is recorded
+        self._files = contextlib.ExitStack()
+        self._file: Optional[TextIO] = None
+
+    @contextlib.contextmanager
+    def span(
+        self, name: str, future_id: Optional[str] = None, **attrs: Any
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block. Yields the span's attributes, which the
+        block may add to.
+        """
+        start = time.time()
+        try:
+            yield attrs
+        finally:
+            self.record(name, start, time.time(), future_id, **attrs)
+
+    def record(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        future_id: Optional[str] = None,
+        **attrs: Any,
+    ):
+        """Add a span measured elsewhere."""
+        span = Span(name, start, end, future_id, threading.current_thread().name, attrs)
+        line = json.dumps(asdict(span), default=str) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(line)
+            self._file.flush()
+
+    def _open(self) -> TextIO:
+        return self._files.enter_context(open(self.path, "a"))
+
+    def close(self):
+        with self._lock:
+            self._files.close()
+            self._file = None
+
+
+def load_spans(run_dir: Path) -> List[Span]:
+    """The spans recorded for a run, by start time; empty if it has no trace."""
+    spans = []
+    for line in iter_run_lines(run_dir, TRACE_FILE):
+        try:
+            spans.append(Span(**json.loads(line)))
+        except (ValueError, TypeError):
+            # A line cut short by a crash
+            continue
+    spans.sort(key=lambda s: s.start)
+    return spans
+
+
+def phase_breakdown(spans: List[Span]) -> Dict[str, Dict[str, float]]:
+    """Count, total, mean and max seconds of each phase."""
+    phases: Dict[str, Dict[str, float]] = {}
+    for span in spans:
+        if span.name in (RUN_SPAN, ITERATION_SPAN):
+            continue
+        stats = phases.setdefault(span.name, {"count": 0, "total": 0.0, "max": 0.0})
+        stats["count"] += 1
+        stats["total"] += span.duration
+        stats["max"] = max(stats["max"], span.duration)
+    for stats in phases.values():
+        stats["mean"] = stats["total"] / stats["count"]
+    return phases
+
+
+def critical_path(spans: List[Span]) -> List[Span]:
+    """
+    The chain of futures and run-level phases that determined the run's
+    wall time: walking back from the end of the run, the span that finished
+    last before the current point, then the one that finished last before
+    that span started, and so on. Gaps between them are orchestration
+    overhead (or idle slots).
+    """
+    top_level = [
+        s
+        for s in spans
+        if s.name != RUN_SPAN and (s.future_id is None or s.name == ITERATION_SPAN)
+    ]
+    runs = [s for s in spans if s.name == RUN_SPAN]
+    cursor = max(s.end for s in runs) if runs else float("inf")
+    path: List[Span] = []
+    while True:
+        candidates = [s for s in top_level if s.end <= cursor and s.start < cursor]
+        if not candidates:
+            break
+        latest = max(candidates, key=lambda s: (s.end, s.duration))
+        path.append(latest)
+        cursor = latest.start
+    path.reverse()
+    return path
+
+
+def chrome_trace(spans: List[Span]) -> Dict[str, Any]:
+    """
+    The spans in Chrome trace event format, loadable in chrome://tracing or
+    Perfetto; each future gets its own track.
+    """
+    events = []
+    for span in spans:
+        events.append(
+            {
+                "name": span.name,
+                "cat": "future_ralph",
+                "ph": "X",
+                "ts": span.start * 1_000_000,
+                "dur": span.duration * 1_000_000,
+                "pid": 1,
+                "tid": span.future_id or "run",
+                "args": span.attrs,
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,366 @@
+import contextlib
+import copy
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from future_ralph.adapters.base import (
+    BaseAdapter,
+    OutputEvent,
+    ResourceLimits,
+    run_shell,
+)
+from future_ralph.core.models import CaseResult, PipelineStage
+from future_ralph.core.outcomes import REPORT_ENV, encode, read_report, summarize
+from future_ralph.core.workspace import WorkspaceError, WorkspaceManager
+
+# A worker that has not checked in for this long is considered gone
+WORKER_TTL = 30.0
+# Seconds between a worker's heartbeats, and between its looks for new jobs
+HEARTBEAT_INTERVAL = 5.0
+POLL_INTERVAL = 0.5
+
+
+class FileJobQueue:
+    """
+    Future jobs shared between a coordinator and workers through a
+    directory, e.g. on a network filesystem every host mounts:
+
+    - `jobs/<tool>/<job_id>.json`: published, waiting for a worker with `tool`
+    - `claimed/<job_id>.json`: taken by a worker (claimed with an atomic rename)
+    - `progress/<job_id>.jsonl`: output lines, appended as the agent runs
+    - `results/<job_id>.json`: the outcome, written once
+    - `cancel/<job_id>`: asks the worker to stop
+    - `workers/<worker_id>.json`: each worker's tools and last heartbeat
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        for name in ("jobs", "claimed", "progress", "results", "cancel", "workers"):
+            (root / name).mkdir(parents=True, exist_ok=True)
+
+    def publish(self, tool: str, job: Dict[str, Any]) -> str:
+        # Names sort by submission time, so workers take jobs in order
+        job_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+        directory = self.root / "jobs" / tool
+        directory.mkdir(exist_ok=True)
+        _write_json(directory / f"{job_id}.json", {**job, "id": job_id, "tool": tool})
+        return job_id
+
+    def claim(self, tools: List[str]) -> Optional[Dict[str, Any]]:
+        """Take the oldest job for one of `tools`, or None if there is none."""
+        pending: List[Path] = []
+        for tool in tools:
+            directory = self.root / "jobs" / tool
+            if directory.is_dir():
+                pending.extend(directory.glob("*.json"))
+        for path in sorted(pending, key=lambda p: p.name):
+            claimed = self.root / "claimed" / path.name
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                # Another worker was faster
+                continue
+            return json.loads(claimed.read_text())
+        return None
+
+    def withdraw(self, tool: str, job_id: str) -> bool:
+        """Remove a job no worker has claimed yet; False if one already has."""
+        try:
+            (self.root / "jobs" / tool / f"{job_id}.json").unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
+    @contextlib.contextmanager
+    def progress(self, job_id: str) -> Iterator[Callable[[OutputEvent], None]]:
+        """
+        A function that appends output events to the job's progress, through
+        one handle kept open for as long as the block runs.
+        """
+        with open(self.root / "progress" / f"{job_id}.jsonl", "a") as f:
+
+            def post(event: OutputEvent):
+                f.write(json.dumps(dataclasses.asdict(event)) + "\n")
+                f.flush()
+
+            yield post
+
+    def read_progress(
+        self, job_id: str, offset: int = 0
+    ) -> Tuple[List[OutputEvent], int]:
+        """Output events appended since `offset`, and the new offset."""
+        try:
+            with open(self.root / "progress" / f"{job_id}.jsonl", "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        end = data.rfind(b"\n") + 1
+        events = [OutputEvent(**json.loads(line)) for line in data[:end].splitlines()]
+        return events, offset + end
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        _write_json(self.root / "results" / f"{job_id}.json", result)
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads((self.root / "results" / f"{job_id}.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    def cancel(self, job_id: str):
+        (self.root / "cancel" / job_id).touch()
+
+    def cancelled(self, job_id: str) -> bool:
+        return (self.root / "cancel" / job_id).exists()
+
+    def forget(self, job_id: str):
+        """Remove everything left of a finished job."""
+        for path in (
+            self.root / "claimed" / f"{job_id}.json",
+            self.root / "progress" / f"{job_id}.jsonl",
+            self.root / "results" / f"{job_id}.json",
+            self.root / "cancel" / job_id,
+        ):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def heartbeat(self, worker_id: str, tools: List[str]):
+        _write_json(
+            self.root / "workers" / f"{worker_id}.json",
+            {"id": worker_id, "tools": tools, "updated": time.time()},
+        )
+
+    def retire(self, worker_id: str):
+        try:
+            (self.root / "workers" / f"{worker_id}.json").unlink()
+        except FileNotFoundError:
+            pass
+
+    def live_tools(self, ttl: float = WORKER_TTL) -> Set[str]:
+        """Tools offered by workers that checked in within `ttl` seconds."""
+        tools: Set[str] = set()
+        now = time.time()
+        for path in (self.root / "workers").glob("*.json"):
+            try:
+                info = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            if now - info.get("updated", 0) <= ttl:
+                tools.update(info.get("tools", []))
+        return tools
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+
+
+def run_stages(
+    stages: List[PipelineStage], cwd: str, limits: Optional[ResourceLimits] = None
+) -> Dict[str, Any]:
+    """
+    Run the eager test stages in order (under `limits`), stopping at the
+    first failure, and return the verdict; deferred stages are left
+    pending for the coordinator.
+    """
+    test_stages: List[Dict[str, Any]] = []
+    pending: List[str] = []
+    tests: Dict[str, CaseResult] = {}
+    exit_code = 0
+    with tempfile.TemporaryDirectory(prefix="ralph-reports-") as reports:
+        for stage in stages:
+            if stage.deferred:
+                pending.append(stage.name)
+                continue
+            start = time.time()
+            report = Path(reports) / stage.name
+            exit_code = run_shell(
+                stage.cmd,
+                cwd=cwd,
+                timeout=stage.timeout,
+                env={**os.environ, REPORT_ENV: str(report)},
+                limits=limits,
+            ).exit_code
+            record: Dict[str, Any] = {
+                "stage": stage.name,
+                "exit_code": exit_code,
+                "duration_seconds": time.time() - start,
+                "narrowed": False,
+            }
+            stage_tests = read_report(report)
+            if stage_tests:
+                tests.update(stage_tests)
+                record["tests"] = summarize(stage_tests)
+            test_stages.append(record)
+            if exit_code != 0:
+                break
+    return {
+        "stages": [dataclasses.asdict(stage) for stage in stages],
+        "exit_code": exit_code,
+        "test_stages": test_stages,
+        "pending_stages": pending if exit_code == 0 else [],
+        "tests": encode(tests),
+    }
+
+
+class Worker:
+    """
+    Runs future jobs from a `FileJobQueue` with local adapters: checks out
+    the job's commit plus the coordinator's local changes, runs the agent,
+    tests the result, and posts back the attempt, the patch and the verdict.
+
+    Repositories are cloned once into `work_dir` and fetched as needed.
+    """
+
+    def __init__(
+        self,
+        queue: FileJobQueue,
+        adapters: Dict[str, BaseAdapter],
+        work_dir: Path,
+        worker_id: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.adapters = adapters
+        self.work_dir = work_dir
+        self.id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+
+    def serve(self, max_jobs: Optional[int] = None):
+        """Take and run jobs until `stop()` (or after `max_jobs` jobs)."""
+        tools = sorted(self.adapters)
+        done = 0
+        last_beat = 0.0
+        try:
+            while not self._stop.is_set():
+                if time.time() - last_beat >= HEARTBEAT_INTERVAL:
+                    self.queue.heartbeat(self.id, tools)
+                    last_beat = time.time()
+                job = self.queue.claim(tools)
+                if job is None:
+                    self._stop.wait(POLL_INTERVAL)
+                    continue
+                self.queue.complete(job["id"], self.run_job(job))
+                done += 1
+                if max_jobs is not None and done >= max_jobs:
+                    break
+        finally:
+            self.queue.retire(self.id)
+
+    def stop(self):
+        self._stop.set()
+
+    def run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return self._run_job(job)
+        except (WorkspaceError, OSError, subprocess.CalledProcessError) as e:
+            return {"error": str(e), "worker": self.id}
+
+    def _run_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = job["id"]
+        mirror = self._mirror(job["repo"], job["ref"])
+        manager = WorkspaceManager(
+            mirror / job.get("subdir", ""), self.work_dir / "workspaces", "git"
+        )
+        workspace = manager.create(job_id)
+        try:
+            workspace.apply_diff(job.get("base_patch") or "")
+            if workspace.mark_base() != job["base_tree"]:
+                raise WorkspaceError(
+                    "Checkout does not match the coordinator's base tree"
+                )
+
+            cancel = threading.Event()
+            watcher = threading.Thread(
+                target=self._watch_cancel, args=(job_id, cancel), daemon=True
+            )
+            watcher.start()
+            log_dir = self.work_dir / "logs"
+            log_dir.mkdir(parents=True, exist_ok=True)
+            # The coordinator's limits, on a copy: other jobs may set their own
+            limits = ResourceLimits(**job["limits"]) if job.get("limits") else None
+            adapter = copy.copy(self.adapters[job["tool"]])
+            adapter.limits = limits
+            try:
+                with self.queue.progress(job_id) as post_progress:
+                    attempt = adapter.run(
+                        job["prompt"],
+                        cwd=str(workspace.path),
+                        model=job.get("model"),
+                        timeout=job.get("timeout"),
+                        log_path=str(log_dir / f"{job_id}.log"),
+                        on_event=post_progress,
+                        cancel=cancel,
+                    )
+            finally:
+                cancel.set()
+                watcher.join()
+
+            diff = attempt.diff if attempt.diff is not None else workspace.diff()
+            verdict = None
+            if not self.queue.cancelled(job_id):
+                stages = [PipelineStage(**stage) for stage in job.get("stages", [])]
+                verdict = run_stages(stages, str(workspace.path), limits)
+            return {
+                "worker": self.id,
+                "stdout": attempt.stdout,
+                "stderr": attempt.stderr,
+                "exit_code": attempt.exit_code,
+                "duration_seconds": attempt.duration_seconds,
+                "cost_info": attempt.cost_info,
+                "diff": diff or "",
+                "verdict": verdict,
+            }
+        finally:
+            manager.cleanup()
+
+    def _watch_cancel(self, job_id: str, cancel: threading.Event):
+        while not cancel.wait(POLL_INTERVAL):
+            if self.queue.cancelled(job_id):
+                cancel.set()
+
+    def _mirror(self, repo: str, ref: str) -> Path:
+        """A local clone of `repo`, checked out at `ref`."""
+        mirror = (
+            self.work_dir / "repos" / hashlib.sha256(repo.encode()).hexdigest()[:16]
+        )
+        if not (mirror / ".git").exists():
+            shutil.rmtree(mirror, ignore_errors=True)
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            _git(None, "clone", "--quiet", "--no-checkout", repo, str(mirror))
+        known = subprocess.run(
+            ["git", "cat-file", "-e", f"{ref}^{{commit}}"],
+            cwd=mirror,
+            capture_output=True,
+        )
+        if known.returncode != 0:
+            _git(mirror, "fetch", "--quiet", "origin")
+            known = subprocess.run(
+                ["git", "cat-file", "-e", f"{ref}^{{commit}}"],
+                cwd=mirror,
+                capture_output=True,
+            )
+            if known.returncode != 0:
+                # Not on any branch (e.g. a local commit): ask for it directly
+                _git(mirror, "fetch", "--quiet", "origin", ref)
+        _git(mirror, "checkout", "--quiet", "--force", "--detach", ref)
+        return mirror
+
+
+def _git(cwd: Optional[Path], *args: str):
+    proc = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise WorkspaceError(f"git {args[0]} failed: {proc.stderr.strip()}")
@@ -0,0 +1,430 @@
+import errno
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# ioctl request number for FICLONE (linux/fs.h); clones a file's extents
+_FICLONE = 0x40049409
+
+
+class WorkspaceError(RuntimeError):
+    pass
+
+
+class Workspace:
+    """
+    An isolated checkout a single future works in.
+
+    `root` is the checkout itself; `path` is the directory inside it that
+    corresponds to the source directory (they differ when the source is a
+    subdirectory of a larger git repository).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        root: Path,
+        path: Path,
+        kind: str,
+        source: Optional[Path] = None,
+    ):
+        self.name = name
+        self.root = root
+        self.path = path
+        self.kind = kind  # git, copy, none
+        self.source = source
+        self.ignore: Optional[Callable[[Path], bool]] = None
+        # git tree id of the checkout as created (HEAD plus local changes)
+        self.base_tree: Optional[str] = None
+
+    def changed_files(self) -> Optional[List[str]]:
+        """
+        Paths (relative to `path`) added, modified or deleted since creation.
+        Returns None when this kind of workspace cannot tell.
+        """
+        if self.kind == "git":
+            return self._git_changed_files()
+        if self.kind == "copy" and self.source is not None:
+            return _compare_trees(self.source, self.path, self.ignore)
+        return None
+
+    def _git_changed_files(self) -> Optional[List[str]]:
+        changed: Set[str] = set()
+        for args in (
+            ["diff", "--name-only", "--relative", "-z", "HEAD"],
+            ["ls-files", "--others", "--exclude-standard", "-z"],
+        ):
+            proc = subprocess.run(
+                ["git", *args], cwd=self.path, capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                return None
+            changed.update(filter(None, proc.stdout.split("\0")))
+        return sorted(changed)
+
+    def diff(self) -> Optional[str]:
+        """
+        Binary-safe patch (relative to `root`) of everything changed since
+        creation, or None when this kind of workspace cannot produce one.
+
+        Copy workspaces are compared with their source; their patches have
+        no base tree, so only duplicate detection within a run uses them.
+        """
+        if self.kind == "copy" and self.source is not None:
+            changed = _compare_trees(self.source, self.path, self.ignore)
+            return _diff_trees(self.source, self.path, changed)
+        if self.kind != "git" or self.base_tree is None:
+            return None
+        # Stage everything so new files are included; the index is ours alone
+        add = subprocess.run(["git", "add", "-A"], cwd=self.root, capture_output=True)
+        if add.returncode != 0:
+            return None
+        proc = subprocess.run(
+            ["git", "diff", "--cached", "--binary", self.base_tree],
+            cwd=self.root,
+            capture_output=True,
+        )
+        if proc.returncode != 0:
+            return None
+        return proc.stdout.decode(errors="surrogateescape")
+
+    def mark_base(self) -> str:
+        """Take the checkout's current contents as the base `diff()` compares to."""
+        if self.kind != "git":
+            raise WorkspaceError(f"A {self.kind} workspace has no base tree")
+        self.base_tree = _write_tree(self.root)
+        return self.base_tree
+
+    def apply_diff(self, patch: str):
+        """Apply a patch produced by `diff()` of a workspace with the same base."""
+        if self.kind != "git":
+            raise WorkspaceError(f"Cannot apply patches to a {self.kind} workspace")
+        if not patch:
+            return
+        proc = subprocess.run(
+            ["git", "apply", "--binary", "--whitespace=nowarn", "-"],
+            cwd=self.root,
+            input=patch.encode(errors="surrogateescape"),
+            capture_output=True,
+        )
+        if proc.returncode != 0:
+            raise WorkspaceError(
+                f"Could not apply patch: {proc.stderr.decode(errors='replace').strip()}"
+            )
+
+
+class WorkspaceManager:
+    """
+    Creates and tears down per-future workspaces for a run.
+
+    Modes:
+    - "git":  a detached `git worktree` of HEAD plus the source's local changes
+    - "copy": a copy of the source tree, using reflinks where supported
+    - "auto": "git" when the source is inside a git repository, else "copy"
+    - "none": every future works directly in the source directory
+    """
+
+    def __init__(self, source: Path, root: Path, mode: str = "auto"):
+        if mode not in ("auto", "git", "copy", "none"):
+            raise ValueError(f"Unknown workspace mode: {mode}")
+        self.source = source.resolve()
+        self.root = root.resolve()
+        self.mode = mode
+        self._workspaces: List[Workspace] = []
+        self._lock = threading.Lock()
+        self._git_toplevel: Optional[Path] = None
+        if mode in ("auto", "git"):
+            self._git_toplevel = self._find_git_toplevel()
+            if self._git_toplevel is None:
+                if mode == "git":
+                    raise WorkspaceError(
+                        f"{self.source} is not inside a git repository"
+                    )
+                self.mode = "copy"
+            else:
+                self.mode = "git"
+
+    def create(self, name: str) -> Workspace:
+        if self.mode == "none":
+            return Workspace(name, self.source, self.source, "none")
+
+        dest = self.root / name
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if self.mode == "git":
+            workspace = self._create_worktree(name, dest)
+        else:
+            ignore = self._ignore_root(self.source)
+            _clone_tree(self.source, dest, ignore)
+            workspace = Workspace(name, dest, dest, "copy", source=self.source)
+            workspace.ignore = ignore
+
+        with self._lock:
+            self._workspaces.append(workspace)
+        return workspace
+
+    def release(self, workspace: Workspace):
+        """Remove a single workspace. Safe to call more than once."""
+        with self._lock:
+            if workspace not in self._workspaces:
+                return
+            self._workspaces.remove(workspace)
+
+        if workspace.kind == "git":
+            with self._lock:
+                proc = self._git(
+                    "worktree", "remove", "--force", str(workspace.root), check=False
+                )
+            if proc.returncode == 0:
+                return
+        shutil.rmtree(workspace.root, ignore_errors=True)
+        if workspace.kind == "git":
+            with self._lock:
+                self._git("worktree", "prune", check=False)
+
+    def cleanup(self):
+        """Remove every workspace created by this manager."""
+        for workspace in list(self._workspaces):
+            self.release(workspace)
+
+    def _create_worktree(self, name: str, dest: Path) -> Workspace:
+        assert self._git_toplevel is not None
+        # Concurrent `git worktree add` calls race on the repository's admin files
+        with self._lock:
+            proc = self._git(
+                "worktree", "add", "--detach", str(dest), "HEAD", check=False
+            )
+        if proc.returncode != 0:
+            raise WorkspaceError(f"git worktree add failed: {proc.stderr.strip()}")
+
+        workspace = Workspace(
+            name,
+            dest,
+            dest / self.source.relative_to(self._git_toplevel),
+            "git",
+            source=self.source,
+        )
+        try:
+            self._carry_local_changes(dest)
+            workspace.base_tree = _write_tree(dest)
+        except Exception:
+            with self._lock:
+                self._workspaces.append(workspace)
+            self.release(workspace)
+            raise
+        return workspace
+
+    def _carry_local_changes(self, dest: Path):
+        """Bring uncommitted and untracked changes from the source into a worktree."""
+        assert self._git_toplevel is not None
+        # Read the source repository while no `git worktree add` is half done
+        with self._lock:
+            diff = self._git("diff", "HEAD", "--binary", text=False)
+            untracked = self._git("ls-files", "--others", "--exclude-standard", "-z")
+        if diff.stdout.strip():
+            proc = subprocess.run(
+                ["git", "apply", "--binary", "--whitespace=nowarn", "-"],
+                cwd=dest,
+                input=diff.stdout,
+                capture_output=True,
+            )
+            if proc.returncode != 0:
+                raise WorkspaceError(
+                    f"Could not apply local changes to workspace: "
+                    f"{proc.stderr.decode(errors='replace').strip()}"
+                )
+
+        ignore = self._ignore_root(self._git_toplevel)
+        for rel in filter(None, untracked.stdout.split("\0")):
+            src = self._git_toplevel / rel
+            if (ignore is not None and ignore(src)) or not src.is_file():
+                continue
+            target = dest / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            _reflink_or_copy(str(src), str(target))
+
+    def _ignore_root(self, base: Path) -> Optional[Callable[[Path], bool]]:
+        """Never copy the directory that holds the workspaces into a workspace."""
+        try:
+            rel = self.root.relative_to(base)
+        except ValueError:
+            return None
+        if not rel.parts:
+            return None
+        skipped = base / rel.parts[0]
+        return lambda path: path == skipped or skipped in path.parents
+
+    def _find_git_toplevel(self) -> Optional[Path]:
+        try:
+            proc = subprocess.run(
+                ["git", "rev-parse", "--show-toplevel"],
+                cwd=self.source,
+                capture_output=True,
+                text=True,
+            )
+        except OSError:
+            return None
+        if proc.returncode != 0:
+            return None
+        head = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", "HEAD"],
+            cwd=self.source,
+            capture_output=True,
+            text=True,
+        )
+        if head.returncode != 0:
+            # No commits yet, nothing to check out
+            return None
+        return Path(proc.stdout.strip()).resolve()
+
+    def _git(self, *args: str, check: bool = True, text: bool = True):
+        proc = subprocess.run(
+            ["git", *args], cwd=self._git_toplevel, capture_output=True, text=text
+        )
+        if check and proc.returncode != 0:
+            stderr = proc.stderr if text else proc.stderr.decode(errors="replace")
+            raise WorkspaceError(f"git {args[0]} failed: {stderr.strip()}")
+        return proc
+
+
+def _write_tree(worktree: Path) -> str:
+    """Stage a worktree's full contents and return the resulting tree id."""
+    for args in (["add", "-A"], ["write-tree"]):
+        proc = subprocess.run(
+            ["git", *args], cwd=worktree, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            raise WorkspaceError(f"git {args[0]} failed: {proc.stderr.strip()}")
+    return proc.stdout.strip()
+
+
+def _diff_trees(before: Path, after: Path, paths: List[str]) -> Optional[str]:
+    """
+    Binary-safe patch turning `paths` in `before` into those in `after`,
+    built in a throwaway object store so neither needs to be a repository.
+    None if git is unavailable or fails.
+    """
+    if not paths:
+        return ""
+    with tempfile.TemporaryDirectory(prefix="ralph-diff-") as git_dir:
+        env = {**os.environ, "GIT_DIR": git_dir, "GIT_LITERAL_PATHSPECS": "1"}
+        trees = []
+        try:
+            subprocess.run(
+                ["git", "init", "-q", "--bare", git_dir],
+                capture_output=True,
+                check=True,
+            )
+            for i, tree in enumerate((before, after)):
+                tree_env = {
+                    **env,
+                    "GIT_WORK_TREE": str(tree),
+                    "GIT_INDEX_FILE": os.path.join(git_dir, f"index{i}"),
+                }
+                present = [p for p in paths if os.path.lexists(tree / p)]
+                if present:
+                    subprocess.run(
+                        [
+                            "git",
+                            "add",
+                            "-f",
+                            "--pathspec-from-file=-",
+                            "--pathspec-file-nul",
+                        ],
+                        cwd=tree,
+                        env=tree_env,
+                        input="\0".join(present).encode(errors="surrogateescape"),
+                        capture_output=True,
+                        check=True,
+                    )
+                written = subprocess.run(
+                    ["git", "write-tree"],
+                    cwd=tree,
+                    env=tree_env,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                trees.append(written.stdout.strip())
+            proc = subprocess.run(
+                ["git", "diff", "--binary", *trees],
+                env=env,
+                capture_output=True,
+                check=True,
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    return proc.stdout.decode(errors="surrogateescape")
+
+
+def _reflink_or_copy(src: str, dst: str) -> str:
+    """Copy a file, cloning its extents instead of its bytes where possible."""
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return dst
+        except OSError as e:
+            if e.errno not in (
+                errno.EOPNOTSUPP,
+                errno.ENOTTY,
+                errno.EXDEV,
+                errno.EINVAL,
+                errno.ENOSYS,
+            ):
+                raise
+    return shutil.copy2(src, dst)
+
+
+def _snapshot(
+    root: Path, ignore: Optional[Callable[[Path], bool]] = None
+) -> Dict[str, Tuple[int, int]]:
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        if ignore is not None:
+            dirnames[:] = [d for d in dirnames if not ignore(Path(dirpath) / d)]
+        for filename in filenames:
+            path = Path(dirpath) / filename
+            try:
+                st = path.lstat()
+            except OSError:
+                continue
+            entries[str(path.relative_to(root))] = (st.st_size, st.st_mtime_ns)
+    return entries
+
+
+def _compare_trees(
+    source: Path, copy: Path, ignore: Optional[Callable[[Path], bool]] = None
+) -> List[str]:
+    """Files that differ between a copy and its source (copies keep mtimes)."""
+    before = _snapshot(source, ignore)
+    after = _snapshot(copy)
+    changed = {p for p in after if before.get(p) != after[p]}
+    changed.update(p for p in before if p not in after)
+    return sorted(changed)
+
+
+def _clone_tree(src: Path, dst: Path, ignore: Optional[Callable[[Path], bool]]):
+    def ignore_names(directory: str, names: List[str]) -> List[str]:
+        if ignore is None:
+            return []
+        return [n for n in names if ignore(Path(directory) / n)]
+
+    try:
+        shutil.copytree(
+            src,
+            dst,
+            symlinks=True,
+            ignore=ignore_names,
+            copy_function=_reflink_or_copy,
+        )
+    except (OSError, shutil.Error) as e:
+        shutil.rmtree(dst, ignore_errors=True)
+        raise WorkspaceError(f"Could not copy {src} to {dst}: {e}") from e
@@ -1,31 +1,40 @@
 import typer
 import subprocess
-from typing import Optional
+import time
+from typing import Optional, TYPE_CHECKING
 import sys
 
-from future_ralph.core.run_manager import RunManager
-from future_ralph.core.engine import IterationEngine
-from future_ralph.core.models import RunConfig
-from future_ralph.core.config import ConfigManager
-from future_ralph.adapters.gemini import GeminiAdapter
-from future_ralph.adapters.opencode import OpenCodeAdapter
-from future_ralph.adapters.claude import ClaudeAdapter
-from future_ralph.adapters.codex import CodexAdapter
-
-if sys.version_info < (3, 10):
-    from importlib_metadata import entry_points
-else:
-    from importlib.metadata import entry_points
+# Keep module import cheap: everything below is imported where it is used,
+# so `status` & co. never pay for pydantic, yaml, asyncio or the adapters.
+if TYPE_CHECKING:
+    from future_ralph.core.config import ConfigManager
+    from future_ralph.core.plugin import Plugin
+    from future_ralph.core.run_manager import RunManager
+
+_plugins: list["Plugin"] = []
+_plugins_loaded = False
+_config_manager: Optional["ConfigManager"] = None
+
 
-from future_ralph.core.plugin import Plugin
+def _get_config_manager() -> "ConfigManager":
+    global _config_manager
+    if _config_manager is None:
+        from future_ralph.core.config import ConfigManager
 
-_plugins: list[Plugin] = []
-_config_manager = ConfigManager()
+        _config_manager = ConfigManager()
+    return _config_manager
 
 
 def load_plugins(app: typer.Typer):
     """Load plugins from entry points."""
-    global _plugins
+    global _plugins, _plugins_loaded
+    if _plugins_loaded:
+        return
+    _plugins_loaded = True
+
+    from importlib.metadata import entry_points
+    from future_ralph.core.plugin import Plugin
+
     try:
         discovered_plugins = entry_points(group="future_ralph.plugins")
         for entry_point in discovered_plugins:
@@ -38,7 +47,7 @@ def load_plugins(app: typer.Typer):
                     _plugins.append(plugin)
                 elif hasattr(plugin, "register"):
                     plugin.register(app)
-                    # If it doesn't strictly follow protocol but has register, we still add it
+                    # Doesn't strictly follow the protocol but has register: keep it
                     _plugins.append(plugin)  # type: ignore
             except Exception as e:
                 typer.echo(f"Failed to load plugin {entry_point.name}: {e}")
@@ -50,6 +59,7 @@ def load_plugins(app: typer.Typer):
 def trigger_post_run(
     run_id: str, prompt: str, status: str, best_future_id: Optional[str] = None
 ):
+    load_plugins(app)
     for plugin in _plugins:
         if hasattr(plugin, "post_run"):
             try:
@@ -60,8 +70,11 @@ def trigger_post_run(
 
 app = typer.Typer(help="Future-Ralph: A Heterogeneous Agent Wrapper")
 
-# Load plugins immediately
-load_plugins(app)
+# Shortest time between two redraws of `status --watch`
+WATCH_MIN_REFRESH = 0.25
+
+# Seconds `run --detach` waits for a daemon it started to accept the run
+DAEMON_START_TIMEOUT = 10.0
 
 
 @app.command()
@@ -71,19 +84,31 @@ def run(
     max_iters: Optional[int] = typer.Option(
         None, help="Maximum number of futures to explore"
     ),
+    rescan: bool = typer.Option(
+        False, "--rescan", help="Re-detect agent CLIs instead of using the cache"
+    ),
 ):
     """
     Run agents to explore possible futures.
     """
     typer.echo(f"Exploring futures for: {prompt}")
 
-    manager = RunManager()
-    run_obj = manager.create_run(prompt)
+    manager = _run_manager()
+    run_obj = manager.create_run(prompt, repo=_repo_id())
     typer.echo(f"Run ID: {run_obj.id}")
 
     if detach:
+        # Make sure run_started is on disk before the worker appends to the log
+        run_obj.close()
+        job = _submit_to_daemon(manager, run_obj.id, prompt, max_iters, rescan)
+        if job is not None:
+            typer.echo(
+                f"Run queued with the daemon (job {job['id']}). "
+                "Use 'future-ralph status' to check progress."
+            )
+            return
         typer.echo("Starting detached run...")
-        # Spawn background process
+        # No daemon could be started: spawn a one-off background process
         iters_arg = str(max_iters) if max_iters is not None else "default"
         cmd = [
             sys.executable,
@@ -94,55 +119,189 @@ def run(
             prompt,
             iters_arg,
         ]
+        if rescan:
+            cmd.append("--rescan")
         subprocess.Popen(cmd, start_new_session=True)
         typer.echo("Run detached. Use 'future-ralph status' to check progress.")
         return
 
-    _execute_run_logic(run_obj, prompt, max_iters)
+    try:
+        _execute_run_logic(run_obj, prompt, max_iters, rescan=rescan)
+    finally:
+        run_obj.close()
 
 
 @app.command(hidden=True)
-def internal_run(run_id: str, prompt: str, max_iters_arg: str):
+def internal_run(run_id: str, prompt: str, max_iters_arg: str, rescan: bool = False):
     """
     Internal command for detached execution.
     """
-    manager = RunManager()
+    manager = _run_manager()
     run_obj = manager.get_run(run_id)
     if not run_obj:
         return
 
     max_iters = int(max_iters_arg) if max_iters_arg != "default" else None
-    _execute_run_logic(run_obj, prompt, max_iters)
+    try:
+        _execute_run_logic(run_obj, prompt, max_iters, rescan=rescan)
+    finally:
+        run_obj.close()
+
+
+def _submit_to_daemon(
+    manager: "RunManager",
+    run_id: str,
+    prompt: str,
+    max_iters: Optional[int],
+    rescan: bool,
+) -> Optional[dict]:
+    """Queue a run with the daemon, starting one if none is running."""
+    from future_ralph.core.daemon import SOCKET_FILE, DaemonError, request
+
+    socket_path = manager.base_dir / SOCKET_FILE
+    message = {
+        "op": "submit",
+        "run_id": run_id,
+        "prompt": prompt,
+        "max_iters": max_iters,
+        "rescan": rescan,
+    }
+    try:
+        return request(socket_path, message)["job"]
+    except DaemonError:
+        pass
 
+    with open(manager.base_dir / "daemon.log", "a") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "future_ralph.main", "daemon"],
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    deadline = time.time() + DAEMON_START_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(0.1)
+        try:
+            return request(socket_path, message)["job"]
+        except DaemonError:
+            continue
+    return None
 
-def _execute_run_logic(run_obj, prompt: str, max_iters: Optional[int]):
-    # Load persistent config
-    config = _config_manager.load()
 
-    # Determine effective settings (CLI overrides Config)
-    effective_max_iters = max_iters if max_iters is not None else config.max_iters
+def _run_manager(configure_logging: bool = True) -> "RunManager":
+    from future_ralph.core.run_manager import RunManager
 
-    # Initialize all known adapters
-    possible_adapters = [
-        GeminiAdapter(),
-        OpenCodeAdapter(),
-        ClaudeAdapter(),
-        CodexAdapter(),
-    ]
+    if not configure_logging:
+        # Read-only commands never log, so skip loading the config
+        return RunManager()
+    config = _get_config_manager().load()
+    return RunManager(
+        logger_options={
+            "fsync": config.log_fsync,
+            "flush_interval": config.log_flush_interval,
+        }
+    )
 
-    # Filter for available adapters
-    adapters = []
-    for adapter in possible_adapters:
+
+def _repo_id() -> str:
+    """Identifies the repository runs are made against (the working directory)."""
+    from pathlib import Path
+
+    return str(Path.cwd().resolve())
+
+
+def _available_adapters(config, rescan: bool = False) -> list:
+    """The allowed adapters whose CLIs are installed (or whose workers are up)."""
+    from future_ralph.adapters.detection import detect_adapters
+    from future_ralph.adapters.registry import adapter_names, load_adapter
+    from future_ralph.core.cache import resolve_cache_dir
+
+    if config.worker_queue:
+        return _remote_adapters(config)
+
+    # Filter for available adapters, importing only the allowed ones
+    allowed = {}
+    for tool_name in adapter_names():
         # Check if tool is allowed by config (if list is empty, allow all)
-        tool_name = adapter.capabilities().name
         if config.active_tools and tool_name not in config.active_tools:
             continue
+        allowed[tool_name] = load_adapter(tool_name)
 
-        detection = adapter.detect()
-        if detection["found"]:
+    detections = detect_adapters(
+        allowed,
+        cache_path=resolve_cache_dir(config.cache_dir) / "detection.json",
+        rescan=rescan,
+    )
+    adapters = []
+    for tool_name, adapter in allowed.items():
+        if detections[tool_name]["found"]:
             adapters.append(adapter)
             typer.echo(f"Found agent: {tool_name}")
+    return adapters
+
+
+def _warm_adapters(warm: dict, config, rescan: bool = False) -> list:
+    """
+    The available adapters for `config`, detected once and kept in `warm`
+    across daemon runs. Each call gets its own copies, since a run sets its
+    resource limits on its adapters.
+    """
+    import copy
+
+    key = tuple(config.active_tools)
+    if rescan or not warm.get(key):
+        warm[key] = _available_adapters(config, rescan)
+    return [copy.copy(adapter) for adapter in warm[key]]
+
+
+def _remote_adapters(config) -> list:
+    """Adapters that hand futures to workers on the configured queue."""
+    from pathlib import Path
+    from future_ralph.adapters.registry import adapter_names
+    from future_ralph.adapters.remote import RemoteAdapter
+    from future_ralph.core.engine import pipeline_stages
+    from future_ralph.core.models import RunConfig
+    from future_ralph.core.workers import FileJobQueue
+
+    queue = FileJobQueue(Path(config.worker_queue).expanduser())
+    stages = pipeline_stages(
+        RunConfig(
+            test_cmd=config.test_cmd,
+            test_stages=config.test_stages,
+            test_results=config.test_results,
+        )
+    )
+    adapters = []
+    for tool_name in adapter_names():
+        if config.active_tools and tool_name not in config.active_tools:
+            continue
+        adapter = RemoteAdapter(tool_name, queue, config.worker_repo, stages)
+        # Worker liveness changes from run to run, so this is never cached
+        if adapter.detect()["found"]:
+            adapters.append(adapter)
+            typer.echo(f"Found agent: {tool_name} (remote)")
+    return adapters
 
+
+def _execute_run_logic(
+    run_obj,
+    prompt: str,
+    max_iters: Optional[int],
+    rescan: bool = False,
+    adapters: Optional[list] = None,
+):
+    from future_ralph.core.engine import IterationEngine
+    from future_ralph.core.models import RunConfig
+    from future_ralph.core.scheduler import create_scheduler
+
+    # Load persistent config
+    config = _get_config_manager().load()
+
+    # Determine effective settings (CLI overrides Config)
+    effective_max_iters = max_iters if max_iters is not None else config.max_iters
+
+    if adapters is None:
+        adapters = _available_adapters(config, rescan)
     if not adapters:
         typer.echo(
             "Error: No supported agents found. Please run 'future-ralph setup' or install an agent CLI."
@@ -154,8 +313,34 @@ def _execute_run_logic(run_obj, prompt: str, max_iters: Optional[int]):
         timeout_per_iter=config.timeout_per_iter,
         test_cmd=config.test_cmd,
         stop_on_success=config.stop_on_success,
+        max_parallel=config.max_parallel,
+        adapter_concurrency=config.adapter_concurrency,
+        workspace_mode=config.workspace_mode,
+        test_selection=config.test_selection,
+        test_stages=config.test_stages,
+        cache_dir=config.cache_dir,
+        result_cache=config.result_cache,
+        result_cache_max_mb=config.result_cache_max_mb,
+        verdict_cache=config.verdict_cache,
+        test_results=config.test_results,
+        scheduler=config.scheduler,
+        token_prices=config.token_prices,
+        budget_tokens=config.budget_tokens,
+        budget_usd=config.budget_usd,
+        budget_seconds=config.budget_seconds,
+        speculative=config.speculative,
+        limit_cpu_seconds=config.limit_cpu_seconds,
+        limit_memory_mb=config.limit_memory_mb,
+        limit_open_files=config.limit_open_files,
+        refine=config.refine,
+        refine_max_chars=config.refine_max_chars,
+        context_pack=config.context_pack,
+        context_pack_max_chars=config.context_pack_max_chars,
     )
-    engine = IterationEngine(run_obj, run_config)
+    # Past outcomes on this repository steer which agent goes first
+    history = run_obj.catalog.tool_stats(_repo_id()) if run_obj.catalog else {}
+    scheduler = create_scheduler(config.scheduler, history)
+    engine = IterationEngine(run_obj, run_config, scheduler=scheduler)
 
     best_future = engine.execute_run(prompt, adapters)
 
@@ -172,13 +357,343 @@ def _execute_run_logic(run_obj, prompt: str, max_iters: Optional[int]):
 
     trigger_post_run(run_obj.id, prompt, status, best_id)
 
+    if config.auto_gc:
+        _collect_runs(config, protect={run_obj.id})
+
+
+def _retention_policy(config, **overrides):
+    from future_ralph.core.retention import RetentionPolicy
+
+    values = {
+        "max_age_days": config.retention_max_age_days,
+        "max_total_mb": config.retention_max_total_mb,
+        "keep_best": config.retention_keep_best,
+    }
+    values.update({k: v for k, v in overrides.items() if v is not None})
+    return RetentionPolicy(**values)
+
+
+def _collect_runs(config, dry_run: bool = False, protect=None, **overrides):
+    """Compact and prune runs per the retention settings, and report it."""
+    from future_ralph.core.retention import collect
+
+    manager = _run_manager(configure_logging=False)
+    report = collect(manager, _retention_policy(config, **overrides), dry_run, protect)
+    verb = "Would free" if dry_run else "Freed"
+    typer.echo(
+        f"{verb} {report.bytes_freed / 1024 / 1024:.1f} MB: "
+        f"{len(report.compacted)} runs compacted, {len(report.deleted)} deleted; "
+        f"{report.bytes_kept / 1024 / 1024:.1f} MB kept."
+    )
+    return report
+
+
+@app.command()
+def gc(
+    max_age_days: Optional[float] = typer.Option(
+        None, help="Delete finished runs older than this"
+    ),
+    max_total_mb: Optional[float] = typer.Option(
+        None, help="Delete the oldest finished runs until the runs fit in this"
+    ),
+    keep_best: Optional[int] = typer.Option(
+        None, help="Never touch this many highest-scoring successful runs"
+    ),
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Only show what would be compacted and deleted"
+    ),
+):
+    """
+    Compact finished runs into archives and delete old ones.
+
+    Limits default to the retention_* settings of the config.
+    """
+    config = _get_config_manager().load()
+    report = _collect_runs(
+        config,
+        dry_run,
+        max_age_days=max_age_days,
+        max_total_mb=max_total_mb,
+        keep_best=keep_best,
+    )
+    for run_id in report.deleted:
+        typer.echo(f"  deleted    {run_id}")
+    for run_id in report.compacted:
+        typer.echo(f"  compacted  {run_id}")
+
+
+@app.command()
+def status(
+    watch: bool = typer.Option(
+        False, "--watch", "-w", help="Keep refreshing as runs make progress"
+    ),
+    recent: int = typer.Option(3, help="Also show this many finished runs"),
+    interval: float = typer.Option(
+        2.0, help="Longest wait between refreshes in --watch mode, in seconds"
+    ),
+):
+    """
+    Show active runs future by future, and the most recent finished ones.
+    """
+    from future_ralph.core.status import LogWatcher
+
+    manager = _run_manager(configure_logging=False)
+    tails: dict = {}
+    if not watch:
+        typer.echo("\n".join(_status_lines(manager, tails, recent)))
+        for tail in tails.values():
+            tail.save()
+        return
+
+    watcher = LogWatcher()
+    try:
+        while True:
+            drawn = time.time()
+            lines = _status_lines(manager, tails, recent, catch_up=False)
+            typer.echo("\033[H\033[J" + "\n".join(lines))
+            watcher.watch([manager.base_dir, *(t.run_dir for t in tails.values())])
+            # A log with more left to read than one poll takes is not waited on
+            if not any(tail.behind for tail in tails.values()):
+                watcher.wait(interval)
+            # Busy runs change constantly; redraw at most a few times a second
+            time.sleep(max(0.0, WATCH_MIN_REFRESH - (time.time() - drawn)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        for tail in tails.values():
+            tail.save()
+
+
+def _status_lines(
+    manager: "RunManager", tails: dict, recent: int, catch_up: bool = True
+) -> list:
+    """
+    The status view. `tails` holds each shown run's `RunTail`, so repeated
+    calls only read what the logs gained in between. Without `catch_up`,
+    at most one chunk of each log is read, and the next call reads on.
+    """
+    from future_ralph.core.daemon import SOCKET_FILE, DaemonError, request
+    from future_ralph.core.status import RunTail
+
+    lines = []
+    queued = set()
+    try:
+        daemon = request(manager.base_dir / SOCKET_FILE, {"op": "status"})
+    except DaemonError:
+        pass
+    else:
+        queued = {job["run_id"] for job in daemon["queued"]}
+        lines.append(
+            f"Daemon: pid {daemon['pid']}, {len(daemon['running'])}/"
+            f"{daemon['max_concurrent']} running, {len(queued)} queued"
+        )
+
+    active = manager.query_runs(status="running")
+    finished = [
+        r
+        for r in manager.query_runs(limit=recent + len(active))
+        if r.status != "running"
+    ][:recent]
+
+    def tail_of(run_id: str):
+        if run_id not in tails:
+            tails[run_id] = RunTail.load(manager.base_dir / run_id)
+        tail = tails[run_id]
+        while tail.poll() and catch_up:
+            pass
+        return tail.state
+
+    now = time.time()
+    if not active:
+        lines.append("Status: No active runs.")
+    else:
+        lines.append(f"Active runs: {len(active)}")
+    for record in active:
+        state = tail_of(record.id)
+        elapsed = now - record.started_at if record.started_at else None
+        progress = "queued" if record.id in queued else f"{len(state.futures)} futures"
+        if state.max_iters and record.id not in queued:
+            progress += f" of {state.max_iters}"
+        lines.append(
+            f"  {record.id}  {progress}  "
+            f"{_format_seconds(elapsed)}  {_truncate(record.prompt)}"
+        )
+        for future_id, future in state.futures.items():
+            lines.append("    " + _future_line(future_id, future, state, now))
+
+    if finished:
+        lines.append("Recent runs:")
+    for record in finished:
+        best = record.best_future or "-"
+        score = f" ({record.best_score:.1f})" if record.best_score is not None else ""
+        lines.append(
+            f"  {record.id}  {record.status:<8} best={best}{score}  "
+            f"{_format_seconds(record.duration)}  {_truncate(record.prompt)}"
+        )
+    return lines
+
+
+def _future_line(future_id: str, future, run_state, now: float) -> str:
+    tool = future.tool or "?"
+    if future.state in ("running", "testing"):
+        elapsed = _format_seconds(
+            now - future.started_at if future.started_at else None
+        )
+        if run_state.timeout_per_iter:
+            elapsed += f" / {_format_seconds(run_state.timeout_per_iter)}"
+        detail = f"{elapsed}  {future.lines} lines"
+        if future.stages:
+            detail += f"  tests: {', '.join(future.stages)}"
+        elif future.last_line:
+            detail += f"  {_truncate(future.last_line, 40)}"
+    else:
+        duration = None
+        if future.started_at and future.finished_at:
+            duration = future.finished_at - future.started_at
+        score = f"{future.score:.1f}" if future.score is not None else "-"
+        detail = f"score={score}  exit={future.exit_code}  {_format_seconds(duration)}"
+        if future.cached:
+            detail += "  (cached)"
+    return f"{future_id}  {tool:<10} {future.state:<10} {detail}"
+
 
 @app.command()
-def status():
+def daemon(
+    max_concurrent: Optional[int] = typer.Option(
+        None,
+        "--max-concurrent",
+        help="Runs executed at once (default: daemon_max_concurrent from the config)",
+    ),
+    stop: bool = typer.Option(
+        False, "--stop", help="Stop the running daemon once its current runs finish"
+    ),
+):
+    """
+    Run the worker that executes detached runs (started by 'run --detach').
     """
-    Show status of running/detached futures.
+    import signal
+    import threading
+    from future_ralph.core.daemon import SOCKET_FILE, Daemon, DaemonError, request
+
+    manager = _run_manager()
+    if stop:
+        try:
+            request(manager.base_dir / SOCKET_FILE, {"op": "stop"})
+        except DaemonError as e:
+            typer.echo(str(e))
+            raise typer.Exit(code=1)
+        typer.echo("Daemon will stop once its current runs finish.")
+        return
+
+    # Detected adapters by allowed-tool list, kept across runs
+    warm: dict = {}
+    warm_lock = threading.Lock()
+
+    def execute(job):
+        config = _get_config_manager().load()
+        with warm_lock:
+            adapters = _warm_adapters(warm, config, job.rescan)
+        run_obj = manager.get_run(job.run_id)
+        if run_obj is None:
+            raise RuntimeError(f"Run {job.run_id} not found")
+        try:
+            _execute_run_logic(run_obj, job.prompt, job.max_iters, adapters=adapters)
+        finally:
+            run_obj.close()
+
+    def interrupted(job):
+        run_obj = manager.get_run(job.run_id)
+        if run_obj is not None:
+            run_obj.logger.log(
+                "run_completed", {"status": "failed", "error": job.error}
+            )
+            run_obj.close()
+
+    worker = Daemon(
+        manager.base_dir,
+        execute,
+        max_concurrent or _get_config_manager().load().daemon_max_concurrent,
+        on_interrupted=interrupted,
+    )
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    typer.echo(
+        f"Daemon listening on {worker.socket_path} "
+        f"(up to {worker.max_concurrent} concurrent runs)"
+    )
+    try:
+        worker.serve_forever()
+    except DaemonError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+
+
+@app.command(name="worker")
+def worker_command(
+    queue_dir: str = typer.Argument(..., help="Shared worker queue directory"),
+    work_dir: Optional[str] = typer.Option(
+        None,
+        "--work-dir",
+        help="Where repositories are cloned and futures run (default: a temp dir)",
+    ),
+    max_jobs: Optional[int] = typer.Option(
+        None, "--max-jobs", help="Exit after running this many futures"
+    ),
+    rescan: bool = typer.Option(
+        False, "--rescan", help="Re-detect installed agent CLIs"
+    ),
+):
+    """
+    Run futures for coordinators that set worker_queue to the same directory.
     """
-    typer.echo("Status: No active runs.")
+    import signal
+    import tempfile
+    from pathlib import Path
+    from future_ralph.core.workers import FileJobQueue, Worker
+
+    config = _get_config_manager().load()
+    config.worker_queue = None
+    adapters = _available_adapters(config, rescan)
+    if not adapters:
+        typer.echo("Error: No supported agents found on this host.")
+        raise typer.Exit(code=1)
+
+    with tempfile.TemporaryDirectory(prefix="future-ralph-worker-") as tmp:
+        worker = Worker(
+            FileJobQueue(Path(queue_dir).expanduser()),
+            {adapter.capabilities().name: adapter for adapter in adapters},
+            Path(work_dir or tmp),
+        )
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        typer.echo(f"Worker {worker.id} taking futures from {queue_dir}")
+        try:
+            worker.serve(max_jobs)
+        except KeyboardInterrupt:
+            pass
+
+
+@app.command(name="runs")
+def list_runs(
+    status_filter: Optional[str] = typer.Option(
+        None, "--status", help="Only runs in this state (running, success, failed)"
+    ),
+    limit: int = typer.Option(20, help="Maximum number of runs to show"),
+    offset: int = typer.Option(0, help="Number of runs to skip"),
+):
+    """
+    List recent runs, newest first.
+    """
+    manager = _run_manager(configure_logging=False)
+    records = manager.query_runs(status=status_filter, limit=limit, offset=offset)
+    if not records:
+        typer.echo("No runs found.")
+        return
+    for record in records:
+        best = record.best_future or "-"
+        typer.echo(
+            f"{record.id}  {record.status:<8} best={best}  "
+            f"{_format_seconds(record.duration)}  {_truncate(record.prompt)}"
+        )
 
 
 @app.command()
@@ -187,14 +702,175 @@ def results(run_id: str):
     Show results of a specific run.
     """
     typer.echo(f"Showing results for run: {run_id}")
+    manager = _run_manager(configure_logging=False)
+    record = manager.run_record(run_id)
+    if record is None:
+        typer.echo(
+            "Run not found. Try 'future-ralph reindex' if it predates the catalog."
+        )
+        raise typer.Exit(code=1)
+
+    typer.echo(f"Prompt:   {record.prompt}")
+    typer.echo(f"Status:   {record.status}")
+    typer.echo(f"Duration: {_format_seconds(record.duration)}")
+    typer.echo(f"Tokens:   {record.tokens:.0f}")
+    if record.best_future:
+        typer.echo(f"Best:     {record.best_future} (Score: {record.best_score})")
+    for future in manager.future_records(run_id):
+        score = f"{future.score:.1f}" if future.score is not None else "-"
+        changes = ""
+        if future.insertions is not None:
+            changes = f"  +{future.insertions}/-{future.deletions}"
+        typer.echo(
+            f"  {future.future_id}  {future.tool or '?':<10} {future.status:<10} "
+            f"score={score}  exit={future.exit_code}  "
+            f"{_format_seconds(future.duration)}{changes}"
+        )
+
+
+@app.command()
+def profile(
+    run_id: str,
+    export: Optional[str] = typer.Option(
+        None, "--export", help="Write the trace in Chrome trace format to this file"
+    ),
+):
+    """
+    Show where a run's time went, phase by phase.
+    """
+    import json
+    from future_ralph.core.tracing import (
+        ITERATION_SPAN,
+        chrome_trace,
+        critical_path,
+        load_spans,
+        phase_breakdown,
+    )
+
+    manager = _run_manager(configure_logging=False)
+    spans = load_spans(manager.base_dir / run_id)
+    if not spans:
+        typer.echo(f"No trace recorded for run {run_id}.")
+        raise typer.Exit(code=1)
+
+    if export:
+        with open(export, "w") as f:
+            json.dump(chrome_trace(spans), f)
+        typer.echo(f"Wrote {len(spans)} spans to {export}")
+
+    origin = min(s.start for s in spans)
+    wall = max(s.end for s in spans) - origin
+    futures = sum(1 for s in spans if s.name == ITERATION_SPAN)
+    typer.echo(f"Run {run_id}: {wall:.2f}s wall, {futures} futures")
+
+    typer.echo(f"\n{'Phase':<20} {'Count':>5} {'Total':>9} {'Mean':>9} {'Max':>9}")
+    phases = phase_breakdown(spans)
+    for name, stats in sorted(phases.items(), key=lambda p: -p[1]["total"]):
+        typer.echo(
+            f"{name:<20} {stats['count']:>5.0f} {stats['total']:>8.2f}s "
+            f"{stats['mean']:>8.3f}s {stats['max']:>8.3f}s"
+        )
+
+    typer.echo("\nCritical path:")
+    children: dict = {}
+    for span in spans:
+        if span.future_id and span.name != ITERATION_SPAN:
+            children.setdefault(span.future_id, []).append(span)
+    cursor = origin
+    for span in critical_path(spans):
+        if span.start - cursor >= 0.005:
+            typer.echo(
+                f"  {cursor - origin:>8.2f}s  {span.start - cursor:>7.2f}s  (gap)"
+            )
+        label = span.name
+        if span.name == ITERATION_SPAN:
+            tool = span.attrs.get("tool", "?")
+            label = f"{span.future_id} ({tool}, {span.attrs.get('status', '?')})"
+        typer.echo(f"  {span.start - origin:>8.2f}s  {span.duration:>7.2f}s  {label}")
+        for child in children.get(span.future_id or "", []):
+            typer.echo(f"  {'':>8}   {child.duration:>7.2f}s    {child.name}")
+        cursor = span.end
 
 
 @app.command()
-def apply(future_id: str):
+def reindex():
+    """
+    Rebuild the run catalog from the runs' JSONL logs.
+    """
+    count = _run_manager(configure_logging=False).reindex()
+    typer.echo(f"Reindexed {count} runs.")
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    minutes, secs = divmod(int(seconds), 60)
+    return f"{minutes}m{secs:02d}s" if minutes else f"{seconds:.1f}s"
+
+
+def _truncate(text: Optional[str], width: int = 60) -> str:
+    text = (text or "").replace("\n", " ")
+    return text if len(text) <= width else text[: width - 3] + "..."
+
+
+@app.command()
+def apply(
+    future_id: str,
+    run_id: Optional[str] = typer.Option(
+        None, "--run", help="Run the future belongs to (default: the latest)"
+    ),
+    check: bool = typer.Option(
+        False, "--check", help="Only check that the patch applies cleanly"
+    ),
+):
     """
     Apply a specific future to the current codebase.
     """
+    from future_ralph.core.patches import PatchStore
+    from future_ralph.core.retention import read_run_file
+
     typer.echo(f"Applying future: {future_id}")
+    manager = _run_manager(configure_logging=False)
+    record = manager.find_future(future_id, run_id)
+    if record is None:
+        typer.echo("Future not found.")
+        raise typer.Exit(code=1)
+    if not record.diff_ref:
+        typer.echo(f"Future {future_id} of run {record.run_id} made no changes.")
+        return
+
+    run_dir = manager.base_dir / record.run_id
+    store = PatchStore(run_dir / "patches")
+    # Compacted runs keep their patch store inside the run archive
+    member = store.path(record.diff_ref).relative_to(run_dir).as_posix()
+    data = read_run_file(run_dir, member)
+    if data is None:
+        typer.echo(f"Patch {record.diff_ref} is missing from run {record.run_id}.")
+        raise typer.Exit(code=1)
+    patch = store.decode(data)
+
+    # Patches are relative to the repository root
+    toplevel = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True
+    )
+    cwd = toplevel.stdout.strip() if toplevel.returncode == 0 else None
+    cmd = ["git", "apply", "--binary", "--whitespace=nowarn"]
+    if check:
+        cmd.append("--check")
+    proc = subprocess.run(
+        [*cmd, "-"],
+        input=patch.encode(errors="surrogateescape"),
+        cwd=cwd,
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        typer.echo(proc.stderr.decode(errors="replace").strip())
+        raise typer.Exit(code=1)
+    verb = "applies cleanly" if check else "applied"
+    typer.echo(
+        f"Future {future_id} of run {record.run_id} {verb} "
+        f"(+{record.insertions or 0}/-{record.deletions or 0})."
+    )
 
 
 @app.command()
@@ -211,5 +887,21 @@ def setup():
         typer.echo("Ensure 'textual' is installed.")
 
 
-if __name__ == "__main__":
+def cli():
+    """
+    Console entry point. Plugins are only loaded when the command line does
+    not name a built-in command (i.e. for plugin commands and top-level help).
+    """
+    builtin = {
+        command.name or command.callback.__name__.replace("_", "-")
+        for command in app.registered_commands
+        if command.callback
+    }
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+    if not args or args[0] not in builtin:
+        load_plugins(app)
     app()
+
+
+if __name__ == "__main__":
+    cli()
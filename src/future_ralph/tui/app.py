@@ -12,37 +12,32 @@ from textual.widgets import (
 )
 from textual.screen import Screen
 from future_ralph.core.config import ConfigManager, RalphConfig
-from future_ralph.adapters.gemini import GeminiAdapter
-from future_ralph.adapters.opencode import OpenCodeAdapter
-from future_ralph.adapters.claude import ClaudeAdapter
-from future_ralph.adapters.codex import CodexAdapter
+from future_ralph.adapters.detection import detect_adapters
+from future_ralph.adapters.registry import adapter_names, load_adapter
 
 
 class ToolDetection(Static):
     def on_mount(self) -> None:
-        self.adapters = [
-            GeminiAdapter(),
-            OpenCodeAdapter(),
-            ClaudeAdapter(),
-            CodexAdapter(),
-        ]
+        self.adapters = {name: load_adapter(name) for name in adapter_names()}
         self.detect_tools()
 
-    def detect_tools(self) -> None:
+    def detect_tools(self, rescan: bool = False) -> None:
         table = self.query_one(DataTable)
-        table.clear()
-        table.add_columns("Tool", "Status", "Path")
+        table.clear(columns=True)
+        table.add_columns("Tool", "Status", "Version", "Path")
 
         self.found_tools = []
 
-        for adapter in self.adapters:
-            info = adapter.detect()
+        detections = detect_adapters(self.adapters, rescan=rescan)
+        for name, adapter in self.adapters.items():
+            info = detections[name]
             status = "✅ Found" if info["found"] else "❌ Not Found"
             path = info.get("binary_path") or "N/A"
+            version = info.get("version") or "unknown"
             if info["found"]:
                 self.found_tools.append(adapter.capabilities().name)
 
-            table.add_row(adapter.capabilities().name, status, path)
+            table.add_row(adapter.capabilities().name, status, version, path)
 
     def compose(self) -> ComposeResult:
         yield Label("Tool Detection", classes="section-title")
@@ -51,7 +46,7 @@ class ToolDetection(Static):
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "rescan":
-            self.detect_tools()
+            self.detect_tools(rescan=True)
 
 
 class ConfigForm(Static):
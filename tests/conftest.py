@@ -0,0 +1,70 @@
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import RunConfig
+from future_ralph.core.run_manager import Run
+
+
+def _git(cwd: Path, *args: str):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def git() -> Callable[..., None]:
+    """`git(cwd, *args)`: run git with a throwaway identity."""
+    return _git
+
+
+@pytest.fixture
+def git_repo(tmp_path) -> Callable[..., Path]:
+    """
+    `git_repo(path, files)`: a new repository at `path` (default
+    `<tmp_path>/repo`) with `files` (relative path -> text, default a
+    one-line `app.py`) committed.
+    """
+
+    def make(
+        path: Optional[Path] = None,
+        files: Optional[Dict[str, str]] = None,
+        message: str = "init",
+    ) -> Path:
+        path = path or tmp_path / "repo"
+        for rel, text in (files or {"app.py": "VALUE = 1\n"}).items():
+            (path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (path / rel).write_text(text)
+        _git(path, "init", "-q")
+        _git(path, "add", ".")
+        _git(path, "commit", "-q", "-m", message)
+        return path
+
+    return make
+
+
+@pytest.fixture
+def engine_factory(tmp_path) -> Callable[..., IterationEngine]:
+    """
+    `engine_factory(config, run_dir)`: an engine on a mocked `Run` whose
+    logger and tracer record calls, writing to `run_dir` (default
+    `tmp_path`).
+    """
+
+    def make(config: RunConfig, run_dir: Optional[Path] = None) -> IterationEngine:
+        run_dir = run_dir or tmp_path
+        run_dir.mkdir(parents=True, exist_ok=True)
+        run = MagicMock(spec=Run)
+        run.dir = run_dir
+        run.logger = MagicMock()
+        run.tracer = MagicMock()
+        return IterationEngine(run, config)
+
+    return make
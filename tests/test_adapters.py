@@ -2,7 +2,17 @@ from future_ralph.adapters.gemini import GeminiAdapter
 from future_ralph.adapters.opencode import OpenCodeAdapter
 from future_ralph.adapters.claude import ClaudeAdapter
 from future_ralph.adapters.codex import CodexAdapter
+from future_ralph.adapters.base import (
+    CommandResult,
+    ResourceLimits,
+    run_command,
+    run_shell,
+)
 from unittest.mock import patch
+from pathlib import Path
+import os
+import sys
+import time
 
 
 def test_gemini_detection():
@@ -35,3 +45,236 @@ def test_codex_detection():
         detection = adapter.detect()
         assert detection["found"] is True
         assert detection["binary_path"] == "/usr/bin/openai"
+
+
+def test_run_command_streams_to_log_and_keeps_tail(tmp_path):
+    log_path = tmp_path / "future.log"
+    events = []
+    script = (
+        "import sys\nfor i in range(1000): print(i)\nprint('oops', file=sys.stderr)"
+    )
+
+    result = run_command(
+        [sys.executable, "-c", script],
+        log_path=str(log_path),
+        on_event=events.append,
+        tail_lines=10,
+    )
+
+    assert result.exit_code == 0
+    assert result.stdout.splitlines() == [str(i) for i in range(990, 1000)]
+    assert result.stderr == "oops\n"
+    assert len(events) == 1001
+    log = log_path.read_text().splitlines()
+    assert len(log) == 1001
+    assert "[stderr] oops" in log
+
+
+def test_run_command_timeout_kills_process_group(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    script = f"sleep 30 & echo $! > {pid_file}; wait"
+
+    start = time.time()
+    result = run_command(["sh", "-c", script], timeout=0.5)
+
+    assert result.timed_out
+    assert result.exit_code == 124
+    assert time.time() - start < 10
+    grandchild = int(pid_file.read_text())
+    time.sleep(0.1)
+    stat = Path(f"/proc/{grandchild}/stat")
+    # Gone, or a zombie waiting to be reaped by init
+    assert not stat.exists() or stat.read_text().split()[2] == "Z"
+
+
+def test_adapter_run_uses_streaming_runner(tmp_path):
+    adapter = ClaudeAdapter()
+    log_path = tmp_path / "claude.log"
+    with patch(
+        "future_ralph.adapters.base.run_command",
+        return_value=CommandResult("out\n", "", 0, 1.5, log_path=str(log_path)),
+    ) as mock_run:
+        result = adapter.run("Fix bug", cwd=str(tmp_path), log_path=str(log_path))
+
+    assert mock_run.call_args.args[0] == [
+        "claude",
+        "-p",
+        "Fix bug",
+        "--output-format",
+        "stream-json",
+        "--verbose",
+    ]
+    assert result.stdout == "out\n"
+    assert result.exit_code == 0
+    assert result.log_path == str(log_path)
+
+
+class _CountingAdapter(GeminiAdapter):
+    binary = "fakeagent"
+
+    def __init__(self):
+        self.calls = 0
+
+    def detect(self):
+        self.calls += 1
+        return super().detect()
+
+
+def _fake_agent(bin_dir: Path, version: str) -> Path:
+    bin_dir.mkdir(exist_ok=True)
+    script = bin_dir / "fakeagent"
+    script.write_text(f"#!/bin/sh\necho 'fakeagent {version}'\n")
+    script.chmod(0o755)
+    return script
+
+
+def test_detect_adapters_probes_version_and_caches(tmp_path, monkeypatch):
+    from future_ralph.adapters.detection import detect_adapters
+
+    _fake_agent(tmp_path / "bin", "1.4.2")
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    cache = tmp_path / "detection.json"
+    adapter = _CountingAdapter()
+
+    first = detect_adapters({"fake": adapter}, cache_path=cache)
+    second = detect_adapters({"fake": adapter}, cache_path=cache)
+
+    assert first["fake"]["found"] is True
+    assert first["fake"]["version"] == "1.4.2"
+    assert second == first
+    assert adapter.calls == 1
+
+    detect_adapters({"fake": adapter}, cache_path=cache, rescan=True)
+    assert adapter.calls == 2
+
+
+def test_detect_adapters_invalidates_on_path_or_binary_change(tmp_path, monkeypatch):
+    from future_ralph.adapters.detection import detect_adapters
+
+    script = _fake_agent(tmp_path / "bin", "1.0.0")
+    monkeypatch.setenv("PATH", str(tmp_path / "bin"))
+    cache = tmp_path / "detection.json"
+    adapter = _CountingAdapter()
+    detect_adapters({"fake": adapter}, cache_path=cache)
+
+    # Upgraded in place: new mtime
+    script.write_text("#!/bin/sh\necho 'fakeagent 2.0.0'\n")
+    os.utime(script, ns=(time.time_ns(), time.time_ns() + 10**9))
+    upgraded = detect_adapters({"fake": adapter}, cache_path=cache)
+    assert upgraded["fake"]["version"] == "2.0.0"
+    assert adapter.calls == 2
+
+    # Removed from PATH
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    missing = detect_adapters({"fake": adapter}, cache_path=cache)
+    assert missing["fake"]["found"] is False
+    assert adapter.calls == 3
+
+
+def test_usage_parser_reads_reported_usage():
+    from future_ralph.adapters.usage import UsageParser
+
+    claude = UsageParser()
+    # stream-json: per-message usage is ignored, the result event has totals
+    claude.feed('{"type": "system", "subtype": "init", "session_id": "s"}')
+    claude.feed(
+        '{"type": "assistant", "message": {"content": [], '
+        '"usage": {"input_tokens": 3, "output_tokens": 1}}}'
+    )
+    claude.feed('{"type": "user", "usage": {"input_tokens": 999}}')
+    assert claude.usage == {}
+    claude.feed(
+        '{"type": "result", "total_cost_usd": 0.12, "usage": '
+        '{"input_tokens": 100, "output_tokens": 50, "cache_read_input_tokens": 10}}'
+    )
+    assert claude.cost_info({}) == {
+        "cost_usd": 0.12,
+        "input_tokens": 100.0,
+        "output_tokens": 50.0,
+        "cache_tokens": 10.0,
+        "total_tokens": 160.0,
+        "source": "reported",
+    }
+
+    gemini = UsageParser()
+    gemini.feed('{"usageMetadata": {"promptTokenCount": 7, "totalTokenCount": 9}}')
+    assert gemini.usage["total_tokens"] == 9
+
+    text = UsageParser()
+    text.feed("Total tokens: 1,234")
+    text.feed("Total cost: $0.05")
+    assert text.usage == {"total_tokens": 1234.0, "cost_usd": 0.05}
+
+    nothing = UsageParser()
+    nothing.feed("all done")
+    assert nothing.cost_info({"estimated_tokens": 3}) == {
+        "estimated_tokens": 3,
+        "source": "estimated",
+    }
+
+
+def test_execute_reports_usage_from_output(tmp_path):
+    class EchoAdapter(GeminiAdapter):
+        def run(self, prompt, cwd, **kwargs):
+            script = (
+                'print(\'{"usage": {"prompt_tokens": 5, "completion_tokens": 6}}\')'
+            )
+            return self._execute(
+                [sys.executable, "-c", script],
+                cwd,
+                cost_info={"estimated_tokens": 1},
+            )
+
+    result = EchoAdapter().run("hi", str(tmp_path))
+    assert result.cost_info["total_tokens"] == 11
+    assert result.cost_info["source"] == "reported"
+
+
+def test_run_command_cancel_kills_process(tmp_path):
+    import threading
+
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    start = time.time()
+    result = run_command(["sleep", "30"], cancel=cancel)
+
+    assert result.cancelled and not result.timed_out
+    assert result.exit_code == 130
+    assert time.time() - start < 5
+
+
+def test_run_command_kills_processes_left_behind(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    script = f"sleep 30 > /dev/null 2>&1 & echo $! > {pid_file}"
+
+    result = run_command(["sh", "-c", script], timeout=10)
+
+    assert result.exit_code == 0
+    grandchild = int(pid_file.read_text())
+    time.sleep(0.1)
+    stat = Path(f"/proc/{grandchild}/stat")
+    assert not stat.exists() or stat.read_text().split()[2] == "Z"
+
+
+def test_run_shell_applies_limits_and_reports_resources():
+    # Set before exec: even the shell's first command runs under them
+    result = run_shell(
+        "ulimit -n; ulimit -t; "
+        f"{sys.executable} -c 'b = bytearray(64 << 20); import time; time.sleep(0.6)'",
+        timeout=10,
+        limits=ResourceLimits(cpu_seconds=30, open_files=64),
+    )
+
+    assert result.exit_code == 0
+    assert result.stdout.split() == ["64", "30"]
+    assert result.resources["peak_rss_mb"] >= 60
+    assert result.resources["cpu_seconds"] >= 0
+
+
+def test_run_command_reports_missing_binary_under_limits():
+    result = run_command(
+        ["future-ralph-no-such-tool"], limits=ResourceLimits(open_files=64)
+    )
+
+    assert result.exit_code == 1
+    assert "future-ralph-no-such-tool" in result.stderr
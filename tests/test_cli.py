@@ -1,26 +1,30 @@
+import json
 from typer.testing import CliRunner
 from unittest.mock import patch, MagicMock
+from future_ralph.core.run_manager import RunManager
 from future_ralph.main import app
 
 runner = CliRunner()
 
 
-@patch("future_ralph.main.CodexAdapter")
-@patch("future_ralph.main.ClaudeAdapter")
-@patch("future_ralph.main.OpenCodeAdapter")
-@patch("future_ralph.main.GeminiAdapter")
-@patch("future_ralph.main.RunManager")
-@patch("future_ralph.main.IterationEngine")
+@patch("future_ralph.adapters.registry.load_adapter")
+@patch("future_ralph.core.run_manager.RunManager")
+@patch("future_ralph.core.engine.IterationEngine")
 def test_run_command(
-    mock_engine, mock_manager, mock_gemini, mock_opencode, mock_claude, mock_codex
+    mock_engine, mock_manager, mock_load_adapter, tmp_path, monkeypatch
 ):
+    monkeypatch.setenv("FUTURE_RALPH_CACHE_DIR", str(tmp_path))
     # Setup mocks
-    mock_gemini.return_value.detect.return_value = {"found": True}
-    mock_gemini.return_value.capabilities.return_value.name = "gemini"
+    adapters = {name: MagicMock() for name in ("gemini", "opencode", "claude", "codex")}
+    mock_load_adapter.side_effect = adapters.__getitem__
+    mock_gemini, mock_opencode, mock_claude, mock_codex = adapters.values()
 
-    mock_opencode.return_value.detect.return_value = {"found": False}
-    mock_claude.return_value.detect.return_value = {"found": False}
-    mock_codex.return_value.detect.return_value = {"found": False}
+    mock_gemini.detect.return_value = {"found": True}
+    mock_gemini.capabilities.return_value.name = "gemini"
+
+    mock_opencode.detect.return_value = {"found": False}
+    mock_claude.detect.return_value = {"found": False}
+    mock_codex.detect.return_value = {"found": False}
 
     mock_manager_instance = mock_manager.return_value
     mock_run = MagicMock()
@@ -41,7 +45,96 @@ def test_run_command(
     assert "Success! Best future: future_2010" in result.stdout
 
 
-def test_status_command():
+def test_status_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     result = runner.invoke(app, ["status"])
     assert result.exit_code == 0
     assert "Status: No active runs." in result.stdout
+
+
+def test_results_and_runs_commands(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run = RunManager().create_run("Fix bug")
+    run.logger.log("iteration_started", {"future_id": "future_2010", "tool": "gemini"})
+    run.logger.log(
+        "iteration_completed",
+        {"future_id": "future_2010", "score": 100.0, "exit_code": 0},
+    )
+    run.logger.log("best_future_selected", {"future_id": "future_2010", "score": 100.0})
+    run.logger.log("run_completed", {"status": "success"})
+    run.close()
+
+    result = runner.invoke(app, ["results", run.id])
+    assert result.exit_code == 0
+    assert "Status:   success" in result.stdout
+    assert "future_2010  gemini" in result.stdout
+
+    result = runner.invoke(app, ["runs", "--status", "success"])
+    assert run.id in result.stdout
+    result = runner.invoke(app, ["runs", "--status", "failed"])
+    assert "No runs found." in result.stdout
+
+
+def test_apply_command(tmp_path, monkeypatch):
+    import subprocess
+
+    from future_ralph.core.patches import PatchStore, diff_stats
+
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init", "-q"], check=True)
+    (tmp_path / "app.py").write_text("VALUE = 1\n")
+    patch = (
+        "diff --git a/app.py b/app.py\n"
+        "--- a/app.py\n"
+        "+++ b/app.py\n"
+        "@@ -1 +1 @@\n"
+        "-VALUE = 1\n"
+        "+VALUE = 2\n"
+    )
+    run = RunManager().create_run("Fix bug")
+    ref = PatchStore(run.dir / "patches").put(patch)
+    run.logger.log("iteration_started", {"future_id": "future_2010", "tool": "gemini"})
+    run.logger.log(
+        "iteration_completed",
+        {
+            "future_id": "future_2010",
+            "exit_code": 0,
+            "diff_ref": ref,
+            "diff_stats": diff_stats(patch),
+        },
+    )
+    run.close()
+
+    result = runner.invoke(app, ["apply", "future_2010", "--check"])
+    assert result.exit_code == 0, result.stdout
+    assert (tmp_path / "app.py").read_text() == "VALUE = 1\n"
+
+    result = runner.invoke(app, ["apply", "future_2010"])
+    assert result.exit_code == 0, result.stdout
+    assert "(+1/-1)" in result.stdout
+    assert (tmp_path / "app.py").read_text() == "VALUE = 2\n"
+
+    result = runner.invoke(app, ["apply", "future_2090"])
+    assert result.exit_code == 1
+
+
+def test_profile_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run = RunManager().create_run("Fix bug")
+    run.tracer.record("run", 100.0, 110.0)
+    run.tracer.record("iteration", 100.0, 109.0, "future_2010", tool="gemini")
+    run.tracer.record("agent", 100.5, 108.0, "future_2010")
+    run.close()
+
+    result = runner.invoke(
+        app, ["profile", run.id, "--export", str(tmp_path / "trace.json")]
+    )
+
+    assert result.exit_code == 0
+    assert "10.00s wall, 1 futures" in result.stdout
+    assert "agent" in result.stdout and "future_2010 (gemini" in result.stdout
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert len(trace["traceEvents"]) == 3
+
+    missing = runner.invoke(app, ["profile", "no-such-run"])
+    assert missing.exit_code == 1
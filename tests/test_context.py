@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+from future_ralph.adapters.base import AttemptResult
+from future_ralph.core.context import ContextIndex, load_context_index
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import RunConfig
+from future_ralph.core.run_manager import RunManager
+
+
+SHOP = {
+    "src/billing/invoice.py": (
+        "class InvoiceRenderer:\n"
+        "    def render_total(self):\n"
+        "        pass\n\n"
+        "def parse_currency(text):\n"
+        "    pass\n"
+    ),
+    "src/auth.py": "def login(user):\n    pass\n",
+    "web/cart.ts": "export function applyDiscount() {}\n",
+    "README.md": "# Shop\n",
+}
+
+
+def test_index_ranks_files_for_the_prompt(tmp_path, git_repo):
+    index = ContextIndex.build(git_repo(tmp_path, SHOP, "Add invoices"))
+
+    assert index.symbols["src/billing/invoice.py"] == [
+        "InvoiceRenderer",
+        "InvoiceRenderer.render_total",
+        "parse_currency",
+    ]
+    assert index.symbols["web/cart.ts"] == ["applyDiscount"]
+    assert index.relevant("Invoice totals render wrong currency")[0] == (
+        "src/billing/invoice.py"
+    )
+    assert index.relevant("the discount in the cart") == ["web/cart.ts"]
+
+    pack = index.render("Fix the invoice total", max_chars=4000)
+    assert "src/billing/invoice.py: InvoiceRenderer" in pack
+    assert "Add invoices" in pack
+    assert "src/ (2 files)" in pack and "web/ (1 files)" in pack
+    assert len(index.render("Fix the invoice total", max_chars=120)) <= 120
+
+
+def test_index_is_cached_per_revision(tmp_path, git_repo):
+    repo = git_repo(files=SHOP, message="Add invoices")
+    cache_dir = tmp_path / "cache"
+
+    first = load_context_index(repo, cache_dir)
+    cached = list((cache_dir / "context").iterdir())
+    assert len(cached) == 1
+    assert load_context_index(repo, cache_dir).files == first.files
+
+    # Uncommitted changes are not a revision: built fresh, not cached
+    (repo / "src" / "auth.py").write_text("def logout(user):\n    pass\n")
+    dirty = load_context_index(repo, cache_dir)
+    assert dirty.symbols["src/auth.py"] == ["logout"]
+    assert list((cache_dir / "context").iterdir()) == cached
+
+
+def test_index_leaves_out_untracked_files(tmp_path, git_repo):
+    repo = git_repo(files=SHOP, message="Add invoices")
+    cache_dir = tmp_path / "cache"
+    (repo / "src" / "scratch.py").write_text("def experiment():\n    pass\n")
+
+    # The tree still counts as clean, so this index is cached for it
+    index = load_context_index(repo, cache_dir)
+    assert "src/scratch.py" not in index.files
+    assert len(list((cache_dir / "context").iterdir())) == 1
+
+    (repo / "src" / "scratch.py").unlink()
+    assert load_context_index(repo, cache_dir).files == index.files
+
+
+def test_engine_sends_context_pack_to_every_future(tmp_path, git_repo):
+    repo = git_repo(files=SHOP, message="Add invoices")
+    run = RunManager(base_dir=tmp_path / "runs").create_run("Fix invoice")
+    config = RunConfig(
+        max_iters=2,
+        test_cmd="true",
+        stop_on_success=False,
+        workspace_mode="copy",
+        repo_dir=str(repo),
+        cache_dir=str(tmp_path / "cache"),
+        context_pack=True,
+    )
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "claude"
+    adapter.run.return_value = AttemptResult(
+        stdout="", stderr="", exit_code=0, duration_seconds=0.1
+    )
+
+    IterationEngine(run, config).execute_run("Fix the invoice total", [adapter])
+    run.close()
+
+    prompts = [call.args[0] for call in adapter.run.call_args_list]
+    assert len(prompts) == 2 and prompts[0] == prompts[1]
+    assert prompts[0].startswith("Fix the invoice total\n\nRepository context")
+    assert "src/billing/invoice.py" in prompts[0]
+    assert "context_pack_built" in (run.dir / "run.jsonl").read_text()
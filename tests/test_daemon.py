@@ -0,0 +1,153 @@
+import threading
+import time
+import pytest
+from typer.testing import CliRunner
+from future_ralph.core.daemon import (
+    Daemon,
+    DaemonError,
+    JobQueue,
+    request,
+)
+from future_ralph.main import app
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    raise AssertionError("condition not reached")
+
+
+def _start(daemon: Daemon) -> threading.Thread:
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+
+    def listening():
+        try:
+            return request(daemon.socket_path, {"op": "ping"})
+        except DaemonError:
+            return False
+
+    _wait_for(listening)
+    return thread
+
+
+def test_job_queue_persists_and_recovers(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    first = queue.put("run-1", "fix it", max_iters=3)
+    queue.put("run-2", "fix that", rescan=True)
+
+    claimed = queue.claim()
+    assert claimed.id == first.id and claimed.status == "running"
+    queue.close()
+
+    # A new daemon finds the claimed job orphaned and the other still queued
+    reopened = JobQueue(tmp_path / "queue.sqlite")
+    stale = reopened.recover()
+    assert [job.run_id for job in stale] == ["run-1"]
+    assert stale[0].error
+    queued = reopened.jobs("queued")
+    assert [(job.run_id, job.rescan) for job in queued] == [("run-2", True)]
+    assert reopened.get(first.id).status == "failed"
+
+
+def test_daemon_caps_concurrent_runs(tmp_path):
+    release = threading.Event()
+    started = []
+
+    def execute(job):
+        started.append(job.run_id)
+        if job.run_id == "boom":
+            raise RuntimeError("agent exploded")
+        release.wait(5)
+
+    daemon = Daemon(tmp_path, execute, max_concurrent=2)
+    thread = _start(daemon)
+    for run_id in ("a", "b", "c"):
+        request(daemon.socket_path, {"op": "submit", "run_id": run_id, "prompt": "p"})
+
+    _wait_for(lambda: len(started) == 2)
+    status = request(daemon.socket_path, {"op": "status"})
+    assert [job["run_id"] for job in status["running"]] == ["a", "b"]
+    assert [job["run_id"] for job in status["queued"]] == ["c"]
+
+    release.set()
+    _wait_for(lambda: started == ["a", "b", "c"])
+    request(daemon.socket_path, {"op": "submit", "run_id": "boom", "prompt": "p"})
+    _wait_for(lambda: daemon.queue.jobs("failed"))
+    assert daemon.queue.jobs("failed")[0].error == "agent exploded"
+
+    request(daemon.socket_path, {"op": "stop"})
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not daemon.socket_path.exists()
+    with pytest.raises(DaemonError):
+        request(daemon.socket_path, {"op": "ping"})
+
+
+def test_daemon_replaces_stale_socket_but_not_a_live_daemon(tmp_path):
+    (tmp_path / "daemon.sock").write_text("")
+    daemon = Daemon(tmp_path, lambda job: None)
+    thread = _start(daemon)
+
+    with pytest.raises(DaemonError, match="already listening"):
+        Daemon(tmp_path, lambda job: None).serve_forever()
+
+    daemon.stop()
+    thread.join(5)
+
+
+def test_detached_run_is_queued_with_the_daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "runs").mkdir()
+    done = threading.Event()
+    executed = []
+
+    def execute(job):
+        executed.append((job.run_id, job.prompt, job.max_iters))
+        done.wait(5)
+
+    daemon = Daemon(tmp_path / "runs", execute)
+    thread = _start(daemon)
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["run", "Fix bug", "--detach", "--max-iters", "2"])
+    assert result.exit_code == 0
+    assert "Run queued with the daemon" in result.stdout
+    _wait_for(lambda: executed)
+    assert executed[0][1:] == ("Fix bug", 2)
+
+    status = runner.invoke(app, ["status"])
+    assert "Daemon: pid" in status.stdout and "1/2 running" in status.stdout
+    assert executed[0][0] in status.stdout
+
+    done.set()
+    daemon.stop()
+    thread.join(5)
+
+
+def test_daemon_runs_get_their_own_adapters(monkeypatch):
+    from types import SimpleNamespace
+    from future_ralph import main
+    from future_ralph.core.config import RalphConfig
+
+    detected = []
+
+    def available(config, rescan=False):
+        detected.append(rescan)
+        return [SimpleNamespace(limits=None)]
+
+    monkeypatch.setattr(main, "_available_adapters", available)
+    warm: dict = {}
+    config = RalphConfig(active_tools=["claude"])
+
+    [first] = main._warm_adapters(warm, config)
+    [second] = main._warm_adapters(warm, config)
+    first.limits = "run 1"
+
+    # Detected once, but a run's limits never reach another run's adapter
+    assert detected == [False]
+    assert first is not second and second.limits is None
+    assert warm[("claude",)][0].limits is None
@@ -1,23 +1,13 @@
 from unittest.mock import MagicMock, patch
-from future_ralph.core.engine import IterationEngine
-from future_ralph.core.models import RunConfig, FutureStatus
-from future_ralph.core.run_manager import Run
-from pathlib import Path
-import shutil
+from future_ralph.core.config import RalphConfig
+from future_ralph.core.models import PipelineStage, RunConfig, FutureStatus
+from future_ralph.adapters.base import AttemptResult
+import time
 
 
-def test_engine_execution():
-    run_dir = Path("test_engine_run")
-    if run_dir.exists():
-        shutil.rmtree(run_dir)
-    run_dir.mkdir()
-
-    run_mock = MagicMock(spec=Run)
-    run_mock.dir = run_dir
-    run_mock.logger = MagicMock()
-
-    config = RunConfig(max_iters=2, test_cmd="exit 0")
-    engine = IterationEngine(run_mock, config)
+def test_engine_execution(engine_factory):
+    config = RunConfig(max_iters=2, test_cmd="exit 0", workspace_mode="none")
+    engine = engine_factory(config)
 
     adapter_mock = MagicMock()
     adapter_mock.capabilities.return_value.name = "test_agent"
@@ -26,8 +16,8 @@ def test_engine_execution():
     adapter_mock.run.return_value.stderr = ""
     adapter_mock.run.return_value.diff = "some diff"
 
-    with patch("subprocess.run") as mock_test:
-        mock_test.return_value.returncode = 0
+    with patch("future_ralph.core.engine.run_shell") as mock_test:
+        mock_test.return_value.exit_code = 0
 
         best = engine.execute_run("test prompt", [adapter_mock])
 
@@ -35,4 +25,268 @@ def test_engine_execution():
         assert best.status == FutureStatus.COMPLETED
         assert len(engine.futures) == 1  # Stopped on success
 
-    shutil.rmtree(run_dir)
+
+def _sleepy_adapter(name, delay, active=None):
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = name
+
+    def run(prompt, cwd, timeout=None, **kwargs):
+        if active is not None:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(delay)
+        if active is not None:
+            active["now"] -= 1
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=delay)
+
+    adapter.run.side_effect = run
+    return adapter
+
+
+def test_engine_parallel_wall_clock(engine_factory):
+    config = RunConfig(
+        max_iters=4,
+        test_cmd="exit 1",
+        stop_on_success=False,
+        max_parallel=4,
+        workspace_mode="none",
+    )
+    engine = engine_factory(config)
+
+    with patch("future_ralph.core.engine.run_shell") as mock_test:
+        mock_test.return_value.exit_code = 1
+        start = time.time()
+        engine.execute_run("test prompt", [_sleepy_adapter("slow", 0.3)])
+        elapsed = time.time() - start
+
+    assert len(engine.futures) == 4
+    assert [f.year for f in engine.futures] == [2010, 2020, 2030, 2040]
+    # Close to the slowest future rather than the sum of all four
+    assert elapsed < 0.9
+
+
+def test_engine_parallel_stop_on_success(engine_factory):
+    config = RunConfig(
+        max_iters=6, test_cmd="exit 0", max_parallel=2, workspace_mode="none"
+    )
+    engine = engine_factory(config)
+
+    with patch("future_ralph.core.engine.run_shell") as mock_test:
+        mock_test.return_value.exit_code = 0
+        best = engine.execute_run("test prompt", [_sleepy_adapter("fast", 0.05)])
+
+    # Only the first wave is explored once a future succeeds
+    assert len(engine.futures) == 2
+    assert best is not None
+    assert best.id == "future_2010"
+
+
+def test_engine_adapter_concurrency_limit(engine_factory):
+    config = RunConfig(
+        max_iters=4,
+        test_cmd="exit 1",
+        stop_on_success=False,
+        max_parallel=4,
+        adapter_concurrency={"limited": 1},
+        workspace_mode="none",
+    )
+    engine = engine_factory(config)
+    active = {"now": 0, "peak": 0}
+
+    with patch("future_ralph.core.engine.run_shell") as mock_test:
+        mock_test.return_value.exit_code = 1
+        engine.execute_run("test prompt", [_sleepy_adapter("limited", 0.05, active)])
+
+    assert len(engine.futures) == 4
+    assert active["peak"] == 1
+
+
+def _recording_run(engine_factory, stages, agent_count=1, stop_on_success=True):
+    config = RunConfig(
+        max_iters=agent_count,
+        stop_on_success=stop_on_success,
+        workspace_mode="none",
+        test_stages=stages,
+    )
+    engine = engine_factory(config)
+    ran = []
+
+    def fake_tests(cmd, cwd=None, timeout=None, **kwargs):
+        ran.append(cmd)
+        proc = MagicMock()
+        proc.exit_code = 1 if "fail" in cmd else 0
+        return proc
+
+    with patch("future_ralph.core.engine.run_shell", side_effect=fake_tests):
+        best = engine.execute_run("test prompt", [_sleepy_adapter("agent", 0)])
+    return best, ran
+
+
+def test_pipeline_stops_at_first_failing_stage(engine_factory):
+    stages = [
+        PipelineStage(name="compile", cmd="compile"),
+        PipelineStage(name="smoke", cmd="smoke fail"),
+        PipelineStage(name="full", cmd="full"),
+    ]
+    best, ran = _recording_run(engine_factory, stages)
+
+    assert ran == ["compile", "smoke fail"]
+    assert best.result.exit_code == 1
+    assert [s["stage"] for s in best.metadata["test_stages"]] == ["compile", "smoke"]
+
+
+def test_pipeline_defers_stages_to_selected_future(engine_factory):
+    stages = [
+        PipelineStage(name="smoke", cmd="smoke"),
+        PipelineStage(name="full", cmd="full", deferred=True),
+    ]
+    best, ran = _recording_run(
+        engine_factory, stages, agent_count=3, stop_on_success=False
+    )
+
+    # Every future gets the smoke stage, only the winner the full suite
+    assert ran == ["smoke", "smoke", "smoke", "full"]
+    assert best.id == "future_2010"
+    assert "pending_stages" not in best.metadata
+
+
+def test_pipeline_deferred_failure_falls_back_to_next_best(engine_factory):
+    stages = [
+        PipelineStage(name="smoke", cmd="smoke"),
+        PipelineStage(name="full", cmd="full fail", deferred=True),
+    ]
+    best, ran = _recording_run(
+        engine_factory, stages, agent_count=2, stop_on_success=False
+    )
+
+    assert ran == ["smoke", "smoke", "full fail", "full fail"]
+    assert best.result.exit_code == 1
+
+
+def test_pipeline_runs_deferred_stages_before_stopping_early(engine_factory):
+    stages = [
+        PipelineStage(name="smoke", cmd="smoke"),
+        PipelineStage(name="full", cmd="full fail", deferred=True),
+    ]
+    best, ran = _recording_run(engine_factory, stages, agent_count=2)
+
+    # Passing the smoke stage alone does not end the run
+    assert ran == ["smoke", "full fail", "smoke", "full fail"]
+    assert best.result.exit_code == 1
+
+
+def test_config_parses_test_stages():
+    config = RalphConfig(
+        test_stages=[{"name": "compile", "cmd": "python -m compileall -q ."}]
+    )
+    assert config.test_stages[0] == PipelineStage(
+        name="compile", cmd="python -m compileall -q ."
+    )
+
+
+def _metered_adapter(name, tokens, cost_usd=None):
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = name
+
+    def run(prompt, cwd, timeout=None, **kwargs):
+        cost = {"total_tokens": tokens, "source": "reported"}
+        if cost_usd is not None:
+            cost["cost_usd"] = cost_usd
+        return AttemptResult("", "", 0, 0.0, cost_info=cost)
+
+    adapter.run.side_effect = run
+    return adapter
+
+
+def _budget_run(engine_factory, adapter, **budgets):
+    config = RunConfig(
+        max_iters=10,
+        test_cmd="exit 1",
+        stop_on_success=False,
+        workspace_mode="none",
+        **budgets,
+    )
+    engine = engine_factory(config)
+    with patch("future_ralph.core.engine.run_shell") as mock_test:
+        mock_test.return_value.exit_code = 1
+        engine.execute_run("test prompt", [adapter])
+    return engine
+
+
+def test_token_budget_stops_scheduling(engine_factory):
+    engine = _budget_run(engine_factory, _metered_adapter("a", 100), budget_tokens=250)
+
+    assert len(engine.futures) == 3
+    assert engine.spent_tokens == 300
+    events = {c.args[0]: c.args[1] for c in engine.run.logger.log.call_args_list}
+    assert events["budget_exhausted"]["budget"] == "tokens"
+    assert events["run_completed"]["tokens"] == 300
+
+
+def test_usd_budget_uses_configured_prices(engine_factory):
+    engine = _budget_run(
+        engine_factory,
+        _metered_adapter("a", 1_000_000),
+        budget_usd=5.0,
+        token_prices={"a": 2.0},
+    )
+
+    # $2 per future: the third crosses the ceiling
+    assert len(engine.futures) == 3
+    assert engine.futures[0].result.cost_info["cost_usd"] == 2.0
+    assert engine.spent_usd == 6.0
+
+
+def test_scoring_prefers_cheaper_futures():
+    from future_ralph.core.models import Future
+    from future_ralph.core.scoring import DefaultScoringPolicy
+
+    def scored(exit_code, cost):
+        future = Future(id="f", year=2010, tool_name="a")
+        future.result = AttemptResult("", "", exit_code, 0, cost_info=cost)
+        return DefaultScoringPolicy().score(future)
+
+    assert scored(0, {"cost_usd": 0.1}) > scored(0, {"cost_usd": 2.0})
+    assert scored(0, {"cost_usd": 1000.0}) > scored(1, {})
+    # Tools that report no cost are priced from their tokens, not taken as free
+    assert scored(0, {"estimated_tokens": 200_000}) == scored(0, {"cost_usd": 2.0})
+    assert scored(0, {"estimated_tokens": 200_000}) < scored(0, {"cost_usd": 0.1})
+
+
+def test_speculative_run_cancels_losers(engine_factory):
+    config = RunConfig(
+        max_iters=4,
+        test_cmd="exit 0",
+        max_parallel=2,
+        speculative=True,
+        workspace_mode="none",
+    )
+    engine = engine_factory(config)
+
+    slow = MagicMock()
+    slow.capabilities.return_value.name = "slow"
+
+    def run_slow(prompt, cwd, timeout=None, cancel=None, **kwargs):
+        start = time.time()
+        cancelled = cancel.wait(10)
+        return AttemptResult(
+            "", "", 130 if cancelled else 0, duration_seconds=time.time() - start
+        )
+
+    slow.run.side_effect = run_slow
+
+    with patch("future_ralph.core.engine.run_shell") as mock_test:
+        mock_test.return_value.exit_code = 0
+        start = time.time()
+        best = engine.execute_run("test prompt", [_sleepy_adapter("fast", 0.05), slow])
+        elapsed = time.time() - start
+
+    assert elapsed < 5
+    assert best.tool_name == "fast"
+    statuses = {f.tool_name: f.status for f in engine.futures}
+    assert statuses == {"fast": FutureStatus.COMPLETED, "slow": FutureStatus.SKIPPED}
+    skipped = next(f for f in engine.futures if f.tool_name == "slow")
+    assert 0 < skipped.result.duration_seconds < 5
+    events = [c.args[0] for c in engine.run.logger.log.call_args_list]
+    assert "iteration_cancelled" in events
+    assert mock_test.call_count == 1
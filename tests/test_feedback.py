@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+
+from future_ralph.adapters.base import AttemptResult
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.feedback import HEADER, FailureLog
+from future_ralph.core.models import CaseResult, Future, RunConfig
+from future_ralph.core.run_manager import RunManager
+
+
+def _failed(future_id: str, output: str, diff_hash: str, **tests: str) -> Future:
+    future = Future(id=future_id, year=2010, tool_name="claude")
+    future.result = AttemptResult(
+        stdout="",
+        stderr="",
+        exit_code=1,
+        duration_seconds=1.0,
+        diff_stats={"files": 2, "insertions": 10, "deletions": 3, "bytes": 900},
+    )
+    future.tests = {name: CaseResult(outcome) for name, outcome in tests.items()}
+    future.metadata.update(
+        {
+            "failure_output": output,
+            "diff_hash": diff_hash,
+            "test_stages": [{"stage": "tests", "exit_code": 1}],
+        }
+    )
+    return future
+
+
+def test_failures_are_deduplicated_and_bounded():
+    failures = FailureLog()
+    noise = "".join(f"collected line {i}\n" for i in range(100))
+    failures.record(
+        _failed(
+            "future_2010",
+            noise + "E   AssertionError: total was 9\n1 failed in 0.31s\n",
+            "aaa",
+            test_total="failed",
+            test_tax="passed",
+        )
+    )
+    # Same failure, different timing: merged
+    failures.record(
+        _failed(
+            "future_2020",
+            noise + "E   AssertionError: total was 9\n1 failed in 0.47s\n",
+            "bbb",
+            test_total="failed",
+        )
+    )
+    # Same patch as the first: merged
+    failures.record(_failed("future_2030", "", "aaa"))
+    failures.record(_failed("future_2040", "ImportError: cart\n", "ccc"))
+
+    assert len(failures) == 2
+    summary = failures.render(2000)
+    assert summary.startswith(HEADER)
+    # Most recent first
+    assert summary.index("future_2040") < summary.index("future_2010")
+    assert "- future_2010 (claude), future_2020 (claude), future_2030 (claude):" in (
+        summary
+    )
+    assert 'changed 2 files (+10 -3); stage "tests" failed (exit 1)' in summary
+    assert "Failing tests: test_total\n" in summary
+    assert "E   AssertionError: total was 9" in summary
+    assert "collected line 50" not in summary and "collected line 99" in summary
+    assert len(failures.render(300)) <= 300
+    assert FailureLog().render(2000) == ""
+
+
+def test_refinement_carries_failures_into_later_prompts(tmp_path):
+    run = RunManager(base_dir=tmp_path / "runs").create_run("Fix cart")
+    config = RunConfig(
+        max_iters=3,
+        test_cmd="echo 'AssertionError: cart total is off by one'; exit 1",
+        stop_on_success=False,
+        workspace_mode="copy",
+        repo_dir=str(tmp_path),
+        refine=True,
+    )
+    (tmp_path / "cart.py").write_text("TOTAL = 9\n")
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "gemini"
+    adapter.run.return_value = AttemptResult(
+        stdout="", stderr="", exit_code=0, duration_seconds=0.1, diff=""
+    )
+
+    IterationEngine(run, config).execute_run("Fix the cart total", [adapter])
+    run.close()
+
+    prompts = [call.args[0] for call in adapter.run.call_args_list]
+    assert prompts[0] == "Fix the cart total"
+    assert prompts[1].startswith(f"Fix the cart total\n\n{HEADER}")
+    assert "future_2010 (gemini): made no changes" in prompts[1]
+    assert "AssertionError: cart total is off by one" in prompts[1]
+    # Identical failures are listed once, not once per future
+    assert prompts[2].count("AssertionError") == 1
+    assert "future_2010 (gemini), future_2020 (gemini)" in prompts[2]
+    assert "prompt_refined" in (run.dir / "run.jsonl").read_text()
@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+import threading
+
+from future_ralph.core.logger import RunLogger
+
+
+def _events(run_dir):
+    with open(run_dir / "run.jsonl") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_logger_batches_concurrent_threads(tmp_path):
+    logger = RunLogger(tmp_path)
+
+    def emit(worker):
+        for i in range(500):
+            logger.log("tick", {"worker": worker, "i": i})
+
+    threads = [threading.Thread(target=emit, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    logger.flush()
+
+    events = _events(tmp_path)
+    assert len(events) == 4000
+    for worker in range(8):
+        seen = [e["data"]["i"] for e in events if e["data"]["worker"] == worker]
+        assert seen == list(range(500))
+    logger.close()
+
+
+def test_logger_is_safe_across_processes(tmp_path):
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "from future_ralph.core.logger import RunLogger\n"
+        "logger = RunLogger(Path(sys.argv[1]), fsync='batch')\n"
+        "for i in range(300):\n"
+        "    logger.log('tick', {'pid': sys.argv[2], 'pad': 'x' * 200})\n"
+        "logger.close()\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", script, str(tmp_path), str(n)])
+        for n in range(4)
+    ]
+    for proc in procs:
+        assert proc.wait() == 0
+
+    events = _events(tmp_path)
+    assert len(events) == 1200
+
+
+def test_logger_close_flushes_and_later_events_still_land(tmp_path):
+    logger = RunLogger(tmp_path, flush_interval=0.05, fsync="always")
+    logger.log("first")
+    logger.close()
+    logger.log("after_close")
+
+    assert [e["event"] for e in _events(tmp_path)] == ["first", "after_close"]
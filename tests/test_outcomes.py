@@ -0,0 +1,180 @@
+import json
+import sys
+from pathlib import Path
+
+from future_ralph.adapters.base import AttemptResult, BaseAdapter, ToolCapabilities
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import CaseResult, Future, FutureStatus, RunConfig
+from future_ralph.core.outcomes import parse_report, report_command
+from future_ralph.core.run_manager import RunManager
+from future_ralph.core.scoring import DefaultScoringPolicy
+
+JUNIT = b"""<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+<testcase classname="tests.test_cart" name="test_total" time="0.25" />
+<testcase classname="tests.test_cart" name="test_discount" time="0.5">
+  <failure message="assert 9 == 10">...</failure>
+</testcase>
+<testcase classname="tests.test_cart" name="test_crash" time="0.1"><error /></testcase>
+<testcase classname="tests.test_cart" name="test_later"><skipped /></testcase>
+</testsuite></testsuites>
+"""
+
+
+def test_reports_are_parsed():
+    tests = parse_report(JUNIT)
+    assert tests == {
+        "tests.test_cart.test_total": CaseResult("passed", 0.25),
+        "tests.test_cart.test_discount": CaseResult("failed", 0.5),
+        "tests.test_cart.test_crash": CaseResult("error", 0.1),
+        "tests.test_cart.test_later": CaseResult("skipped", 0.0),
+    }
+
+    report = {
+        "tests": [
+            {
+                "nodeid": "tests/test_cart.py::test_total",
+                "outcome": "passed",
+                "setup": {"duration": 0.25},
+                "call": {"duration": 0.5},
+            },
+            {"nodeid": "tests/test_cart.py::test_discount", "outcome": "failed"},
+        ]
+    }
+    assert parse_report(json.dumps(report).encode()) == {
+        "tests/test_cart.py::test_total": CaseResult("passed", 0.75),
+        "tests/test_cart.py::test_discount": CaseResult("failed", 0.0),
+    }
+
+    assert report_command("pytest -q").endswith(
+        '--junitxml="$FUTURE_RALPH_TEST_REPORT"'
+    )
+    assert report_command("python -m pytest tests").startswith(
+        "python -m pytest tests "
+    )
+    for cmd in ("make test", "pytest --junitxml=out.xml", "pytest && ruff check ."):
+        assert report_command(cmd) == cmd
+
+
+def test_near_misses_score_on_pass_ratio_and_regressions():
+    policy = DefaultScoringPolicy()
+    policy.baseline = {
+        "a": CaseResult("passed"),
+        "b": CaseResult("passed"),
+        "c": CaseResult("failed"),
+        "d": CaseResult("failed"),
+    }
+
+    def future(**outcomes: str) -> Future:
+        result = AttemptResult(stdout="", stderr="", exit_code=1, duration_seconds=1)
+        return Future(
+            id="future_2010",
+            year=2010,
+            tool_name="claude",
+            status=FutureStatus.COMPLETED,
+            result=result,
+            tests={name: CaseResult(outcome) for name, outcome in outcomes.items()},
+        )
+
+    near_miss = future(a="passed", b="passed", c="passed", d="failed")
+    broke_one = future(a="failed", b="passed", c="passed", d="passed")
+    no_change = future(a="passed", b="passed", c="failed", d="failed")
+    no_report = future()
+
+    scores = [policy.score(f) for f in (near_miss, broke_one, no_change, no_report)]
+    assert scores == sorted(scores, reverse=True)
+    assert policy.score(no_report) == -10.0
+    assert policy.score(broke_one) < policy.score(near_miss)
+
+    # An expensive, large passing future still beats a cheap near miss
+    passing = future(a="passed")
+    assert passing.result is not None
+    passing.result.exit_code = 0
+    passing.result.cost_info = {"cost_usd": 5.0}
+    passing.result.diff_stats = {"bytes": 12_000}
+    almost = future(**{f"t{i}": "passed" for i in range(199)}, t199="failed")
+    for f in (passing, almost):
+        f.score = policy.score(f)
+    assert almost.score > passing.score
+    assert policy.select_best([almost, passing]) is passing
+
+
+class _EditingAdapter(BaseAdapter):
+    """Makes each future change `cart.py` to the next of `versions`."""
+
+    def __init__(self, versions):
+        self.versions = list(versions)
+
+    def detect(self):
+        return {"found": True}
+
+    def capabilities(self):
+        return ToolCapabilities(name="fake")
+
+    def run(self, prompt, cwd=None, timeout=None, **kwargs):
+        Path(cwd, "cart.py").write_text(self.versions.pop(0))
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=0.1)
+
+
+def test_engine_scores_futures_against_cached_baseline(tmp_path, git_repo):
+    repo = git_repo(
+        files={
+            "cart.py": "def total():\n    return 1\n\nTAX = 0\n",
+            "test_cart.py": (
+                "from cart import TAX, total\n\n"
+                "def test_total():\n    assert total() == 1\n\n"
+                "def test_tax():\n    assert TAX == 2\n\n"
+                "def test_count():\n    assert total() + TAX > 3\n"
+            ),
+        },
+        message="Cart",
+    )
+    config = RunConfig(
+        max_iters=2,
+        test_cmd=f"{sys.executable} -m pytest -q -p no:cacheprovider",
+        test_results=True,
+        stop_on_success=False,
+        workspace_mode="git",
+        repo_dir=str(repo),
+        cache_dir=str(tmp_path / "cache"),
+        scheduler="round_robin",
+    )
+    # The first future fixes one of the two failing tests, the second breaks
+    # the passing one
+    adapter = _EditingAdapter(
+        [
+            "def total():\n    return 1\n\nTAX = 2\n",
+            "def total():\n    return 0\n\nTAX = 0\n",
+        ]
+    )
+    manager = RunManager(base_dir=tmp_path / "runs")
+    run = manager.create_run("Fix tax")
+    engine = IterationEngine(run, config)
+
+    best = engine.execute_run("Fix tax", [adapter])
+    run.close()
+
+    fixed, broke = engine.futures
+    assert best is fixed
+    assert set(fixed.tests) == {
+        "test_cart.test_total",
+        "test_cart.test_tax",
+        "test_cart.test_count",
+    }
+    assert fixed.tests["test_cart.test_tax"].outcome == "passed"
+    assert fixed.score > broke.score
+    log = [
+        json.loads(line) for line in (run.dir / "run.jsonl").read_text().splitlines()
+    ]
+    completed = [e["data"] for e in log if e["event"] == "iteration_completed"]
+    assert completed[1]["regressions"] == ["test_cart.test_total"]
+    assert completed[0]["tests"] == {"passed": 2, "failed": 1, "skipped": 0}
+    baselines = [e["data"] for e in log if e["event"] == "test_baseline"]
+    assert baselines == [{"cached": False, "passed": 1, "failed": 2, "skipped": 0}]
+
+    # The next run on the same tree reuses the baseline
+    run = manager.create_run("Fix tax")
+    engine = IterationEngine(run, config)
+    engine.execute_run("Fix tax", [_EditingAdapter(["TAX = 1\n", "TAX = 1\n"])])
+    run.close()
+    assert '"cached": true' in (run.dir / "run.jsonl").read_text()
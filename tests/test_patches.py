@@ -0,0 +1,38 @@
+from future_ralph.core.patches import PatchStore, diff_stats
+
+PATCH = (
+    "diff --git a/app.py b/app.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/app.py\n"
+    "+++ b/app.py\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-VALUE = 1\n"
+    "+VALUE = 2\n"
+    "+++counter\n"
+    " unchanged\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "new file mode 100644\n"
+    "GIT binary patch\n"
+    "literal 2\n"
+    "Jc${NkU;qFB00961\n"
+)
+
+
+def test_diff_stats():
+    assert diff_stats(PATCH) == {
+        "files": 2,
+        "insertions": 2,
+        "deletions": 1,
+        "bytes": len(PATCH),
+    }
+    assert diff_stats("") == {"files": 0, "insertions": 0, "deletions": 0, "bytes": 0}
+
+
+def test_patch_store_is_content_addressed(tmp_path):
+    store = PatchStore(tmp_path)
+    ref = store.put(PATCH)
+
+    assert store.put(PATCH) == ref
+    assert store.get(ref) == PATCH
+    assert len(list(tmp_path.rglob("*.patch.gz"))) == 1
+    assert store.path(ref).stat().st_size < len(PATCH)
@@ -0,0 +1,198 @@
+import os
+import time
+from pathlib import Path
+from typing import Callable
+from unittest.mock import MagicMock
+
+import pytest
+
+from future_ralph.adapters.base import (
+    CANCELLED_EXIT_CODE,
+    AttemptResult,
+    CommandResult,
+)
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import FutureStatus, RunConfig
+from future_ralph.core.result_cache import ResultCache, diff_hash, result_key
+
+PASSED = CommandResult(stdout="", stderr="", exit_code=0, duration_seconds=0.1)
+FAILED = CommandResult(stdout="", stderr="", exit_code=1, duration_seconds=0.1)
+
+
+def test_result_key_normalizes_prompt():
+    assert result_key("t", "fix  the\nbug ", "gemini") == result_key(
+        "t", "fix the bug", "gemini"
+    )
+    assert result_key("t", "fix", "gemini") != result_key("t", "fix", "claude")
+    assert result_key("t", "fix", "gemini") != result_key("t2", "fix", "gemini")
+    assert result_key("t", "fix", "gemini") != result_key(
+        "t", "fix", "gemini", sample=2
+    )
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    payload = {"result": {"stdout": "x" * 200}}
+    ResultCache(tmp_path, max_bytes=10**6).put("aa1", payload)
+    entry_size = (tmp_path / "aa" / "aa1.json").stat().st_size
+    cache = ResultCache(tmp_path, max_bytes=3 * entry_size + 10)
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        cache.put(key, payload)
+        stamp = time.time() - 100 + i
+        os.utime(cache._path(key), (stamp, stamp))
+    # Reading refreshes recency, so bb2 is now the oldest
+    assert cache.get("aa1") is not None
+
+    cache.put("dd4", payload)
+
+    assert cache.get("bb2") is None
+    assert cache.get("aa1") is not None
+    assert cache.get("dd4") is not None
+
+
+@pytest.fixture
+def make_engine(tmp_path, git_repo, engine_factory) -> Callable[[str], IterationEngine]:
+    """`make_engine(run_name)`: an engine for one run on a shared repo and cache."""
+    repo = git_repo()
+
+    def make(run_name: str) -> IterationEngine:
+        config = RunConfig(
+            max_iters=1,
+            test_cmd="grep -q fixed app.py",
+            repo_dir=str(repo),
+            cache_dir=str(tmp_path / "cache"),
+            result_cache=True,
+        )
+        return engine_factory(config, repo / "runs" / run_name)
+
+    return make
+
+
+def test_engine_replays_cached_future(make_engine):
+    calls = []
+
+    def agent(prompt, cwd, timeout=None, **kwargs):
+        calls.append(cwd)
+        (Path(cwd) / "app.py").write_text("VALUE = 'fixed'\n")
+        return AttemptResult(stdout="ok", stderr="", exit_code=0, duration_seconds=5)
+
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "agent"
+    adapter.run.side_effect = agent
+
+    first_engine = make_engine("r1")
+    first = first_engine.execute_run("fix it", [adapter])
+    assert first.result.exit_code == 0
+    assert "fixed" in first_engine.patches.get(first.result.diff_ref)
+
+    engine = make_engine("r2")
+    engine._run_tests = MagicMock(side_effect=AssertionError("verdict was cached"))
+    workspaces = []
+    engine.workspaces.release = lambda ws: workspaces.append(ws)
+    second = engine.execute_run("fix   it", [adapter])
+
+    assert len(calls) == 1
+    assert second.result.exit_code == 0
+    assert second.result.diff_ref == first.result.diff_ref
+    assert (engine.patches.path(second.result.diff_ref)).exists()
+    assert second.metadata["cache_hit"]
+    assert "fixed" in (workspaces[0].path / "app.py").read_text()
+    events = [c.args[0] for c in engine.run.logger.log.call_args_list]
+    assert "future_cache_hit" in events
+
+
+def test_engine_does_not_cache_failed_agent_runs(make_engine):
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "agent"
+    adapter.run.return_value = AttemptResult(
+        stdout="", stderr="boom", exit_code=1, duration_seconds=1
+    )
+
+    make_engine("r1").execute_run("fix it", [adapter])
+    make_engine("r2").execute_run("fix it", [adapter])
+
+    assert adapter.run.call_count == 2
+
+
+def test_diff_hash_ignores_incidental_differences():
+    a = "diff --git a/x b/x\nindex 111..222 100644\n+fix\n"
+    b = "diff --git a/x b/x\r\nindex 333..444 100644\r\n+fix\r\n\n"
+    assert diff_hash(a) == diff_hash(b)
+    assert diff_hash(a) != diff_hash(a.replace("fix", "fox"))
+
+
+def _same_patch_adapter(name):
+    def agent(prompt, cwd, timeout=None, **kwargs):
+        (Path(cwd) / "app.py").write_text("VALUE = 'fixed'\n")
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=1)
+
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = name
+    adapter.run.side_effect = agent
+    return adapter
+
+
+@pytest.mark.parametrize("tests", [PASSED, FAILED])
+@pytest.mark.parametrize("max_parallel", [1, 3])
+def test_identical_patches_are_tested_once(max_parallel, tests, make_engine):
+    engine = make_engine("r1")
+    engine.config.max_iters = 3
+    engine.config.max_parallel = max_parallel
+    engine.config.stop_on_success = False
+    engine.config.result_cache = False
+    engine.result_cache = None
+    engine._run_tests = MagicMock(return_value=tests)
+
+    adapters = [_same_patch_adapter(n) for n in ("a", "b", "c")]
+    best = engine.execute_run("fix it", adapters)
+
+    assert engine._run_tests.call_count == 1
+    duplicates = [f for f in engine.futures if f.metadata.get("duplicate_of")]
+    assert len(duplicates) == 2
+    # Duplicates get the test verdict, not the agent's clean exit
+    assert all(f.result.exit_code == tests.exit_code for f in engine.futures)
+    assert best is not None and not best.metadata.get("duplicate_of")
+    assert {f.metadata["duplicate_of"] for f in duplicates} == {best.id}
+
+
+@pytest.mark.parametrize("tests", [PASSED, FAILED])
+def test_verdicts_are_shared_between_runs(tmp_path, tests, make_engine):
+    for run_name in ("r1", "r2"):
+        engine = make_engine(run_name)
+        engine.result_cache = None
+        engine.verdict_cache = ResultCache(tmp_path / "cache" / "verdicts", 10**6)
+        engine._run_tests = MagicMock(return_value=tests)
+        best = engine.execute_run("fix it", [_same_patch_adapter("a")])
+        assert best.result.exit_code == tests.exit_code
+
+    assert engine._run_tests.call_count == 0
+    assert best.metadata["verdict_cached"]
+
+
+def test_cancelled_pipeline_leaves_no_verdict(tmp_path, make_engine):
+    verdicts = ResultCache(tmp_path / "cache" / "verdicts", 10**6)
+    engine = make_engine("r1")
+    engine.config.speculative = True
+    engine.result_cache = None
+    engine.verdict_cache = verdicts
+
+    def cancelled_tests(*args, **kwargs):
+        # Another future won while this one was being tested
+        engine._cancel.set()
+        return CommandResult(
+            stdout="", stderr="", exit_code=CANCELLED_EXIT_CODE, duration_seconds=1
+        )
+
+    engine._run_tests = MagicMock(side_effect=cancelled_tests)
+    engine.execute_run("fix it", [_same_patch_adapter("a")])
+
+    assert engine.futures[0].status == FutureStatus.SKIPPED
+    assert not list((tmp_path / "cache" / "verdicts").rglob("*.json"))
+
+    engine = make_engine("r2")
+    engine.result_cache = None
+    engine.verdict_cache = verdicts
+    engine._run_tests = MagicMock(return_value=FAILED)
+    best = engine.execute_run("fix it", [_same_patch_adapter("a")])
+
+    assert engine._run_tests.call_count == 1
+    assert best.result.exit_code == 1
@@ -0,0 +1,116 @@
+import time
+from pathlib import Path
+
+from typer.testing import CliRunner
+from future_ralph.core.patches import PatchStore
+from future_ralph.core.retention import (
+    ARCHIVE_FILE,
+    RetentionPolicy,
+    collect,
+    compact_run,
+    read_run_file,
+)
+from future_ralph.core.run_manager import RunManager
+from future_ralph.core.tracing import load_spans
+from future_ralph.main import app
+
+PATCH = "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n" * 50
+
+
+def _finished_run(
+    manager: RunManager, prompt: str, status: str = "success", score: float = 100.0
+) -> str:
+    run = manager.create_run(prompt)
+    ref = PatchStore(run.dir / "patches").put(PATCH + prompt)
+    run.logger.log("iteration_started", {"future_id": "future_2010", "tool": "claude"})
+    run.logger.log(
+        "iteration_completed",
+        {"future_id": "future_2010", "score": score, "exit_code": 0, "diff_ref": ref},
+    )
+    run.logger.log("best_future_selected", {"future_id": "future_2010", "score": score})
+    run.logger.log("run_completed", {"status": status})
+    run.tracer.record("agent", 1.0, 2.0, "future_2010")
+    (run.dir / "futures").mkdir()
+    (run.dir / "futures" / "future_2010.log").write_text("working...\n" * 1000)
+    run.close()
+    return run.id
+
+
+def _age(manager: RunManager, run_id: str, days: float):
+    """Pretend a run started `days` ago."""
+    started = time.time() - days * 86400
+    with manager.catalog._lock:
+        manager.catalog._connect().execute(
+            "UPDATE runs SET started_at = ? WHERE id = ?", (started, run_id)
+        )
+
+
+def test_compacted_run_stays_readable(tmp_path):
+    manager = RunManager(base_dir=tmp_path / "runs")
+    run_id = _finished_run(manager, "fix it")
+    run_dir = manager.base_dir / run_id
+    log_before = (run_dir / "run.jsonl").read_bytes()
+
+    saved = compact_run(run_dir)
+
+    assert saved > 0
+    assert [p.name for p in run_dir.iterdir()] == [ARCHIVE_FILE]
+    assert read_run_file(run_dir, "run.jsonl") == log_before
+    assert b"working" in read_run_file(run_dir, "futures/future_2010.log")
+    assert read_run_file(run_dir, "missing.txt") is None
+    assert [s.name for s in load_spans(run_dir)] == ["agent"]
+
+    # A fresh catalog is rebuilt from the archive
+    manager.catalog.close()
+    (manager.base_dir / "catalog.sqlite").unlink()
+    rebuilt = RunManager(base_dir=manager.base_dir)
+    assert rebuilt.run_record(run_id).status == "success"
+    assert rebuilt.future_records(run_id)[0].diff_ref
+
+
+def test_collect_applies_retention(tmp_path):
+    manager = RunManager(base_dir=tmp_path / "runs")
+    old_best = _finished_run(manager, "old best", score=120.0)
+    old = _finished_run(manager, "old", status="failed")
+    mid = _finished_run(manager, "mid", score=50.0)
+    new = _finished_run(manager, "new", score=90.0)
+    active = manager.create_run("still going")
+    active.close()
+    for run_id in (old_best, old):
+        _age(manager, run_id, 30)
+
+    report = collect(
+        manager, RetentionPolicy(max_age_days=7, keep_best=1), dry_run=True
+    )
+    assert report.deleted == [old]
+    assert (manager.base_dir / old).exists()
+
+    report = collect(manager, RetentionPolicy(max_age_days=7, keep_best=1))
+
+    assert report.deleted == [old]
+    assert not (manager.base_dir / old).exists()
+    assert manager.run_record(old) is None
+    # The best run is left as it was; active runs are never touched
+    assert not (manager.base_dir / old_best / ARCHIVE_FILE).exists()
+    assert (manager.base_dir / active.id / "run.jsonl").exists()
+    assert sorted(report.compacted) == sorted([mid, new])
+
+    # Over the size limit, the oldest unprotected runs go first
+    limit_mb = (report.bytes_kept - 1) / 1024 / 1024
+    report = collect(manager, RetentionPolicy(max_total_mb=limit_mb, keep_best=1))
+    assert report.deleted == [mid]
+    assert manager.run_record(new).status == "success"
+
+
+def test_gc_command_and_results_of_compacted_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    run_id = _finished_run(RunManager(), "fix it")
+    runner = CliRunner()
+
+    result = runner.invoke(app, ["gc"])
+
+    assert result.exit_code == 0, result.stdout
+    assert f"compacted  {run_id}" in result.stdout
+    assert (Path("runs") / run_id / ARCHIVE_FILE).exists()
+    result = runner.invoke(app, ["results", run_id])
+    assert "future_2010" in result.stdout
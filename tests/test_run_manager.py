@@ -16,3 +16,79 @@ def test_run_creation():
 
     # Cleanup
     shutil.rmtree(test_runs_dir)
+
+
+def _finish(run, status, score):
+    run.logger.log("iteration_started", {"future_id": "future_2010", "tool": "claude"})
+    run.logger.log(
+        "iteration_completed",
+        {
+            "future_id": "future_2010",
+            "score": score,
+            "exit_code": 0,
+            "cost": {"estimated_tokens": 25},
+        },
+    )
+    run.logger.log("best_future_selected", {"future_id": "future_2010", "score": score})
+    run.logger.log("run_completed", {"status": status})
+    run.close()
+
+
+def test_catalog_tracks_run_state(tmp_path):
+    manager = RunManager(base_dir=tmp_path)
+    ok = manager.create_run("Fix login")
+    _finish(ok, "success", 100.0)
+    bad = manager.create_run("Fix logout")
+    _finish(bad, "failed", -10.0)
+    active = manager.create_run("Still going")
+
+    assert manager.list_runs(status="running") == [active.id]
+    assert manager.list_runs(status="success") == [ok.id]
+    assert len(manager.list_runs()) == 3
+    assert (
+        manager.list_runs(limit=1, offset=1)
+        == sorted([ok.id, bad.id, active.id], reverse=True)[1:2]
+    )
+
+    record = manager.run_record(ok.id)
+    assert record.prompt == "Fix login"
+    assert record.best_future == "future_2010"
+    assert record.best_score == 100.0
+    assert record.tokens == 25
+    [future] = manager.future_records(ok.id)
+    assert future.tool == "claude"
+    assert future.status == "completed"
+
+
+def test_reindex_rebuilds_catalog_from_logs(tmp_path):
+    manager = RunManager(base_dir=tmp_path)
+    run = manager.create_run("Fix login")
+    _finish(run, "success", 100.0)
+    manager.catalog.close()
+    (tmp_path / "catalog.sqlite").unlink()
+    for leftover in tmp_path.glob("catalog.sqlite-*"):
+        leftover.unlink()
+
+    # A fresh manager notices the missing catalog and rebuilds it
+    rebuilt = RunManager(base_dir=tmp_path)
+    assert rebuilt.list_runs(status="success") == [run.id]
+    assert rebuilt.reindex() == 1
+    assert rebuilt.run_record(run.id).best_future == "future_2010"
+
+
+def test_tool_stats_per_repo(tmp_path):
+    manager = RunManager(base_dir=tmp_path)
+    for repo, exit_code in [("/a", 0), ("/a", 1), ("/b", 1)]:
+        run = manager.create_run("Fix", repo=repo)
+        run.logger.log("iteration_started", {"future_id": "f1", "tool": "claude"})
+        run.logger.log(
+            "iteration_completed",
+            {"future_id": "f1", "exit_code": exit_code, "duration_seconds": 10},
+        )
+        run.close()
+
+    everywhere = manager.tool_stats()["claude"]
+    assert (everywhere.attempts, everywhere.successes) == (3, 1)
+    in_a = manager.tool_stats("/a")["claude"]
+    assert (in_a.attempts, in_a.successes, in_a.mean_duration) == (2, 1, 10.0)
+    assert manager.tool_stats("/c") == {}
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from future_ralph.adapters.base import AttemptResult
+from future_ralph.core.catalog import ToolStats
+from future_ralph.core.models import Future
+from future_ralph.core.scheduler import (
+    BanditScheduler,
+    RoundRobinScheduler,
+    create_scheduler,
+)
+
+
+def _adapters(*names):
+    adapters = []
+    for name in names:
+        adapter = MagicMock()
+        adapter.capabilities.return_value.name = name
+        adapters.append(adapter)
+    return adapters
+
+
+def _names(picks):
+    return [a.capabilities().name for a in picks]
+
+
+def _finished(tool, exit_code, duration=1.0):
+    future = Future(id="f", year=2010, tool_name=tool)
+    future.result = AttemptResult("", "", exit_code, duration)
+    return future
+
+
+def test_round_robin_cycles():
+    adapters = _adapters("a", "b")
+    scheduler = RoundRobinScheduler()
+    assert _names(scheduler.choose(adapters, i) for i in range(1, 5)) == [
+        "a",
+        "b",
+        "a",
+        "b",
+    ]
+
+
+def test_bandit_tries_unknown_tools_first():
+    adapters = _adapters("a", "b", "c")
+    scheduler = BanditScheduler({"b": ToolStats(attempts=10, successes=9)}, seed=1)
+    assert _names([scheduler.choose(adapters, 1), scheduler.choose(adapters, 2)]) == [
+        "a",
+        "c",
+    ]
+
+
+def test_bandit_prefers_tools_that_succeed():
+    adapters = _adapters("flaky", "solid")
+    history = {
+        "flaky": ToolStats(attempts=20, successes=1, mean_duration=60),
+        "solid": ToolStats(attempts=20, successes=15, mean_duration=60),
+    }
+    scheduler = BanditScheduler(history, seed=7)
+    picks = _names(scheduler.choose(adapters, i) for i in range(1, 101))
+    assert picks.count("solid") > 90
+
+
+def test_bandit_learns_within_a_run():
+    adapters = _adapters("a", "b")
+    scheduler = BanditScheduler(seed=3)
+    for _ in range(10):
+        scheduler.record(_finished("a", 1))
+        scheduler.record(_finished("b", 0))
+    assert scheduler.stats["b"].successes == 10
+    picks = _names(scheduler.choose(adapters, i) for i in range(1, 51))
+    assert picks.count("b") > 45
+
+
+def test_create_scheduler():
+    assert isinstance(create_scheduler("round_robin"), RoundRobinScheduler)
+    bandit = create_scheduler("bandit", {"a": ToolStats(1, 1)})
+    assert isinstance(bandit, BanditScheduler)
+    assert bandit.stats["a"].successes == 1
+    with pytest.raises(ValueError):
+        create_scheduler("lottery")
@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+from typing import Tuple
+from unittest.mock import MagicMock, patch
+
+from future_ralph.adapters.base import AttemptResult
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import RunConfig
+from future_ralph.core.selection import ImportGraph, load_import_graph
+
+
+def _write(root: Path, rel: str, text: str):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _make_project(root: Path) -> Path:
+    _write(root, "pkg/__init__.py", "")
+    _write(root, "pkg/a.py", "VALUE = 1\n")
+    _write(root, "pkg/b.py", "from .a import VALUE\n")
+    _write(root, "tests/test_a.py", "from pkg.a import VALUE\n")
+    _write(root, "tests/test_b.py", "import pkg.b\n")
+    _write(root, "tests/test_other.py", "import os\n")
+    return root
+
+
+def test_affected_tests_follow_imports_transitively(tmp_path):
+    graph = ImportGraph.build(_make_project(tmp_path))
+
+    assert graph.affected_tests(["pkg/a.py"]) == ["tests/test_a.py", "tests/test_b.py"]
+    assert graph.affected_tests(["pkg/b.py"]) == ["tests/test_b.py"]
+    assert graph.affected_tests(["tests/test_other.py"]) == ["tests/test_other.py"]
+    assert graph.affected_tests(["README.md"]) == []
+    # Changes that cannot be mapped mean "run everything"
+    assert graph.affected_tests(["setup.cfg"]) is None
+    assert graph.affected_tests(["tests/conftest.py"]) is None
+
+
+def test_import_graph_cached_per_revision(tmp_path, git):
+    repo = _make_project(tmp_path / "repo")
+    git(repo, "init", "-q")
+    git(repo, "add", ".")
+    git(repo, "commit", "-q", "-m", "init")
+    cache = tmp_path / "cache"
+
+    load_import_graph(repo, cache)
+    assert len(list((cache / "import-graph").glob("*.json"))) == 1
+
+    with patch.object(ImportGraph, "build") as build:
+        graph = load_import_graph(repo, cache)
+    build.assert_not_called()
+    assert graph.affected_tests(["pkg/b.py"]) == ["tests/test_b.py"]
+
+
+def _selection_engine(
+    engine_factory, tmp_path: Path, agent
+) -> Tuple[IterationEngine, Path]:
+    source = _make_project(tmp_path / "src")
+    calls = tmp_path / "calls.txt"
+    recorder = tmp_path / "record.py"
+    recorder.write_text(
+        f"import sys\nopen({str(calls)!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')\n"
+    )
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "agent"
+    adapter.run.side_effect = agent
+
+    config = RunConfig(
+        max_iters=1,
+        test_cmd=f"{sys.executable} {recorder}",
+        repo_dir=str(source),
+        workspace_mode="copy",
+        test_selection=True,
+        cache_dir=str(tmp_path / "cache"),
+    )
+    engine = engine_factory(config, tmp_path / "run")
+    engine.execute_run("fix it", [adapter])
+    return engine, calls
+
+
+def test_engine_runs_selected_tests_then_full_suite_for_best(tmp_path, engine_factory):
+    def agent(prompt, cwd, timeout=None, **kwargs):
+        (Path(cwd) / "pkg" / "b.py").write_text("from .a import VALUE\nX = 2\n")
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=0)
+
+    engine, calls = _selection_engine(engine_factory, tmp_path, agent)
+
+    best = engine.futures[0]
+    assert best.metadata["selected_tests"] == ["tests/test_b.py"]
+    assert calls.read_text().splitlines() == ["tests/test_b.py", ""]
+
+
+def test_deleted_and_renamed_tests_are_not_selected(tmp_path, engine_factory):
+    def rename(prompt, cwd, timeout=None, **kwargs):
+        tests = Path(cwd) / "tests"
+        (tests / "test_b.py").rename(tests / "test_b_renamed.py")
+        (tests / "test_other.py").unlink()
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=0)
+
+    engine, calls = _selection_engine(engine_factory, tmp_path / "rename", rename)
+
+    assert engine.futures[0].metadata["selected_tests"] == ["tests/test_b_renamed.py"]
+    assert calls.read_text().splitlines() == ["tests/test_b_renamed.py", ""]
+
+    def delete(prompt, cwd, timeout=None, **kwargs):
+        (Path(cwd) / "tests" / "test_other.py").unlink()
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=0)
+
+    engine, calls = _selection_engine(engine_factory, tmp_path / "delete", delete)
+
+    # Nothing left to select: the full suite runs instead
+    assert "selected_tests" not in engine.futures[0].metadata
+    assert calls.read_text().splitlines() == [""]
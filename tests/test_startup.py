@@ -0,0 +1,50 @@
+import subprocess
+import sys
+from typing import Dict
+
+# Import cost of future_ralph.main on top of typer itself, in microseconds.
+# Typer is the floor for any command; everything of ours must stay lazy.
+STARTUP_BUDGET_US = 50_000
+
+HEAVY_MODULES = {
+    "pydantic",
+    "yaml",
+    "asyncio",
+    "textual",
+    "future_ralph.core.config",
+    "future_ralph.core.engine",
+    "future_ralph.adapters.base",
+    "future_ralph.adapters.claude",
+}
+
+
+def _import_times(args, cwd=None) -> Dict[str, int]:
+    """Cumulative import time per module, from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_main_import_stays_within_budget():
+    times = _import_times(["-c", "import future_ralph.main"])
+
+    assert not HEAVY_MODULES & set(times)
+    own = times["future_ralph.main"] - times.get("typer", 0)
+    assert own < STARTUP_BUDGET_US
+
+
+def test_status_command_skips_heavy_imports(tmp_path):
+    times = _import_times(["-m", "future_ralph.main", "status"], cwd=tmp_path)
+
+    assert "future_ralph.core.catalog" in times
+    assert not HEAVY_MODULES & set(times)
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from typer.testing import CliRunner
+from future_ralph.core.run_manager import RunManager
+from future_ralph.core.status import LogWatcher, RunTail
+from future_ralph.main import app
+
+
+def _append(path, event, data, ts=100.0):
+    with open(path, "a") as f:
+        f.write(json.dumps({"timestamp": ts, "event": event, "data": data}) + "\n")
+
+
+def test_run_tail_reads_only_new_complete_lines(tmp_path):
+    log = tmp_path / "run.jsonl"
+    _append(log, "run_started", {"prompt": "fix it"})
+    _append(log, "iteration_started", {"future_id": "future_2010", "tool": "claude"})
+    with open(log, "a") as f:
+        f.write('{"timestamp": 101, "event": "agent_progress", "da')
+
+    tail = RunTail(tmp_path)
+    assert tail.poll()
+    assert tail.state.prompt == "fix it"
+    assert tail.state.futures["future_2010"].state == "running"
+    offset = tail.offset
+    assert not tail.poll()
+
+    with open(log, "a") as f:
+        f.write('ta": {"future_id": "future_2010", "lines": 7, "last_line": "hi"}}\n')
+    _append(log, "iteration_completed", {"future_id": "future_2010", "score": 90.0})
+    assert tail.poll()
+    future = tail.state.futures["future_2010"]
+    assert (future.lines, future.state, future.score) == (7, "completed", 90.0)
+    assert tail.offset == log.stat().st_size > offset
+
+    log.write_text("")
+    _append(log, "run_started", {"prompt": "again"})
+    assert tail.poll()
+    assert tail.state.prompt == "again" and not tail.state.futures
+
+
+def test_run_tail_reads_one_chunk_per_poll(tmp_path, monkeypatch):
+    log = tmp_path / "run.jsonl"
+    for n in range(20):
+        _append(log, "iteration_started", {"future_id": f"f{n}", "tool": "claude"})
+    monkeypatch.setattr("future_ralph.core.status.READ_CHUNK", 512)
+
+    tail = RunTail(tmp_path)
+    assert tail.poll()
+    assert 0 < len(tail.state.futures) < 20 and tail.behind
+    while tail.poll():
+        pass
+    assert len(tail.state.futures) == 20 and not tail.behind
+
+
+def test_run_tail_resumes_from_snapshot(tmp_path):
+    log = tmp_path / "run.jsonl"
+    _append(log, "run_started", {"prompt": "fix it"})
+    _append(log, "iteration_started", {"future_id": "future_2010", "tool": "codex"})
+    tail = RunTail(tmp_path)
+    tail.poll()
+    tail.save()
+
+    _append(log, "test_stage_completed", {"future_id": "future_2010", "stage": "unit"})
+    resumed = RunTail.load(tmp_path)
+    assert resumed.offset == tail.offset
+    assert resumed.state.futures["future_2010"].tool == "codex"
+    assert resumed.poll()
+    assert resumed.state.futures["future_2010"].stages == ["unit=None"]
+
+    (tmp_path / "status.json").write_text("{broken")
+    assert RunTail.load(tmp_path).offset == 0
+
+
+def test_log_watcher_wakes_on_appends(tmp_path):
+    watcher = LogWatcher()
+    watcher.watch([tmp_path])
+    timer = threading.Timer(0.1, _append, (tmp_path / "run.jsonl", "x", {}))
+    timer.start()
+    start = time.time()
+    assert watcher.wait(5.0)
+    if watcher.uses_inotify:
+        assert time.time() - start < 4
+    timer.join()
+    watcher.close()
+
+
+def test_status_shows_futures_of_active_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RunManager()
+    run = manager.create_run("Fix bug")
+    run.logger.log("run_configured", {"max_iters": 3, "timeout_per_iter": 300})
+    run.logger.log("iteration_started", {"future_id": "future_2010", "tool": "claude"})
+    run.logger.log(
+        "agent_progress",
+        {"future_id": "future_2010", "lines": 42, "last_line": "editing app.py"},
+    )
+    run.logger.log("iteration_started", {"future_id": "future_2020", "tool": "gemini"})
+    run.logger.log(
+        "iteration_completed",
+        {"future_id": "future_2020", "score": 95.0, "exit_code": 0},
+    )
+    run.close()
+    done = manager.create_run("Old task")
+    done.logger.log("run_completed", {"status": "failed"})
+    done.close()
+
+    result = CliRunner().invoke(app, ["status"])
+
+    assert result.exit_code == 0
+    assert "2 futures of 3" in result.stdout
+    assert "/ 5m00s  42 lines  editing app.py" in result.stdout
+    assert "future_2020  gemini     completed  score=95.0  exit=0" in result.stdout
+    assert "Recent runs:" in result.stdout and "Old task" in result.stdout
+    assert (run.dir / "status.json").exists()
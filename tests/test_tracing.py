@@ -0,0 +1,97 @@
+from unittest.mock import MagicMock
+from future_ralph.adapters.base import AttemptResult, OutputEvent
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import RunConfig
+from future_ralph.core.run_manager import RunManager
+from future_ralph.core.tracing import (
+    Span,
+    Tracer,
+    chrome_trace,
+    critical_path,
+    load_spans,
+    phase_breakdown,
+)
+
+
+def test_tracer_records_spans(tmp_path):
+    tracer = Tracer(tmp_path)
+    with tracer.span("agent", "future_2010", tool="gemini") as attrs:
+        attrs["exit_code"] = 0
+    tracer.record("tests", 10.0, 12.5, "future_2010")
+    tracer.close()
+    with open(tmp_path / "trace.jsonl", "a") as f:
+        f.write('{"name": "cut sh')
+
+    spans = load_spans(tmp_path)
+
+    assert [s.name for s in spans] == ["tests", "agent"]
+    assert spans[0].duration == 2.5
+    assert spans[1].attrs == {"tool": "gemini", "exit_code": 0}
+    assert load_spans(tmp_path / "missing") == []
+
+
+def test_breakdown_and_critical_path():
+    spans = [
+        Span("run", 0.0, 10.0),
+        Span("iteration", 0.0, 4.0, "future_2010"),
+        Span("agent", 0.0, 3.0, "future_2010"),
+        Span("iteration", 0.5, 8.0, "future_2020"),
+        Span("agent", 0.5, 7.0, "future_2020"),
+        Span("iteration", 8.5, 9.0, "future_2030"),
+        Span("select_best", 9.0, 9.5),
+    ]
+
+    phases = phase_breakdown(spans)
+    assert phases["agent"]["count"] == 2
+    assert phases["agent"]["total"] == 9.5
+    assert phases["agent"]["max"] == 6.5
+    assert "iteration" not in phases and "run" not in phases
+
+    path = critical_path(spans)
+    assert [(s.name, s.future_id) for s in path] == [
+        ("iteration", "future_2020"),
+        ("iteration", "future_2030"),
+        ("select_best", None),
+    ]
+
+    trace = chrome_trace(spans)
+    assert len(trace["traceEvents"]) == len(spans)
+    agent = trace["traceEvents"][2]
+    assert agent["ph"] == "X" and agent["tid"] == "future_2010"
+    assert agent["dur"] == 3_000_000
+
+
+def test_engine_traces_each_phase(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "app.py").write_text("VALUE = 1\n")
+
+    def agent(prompt, cwd, timeout=None, on_event=None, **kwargs):
+        on_event(OutputEvent("stdout", "thinking", 1, 9))
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=1)
+
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "gemini"
+    adapter.run.side_effect = agent
+
+    run = RunManager(base_dir=tmp_path / "runs").create_run("fix it")
+    config = RunConfig(
+        max_iters=2,
+        test_cmd="true",
+        stop_on_success=False,
+        workspace_mode="copy",
+        repo_dir=str(repo),
+    )
+    IterationEngine(run, config).execute_run("fix it", [adapter])
+    run.close()
+
+    spans = load_spans(run.dir)
+    names = {s.name for s in spans}
+    assert {"run", "iteration", "workspace", "agent_startup", "agent"} <= names
+    assert {"diff", "tests", "test:tests", "score", "select_best", "cleanup"} <= names
+    iterations = [s for s in spans if s.name == "iteration"]
+    assert [s.attrs["status"] for s in iterations] == ["completed", "completed"]
+    for span in spans:
+        if span.future_id and span.name != "iteration":
+            parent = next(s for s in iterations if s.future_id == span.future_id)
+            assert parent.start <= span.start and span.end <= parent.end
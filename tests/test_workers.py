@@ -0,0 +1,214 @@
+import contextlib
+import dataclasses
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from future_ralph.adapters.base import (
+    AttemptResult,
+    BaseAdapter,
+    OutputEvent,
+    ResourceLimits,
+    ToolCapabilities,
+)
+from future_ralph.adapters.remote import RemoteAdapter
+from future_ralph.core.engine import IterationEngine
+from future_ralph.core.models import FutureStatus, PipelineStage, RunConfig
+from future_ralph.core.run_manager import RunManager
+from future_ralph.core.workers import FileJobQueue
+from future_ralph.core.workspace import WorkspaceManager
+
+
+class EditingAdapter(BaseAdapter):
+    """
+    Sets VALUE in app.py to one more than it finds, and says so. Reports
+    where it ran and under which limits as its stdout.
+    """
+
+    def detect(self) -> Dict[str, Any]:
+        return {"found": True, "binary_path": None, "version": "test", "notes": []}
+
+    def capabilities(self) -> ToolCapabilities:
+        return ToolCapabilities(name="claude")
+
+    def run(
+        self,
+        prompt,
+        cwd,
+        model=None,
+        timeout=None,
+        log_path=None,
+        on_event=None,
+        cancel=None,
+    ) -> AttemptResult:
+        app = Path(cwd) / "app.py"
+        value = int(app.read_text().split("=")[1]) + 1
+        app.write_text(f"VALUE = {value}\n")
+        (Path(cwd) / "NEW.txt").write_text(prompt)
+        if on_event:
+            on_event(OutputEvent("stdout", f"set VALUE to {value}", 1, 20))
+        limits = dataclasses.asdict(self.limits) if self.limits else None
+        return AttemptResult(
+            stdout=json.dumps({"cwd": cwd, "limits": limits}),
+            stderr="",
+            exit_code=0,
+            duration_seconds=0.1,
+        )
+
+
+# Each worker is a process of its own, as on separate hosts
+_WORKER_MAIN = """
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+from future_ralph.core.workers import FileJobQueue, Worker
+from test_workers import EditingAdapter
+work_dir = Path(sys.argv[3])
+queue = FileJobQueue(Path(sys.argv[2]))
+Worker(queue, {"claude": EditingAdapter()}, work_dir, work_dir.name).serve()
+"""
+
+_CLAIM_MAIN = """
+import sys, time
+from pathlib import Path
+from future_ralph.core.workers import FileJobQueue
+queue = FileJobQueue(Path(sys.argv[1]))
+while not (queue.root / "go").exists():
+    time.sleep(0.01)
+while True:
+    job = queue.claim(["claude"])
+    if job is None:
+        break
+    print(job["id"], flush=True)
+"""
+
+
+@contextlib.contextmanager
+def _workers(
+    queue: FileJobQueue, work_dirs: List[Path]
+) -> Iterator[List[subprocess.Popen]]:
+    tests_dir = str(Path(__file__).parent)
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", _WORKER_MAIN, tests_dir, str(queue.root), str(d)]
+        )
+        for d in work_dirs
+    ]
+    try:
+        yield procs
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+
+def test_queue_claims_each_job_once_in_order(tmp_path):
+    queue = FileJobQueue(tmp_path / "queue")
+    ids = [queue.publish("claude", {"n": n}) for n in range(20)]
+    queue.publish("gemini", {"n": -1})
+
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", _CLAIM_MAIN, str(queue.root)],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(4)
+    ]
+    (queue.root / "go").touch()
+    claimed = [line for proc in procs for line in proc.communicate()[0].split()]
+
+    assert sorted(claimed) == ids
+    # Only the other tool's job is left, and a claimed job cannot be withdrawn
+    assert queue.claim(["claude"]) is None
+    assert not queue.withdraw("claude", ids[0])
+    assert queue.claim(["gemini", "claude"])["n"] == -1
+
+    queue.heartbeat("host-1", ["claude"])
+    assert queue.live_tools() == {"claude"}
+    assert queue.live_tools(ttl=-1) == set()
+
+
+def test_queue_progress_is_readable_while_posted(tmp_path):
+    queue = FileJobQueue(tmp_path / "queue")
+    job_id = queue.publish("claude", {})
+
+    with queue.progress(job_id) as post:
+        post(OutputEvent("stdout", "first", 1, 6))
+        events, offset = queue.read_progress(job_id)
+        assert [e.line for e in events] == ["first"]
+        post(OutputEvent("stderr", "second", 2, 13))
+        events, offset = queue.read_progress(job_id, offset)
+
+    assert [(e.stream, e.line) for e in events] == [("stderr", "second")]
+    assert queue.read_progress(job_id, offset) == ([], offset)
+
+
+def test_remote_adapter_runs_on_worker(tmp_path, git_repo):
+    repo = git_repo()
+    (repo / "app.py").write_text("VALUE = 41\n")  # uncommitted: workers need it too
+    manager = WorkspaceManager(repo, tmp_path / "workspaces", "git")
+    workspace = manager.create("future_2010")
+
+    queue = FileJobQueue(tmp_path / "queue")
+    work_dirs = [tmp_path / "worker0", tmp_path / "worker1"]
+    with _workers(queue, work_dirs):
+        # The tests run on the worker too, under the coordinator's limits
+        check = "test $(ulimit -n) = 64 && grep -q 42 app.py"
+        stages = [PipelineStage(name="check", cmd=check)]
+        adapter = RemoteAdapter("claude", queue, stages=stages, poll_interval=0.01)
+        adapter.limits = ResourceLimits(open_files=64)
+        events = []
+        result = adapter.run(
+            "add a file",
+            cwd=str(workspace.path),
+            timeout=30,
+            log_path=str(tmp_path / "future.log"),
+            on_event=events.append,
+        )
+
+    assert result.exit_code == 0
+    # The agent ran on a worker checkout, not in the local workspace
+    report = json.loads(result.stdout)
+    assert report["cwd"].startswith(str(tmp_path / "worker"))
+    assert report["limits"]["open_files"] == 64
+    # ... and its changes came back
+    assert (workspace.path / "app.py").read_text() == "VALUE = 42\n"
+    assert (workspace.path / "NEW.txt").read_text() == "add a file"
+    assert [e.line for e in events] == ["set VALUE to 42"]
+    assert "set VALUE to 42" in (tmp_path / "future.log").read_text()
+    assert result.verdict["exit_code"] == 0
+    assert [s["stage"] for s in result.verdict["test_stages"]] == ["check"]
+    # Finished jobs leave nothing behind in the queue
+    assert not list((queue.root / "results").iterdir())
+    manager.cleanup()
+
+
+def test_engine_adopts_worker_verdict(tmp_path, git_repo):
+    repo = git_repo()
+    queue = FileJobQueue(tmp_path / "queue")
+    with _workers(queue, [tmp_path / "worker"]):
+        config = RunConfig(
+            max_iters=2,
+            test_cmd="grep -q 2 app.py",
+            stop_on_success=False,
+            max_parallel=2,
+            workspace_mode="git",
+            repo_dir=str(repo),
+        )
+        stages = [PipelineStage(name="tests", cmd=config.test_cmd, selectable=True)]
+        adapter = RemoteAdapter("claude", queue, stages=stages, poll_interval=0.01)
+        run = RunManager(base_dir=tmp_path / "runs").create_run("bump")
+        engine = IterationEngine(run, config)
+        best = engine.execute_run("bump", [adapter])
+        run.close()
+
+    assert best is not None and best.result.exit_code == 0
+    assert all(f.status == FutureStatus.COMPLETED for f in engine.futures)
+    assert best.metadata["test_stages"][0]["stage"] == "tests"
+    # The verdict came from the worker: no stage ran locally
+    log = (run.dir / "run.jsonl").read_text()
+    assert "test_stage_completed" not in log
+    assert engine.patches.get(best.result.diff_ref).count("+VALUE = 2") == 1
@@ -0,0 +1,120 @@
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from future_ralph.adapters.base import AttemptResult
+from future_ralph.core.models import RunConfig
+from future_ralph.core.workspace import WorkspaceManager
+
+
+def test_git_worktree_workspace(git_repo):
+    repo = git_repo()
+    (repo / "app.py").write_text("VALUE = 2\n")  # uncommitted change
+    (repo / "notes.txt").write_text("untracked\n")
+    (repo / "runs" / "old").mkdir(parents=True)
+    (repo / "runs" / "old" / "run.jsonl").write_text("{}\n")
+
+    manager = WorkspaceManager(repo, repo / "runs" / "r1" / "workspaces")
+    assert manager.mode == "git"
+
+    workspace = manager.create("future_2010")
+    assert workspace.kind == "git"
+    assert (workspace.path / "app.py").read_text() == "VALUE = 2\n"
+    assert (workspace.path / "notes.txt").exists()
+    assert not (workspace.path / "runs").exists()
+
+    (workspace.path / "app.py").write_text("VALUE = 3\n")
+    assert (repo / "app.py").read_text() == "VALUE = 2\n"
+
+    manager.cleanup()
+    assert not workspace.root.exists()
+    worktrees = subprocess.run(
+        ["git", "worktree", "list"], cwd=repo, capture_output=True, text=True
+    ).stdout
+    assert "future_2010" not in worktrees
+
+
+def test_copy_workspace_for_plain_directory(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "app.py").write_text("VALUE = 1\n")
+
+    manager = WorkspaceManager(source, source / "runs" / "r1" / "workspaces")
+    assert manager.mode == "copy"
+
+    workspace = manager.create("future_2010")
+    assert (workspace.path / "app.py").read_text() == "VALUE = 1\n"
+    assert not (workspace.path / "runs").exists()
+
+    manager.cleanup()
+    assert not workspace.path.exists()
+
+
+def test_copy_workspace_diff(tmp_path):
+    source = tmp_path / "src"
+    (source / "pkg").mkdir(parents=True)
+    (source / "pkg" / "app.py").write_text("VALUE = 1\n")
+    (source / "old.txt").write_text("gone\n")
+    manager = WorkspaceManager(source, tmp_path / "workspaces", "copy")
+    workspace = manager.create("future_2010")
+    assert workspace.diff() == ""
+
+    (workspace.path / "pkg" / "app.py").write_text("VALUE = 2\n")
+    (workspace.path / "old.txt").unlink()
+    (workspace.path / "logo.bin").write_bytes(bytes(range(256)))
+    patch = workspace.diff()
+
+    assert "+VALUE = 2" in patch and "deleted file" in patch
+    # It applies to the source like a git workspace's patch would
+    subprocess.run(
+        ["git", "apply", "--binary", "-"], cwd=source, input=patch.encode(), check=True
+    )
+    assert (source / "pkg" / "app.py").read_text() == "VALUE = 2\n"
+    assert not (source / "old.txt").exists()
+    assert (source / "logo.bin").read_bytes() == bytes(range(256))
+    manager.cleanup()
+
+
+def test_engine_runs_agent_and_tests_in_workspace(git_repo, engine_factory):
+    repo = git_repo()
+
+    seen_cwds = []
+
+    def agent(prompt, cwd, timeout=None, **kwargs):
+        seen_cwds.append(cwd)
+        (Path(cwd) / "fixed.txt").write_text("done\n")
+        return AttemptResult(stdout="", stderr="", exit_code=0, duration_seconds=0)
+
+    adapter = MagicMock()
+    adapter.capabilities.return_value.name = "agent"
+    adapter.run.side_effect = agent
+
+    config = RunConfig(max_iters=1, test_cmd="test -f fixed.txt", repo_dir=str(repo))
+    engine = engine_factory(config, repo / "runs" / "r1")
+    best = engine.execute_run("fix it", [adapter])
+
+    assert best is not None
+    assert best.result.exit_code == 0
+    assert seen_cwds == [best.workspace]
+    assert not (repo / "fixed.txt").exists()
+    assert not Path(best.workspace).exists()
+
+
+def test_git_workspace_diff_roundtrip(tmp_path, git_repo):
+    repo = git_repo()
+    (repo / "app.py").write_text("VALUE = 2\n")  # local change, part of the base
+    manager = WorkspaceManager(repo, tmp_path / "workspaces")
+
+    first = manager.create("future_2010")
+    assert first.diff() == ""
+    (first.path / "app.py").write_text("VALUE = 3\n")
+    (first.path / "new.bin").write_bytes(b"\x00\xff")
+    patch = first.diff()
+    assert "VALUE = 3" in patch and "new.bin" in patch
+
+    second = manager.create("future_2020")
+    assert second.base_tree == first.base_tree
+    second.apply_diff(patch)
+    assert (second.path / "app.py").read_text() == "VALUE = 3\n"
+    assert (second.path / "new.bin").read_bytes() == b"\x00\xff"
+    manager.cleanup()